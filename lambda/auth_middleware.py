@@ -0,0 +1,172 @@
+"""
+Authentication middleware for the REST handlers (bookings, tables, menu)
+Verifies the bearer token locally (token_verifier), resolves the caller's role
+and email from the profile cache, and memoises the result per token until it
+expires, so authorization costs microseconds instead of a Cognito round trip
+
+Usage:
+    @require_auth(CORS_HEADERS, admin_methods=('POST', 'PUT', 'DELETE'), public_methods=('GET',))
+    def lambda_handler(event, context):
+        principal = event['auth']  # None for anonymous calls to public methods
+"""
+
+import functools
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Optional, Sequence
+
+import boto3
+from botocore.exceptions import ClientError
+from cognito_client import cognito
+from token_verifier import (
+    LOCAL_VERIFICATION_ENABLED, TokenError, claims_attributes, claims_username, is_revoked, verify_token
+)
+from user_profile import get_cached_profile, merge_profile, report_missing_profile
+
+USERS_TABLE = os.environ.get('USERS_TABLE', 'USERS_TABLE')
+AUTH_CACHE_SIZE = 1024
+# How long a get_user result is trusted when local verification is off (no exp known)
+COGNITO_FALLBACK_TTL = 300
+
+dynamodb = boto3.resource('dynamodb')
+
+# Verified callers for this container: token digest -> (expires_at, issued_at, principal)
+verified_principals = OrderedDict()
+
+def get_http_method(event: dict) -> str:
+    return event.get("httpMethod") or event.get("requestContext", {}).get("http", {}).get("method", "GET")
+
+def get_bearer_token(event: dict) -> Optional[str]:
+    """Bearer token from the Authorization header (case-insensitive), or None"""
+    headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+    auth_header = headers.get('authorization') or ''
+    if not auth_header.lower().startswith('bearer '):
+        return None
+    return auth_header.split(' ', 1)[1].strip() or None
+
+def load_profile(username: str, attributes: dict) -> dict:
+    """Merged profile from the profile cache, else from USERS_TABLE"""
+    profile = get_cached_profile(username)
+    if profile is not None:
+        return profile
+    try:
+        db_user = dynamodb.Table(USERS_TABLE).get_item(Key={'id': username}).get('Item', {})
+        if not db_user:
+            report_missing_profile(username)
+    except Exception as db_error:
+        print(f"DynamoDB error: {str(db_error)}")
+        db_user = {}
+    return merge_profile(username, attributes, db_user)
+
+def identify(token: str):
+    """
+    Authenticate a token
+
+    Returns:
+        (username, attributes, issued_at, expires_at, groups)
+    """
+    if LOCAL_VERIFICATION_ENABLED:
+        claims = verify_token(token)
+        return (claims_username(claims), claims_attributes(claims), claims.get('iat', 0),
+                claims['exp'], claims.get('cognito:groups') or [])
+
+    try:
+        user_info = cognito.get_user(AccessToken=token)
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') == 'NotAuthorizedException':
+            raise TokenError('Token rejected by Cognito')
+        raise
+    attributes = {attr['Name']: attr['Value'] for attr in user_info['UserAttributes']}
+    now = time.time()
+    return user_info['Username'], attributes, now, now + COGNITO_FALLBACK_TTL, []
+
+def resolve_principal(token: str) -> dict:
+    """
+    Verified caller for a token, memoised until the token expires
+    Role changes therefore apply from the user's next token; logout applies
+    immediately (the revocation check runs on every call)
+
+    Raises:
+        TokenError: If the token is invalid or revoked
+    """
+    key = hashlib.sha256(token.encode()).hexdigest()
+    entry = verified_principals.get(key)
+    if entry is not None:
+        expires_at, issued_at, principal = entry
+        if expires_at > time.time():
+            if is_revoked(principal['username'], issued_at):
+                del verified_principals[key]
+                raise TokenError('Token revoked')
+            verified_principals.move_to_end(key)
+            return principal
+        del verified_principals[key]
+
+    username, attributes, issued_at, expires_at, groups = identify(token)
+    profile = load_profile(username, attributes)
+    is_admin = profile.get('isAdmin') or 'admin' in groups
+    principal = {
+        'username': username,
+        'email': profile.get('email') or attributes.get('email', ''),
+        'role': 'admin' if is_admin else profile.get('role', 'customer'),
+        'isAdmin': bool(is_admin)
+    }
+
+    verified_principals[key] = (expires_at, issued_at, principal)
+    while len(verified_principals) > AUTH_CACHE_SIZE:
+        verified_principals.popitem(last=False)
+    return principal
+
+def principal_ids(principal: Optional[dict]) -> set:
+    """Identifiers a caller's records may be stored under (bookings use email or username)"""
+    if not principal:
+        return set()
+    return {value for value in (principal.get('username'), principal.get('email')) if value}
+
+def require_auth(cors_headers: dict, admin_methods: Sequence[str] = (),
+                 public_methods: Sequence[str] = ()):
+    """
+    Decorate a lambda_handler with bearer-token authentication
+
+    Args:
+        cors_headers: Headers for 401/403 responses
+        admin_methods: HTTP methods restricted to admins
+        public_methods: HTTP methods that also accept anonymous callers
+            (a token, if sent, must still be valid)
+
+    The verified caller is passed to the handler as event['auth']
+    """
+    def error(status_code, message):
+        return {
+            'statusCode': status_code,
+            'headers': cors_headers,
+            'body': json.dumps({'error': message})
+        }
+
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(event, context):
+            http_method = get_http_method(event)
+            if http_method == 'OPTIONS':
+                return handler(event, context)
+
+            token = get_bearer_token(event)
+            principal = None
+            if token:
+                try:
+                    principal = resolve_principal(token)
+                except TokenError as e:
+                    print(f"❌ Token rejected: {str(e)}")
+                    return error(401, 'Invalid or expired token')
+
+            if principal is None and http_method not in public_methods:
+                return error(401, 'Missing or invalid authorization header')
+            if http_method in admin_methods and not (principal and principal['isAdmin']):
+                return error(403, 'Admin access required')
+
+            event['auth'] = principal
+            return handler(event, context)
+        return wrapper
+    return decorator
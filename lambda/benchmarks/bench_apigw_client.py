@@ -0,0 +1,47 @@
+"""
+Micro-benchmark: API Gateway Management client construction vs cached lookup
+Run from the lambda/ directory: python benchmarks/bench_apigw_client.py
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import boto3
+import chat_handler
+
+ITERATIONS = int(os.environ.get('BENCH_ITERATIONS', '200'))
+
+EVENT = {
+    'requestContext': {
+        'domainName': 'example.execute-api.us-east-1.amazonaws.com',
+        'stage': 'production'
+    }
+}
+
+def time_per_call(fn, iterations):
+    """Return average milliseconds per call"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) * 1000 / iterations
+
+def build_uncached():
+    """Previous behaviour: a new client on every route invocation"""
+    domain_name = EVENT['requestContext']['domainName']
+    stage = EVENT['requestContext']['stage']
+    return boto3.client('apigatewaymanagementapi', endpoint_url=f"https://{domain_name}/{stage}")
+
+if __name__ == '__main__':
+    uncached_ms = time_per_call(build_uncached, ITERATIONS)
+
+    chat_handler.apigw_clients.clear()
+    chat_handler.get_apigw_client(EVENT)  # warm the cache once, as the first invocation would
+    cached_ms = time_per_call(lambda: chat_handler.get_apigw_client(EVENT), ITERATIONS * 100)
+
+    print(f"Uncached client per message: {uncached_ms:.3f} ms")
+    print(f"Cached client per message:   {cached_ms:.5f} ms")
+    print(f"Saving per message:          {uncached_ms - cached_ms:.3f} ms")
@@ -0,0 +1,230 @@
+"""
+Chat throughput benchmark: drives chat_handler.lambda_handler with simulated WebSocket clients
+
+Uses DynamoDB Local as the table stand-in and a stub API Gateway Management client
+that records every delivery instead of posting it.
+
+Start DynamoDB Local first:
+    docker run -p 8000:8000 amazon/dynamodb-local
+Then, from the lambda/ directory:
+    python benchmarks/bench_chat_throughput.py --customers 500 --admins 10 --messages 5
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'local')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'local')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import boto3
+import chat_handler
+
+DOMAIN_NAME = 'bench.execute-api.local'
+STAGE = 'bench'
+
+class RecordingApiGatewayClient:
+    """Stub API Gateway Management client that records deliveries"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.deliveries = []
+
+    def post_to_connection(self, ConnectionId, Data):
+        with self.lock:
+            self.deliveries.append((time.perf_counter(), ConnectionId, json.loads(Data)))
+
+class DynamoCallCounter:
+    """Counts DynamoDB API calls made through a boto3 session"""
+
+    def __init__(self, session_client):
+        self.lock = threading.Lock()
+        self.calls = 0
+        session_client.meta.events.register('before-call.dynamodb', self.record)
+
+    def record(self, **kwargs):
+        with self.lock:
+            self.calls += 1
+
+def create_tables(dynamodb, prefix):
+    """Create the chat tables in DynamoDB Local"""
+    specs = {
+        'connections': {
+            'KeySchema': [{'AttributeName': 'connectionId', 'KeyType': 'HASH'}],
+            'AttributeDefinitions': [
+                {'AttributeName': 'connectionId', 'AttributeType': 'S'},
+                {'AttributeName': 'role', 'AttributeType': 'S'}
+            ],
+            'GlobalSecondaryIndexes': [{
+                'IndexName': 'role-index',
+                'KeySchema': [{'AttributeName': 'role', 'KeyType': 'HASH'}],
+                'Projection': {'ProjectionType': 'KEYS_ONLY'}
+            }]
+        },
+        'messages': {
+            'KeySchema': [{'AttributeName': 'messageId', 'KeyType': 'HASH'}],
+            'AttributeDefinitions': [
+                {'AttributeName': 'messageId', 'AttributeType': 'S'},
+                {'AttributeName': 'conversationId', 'AttributeType': 'S'},
+                {'AttributeName': 'timestamp', 'AttributeType': 'S'}
+            ],
+            'GlobalSecondaryIndexes': [{
+                'IndexName': 'conversationId-timestamp-index',
+                'KeySchema': [
+                    {'AttributeName': 'conversationId', 'KeyType': 'HASH'},
+                    {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'}
+            }]
+        },
+        'conversations': {
+            'KeySchema': [{'AttributeName': 'conversationId', 'KeyType': 'HASH'}],
+            'AttributeDefinitions': [{'AttributeName': 'conversationId', 'AttributeType': 'S'}]
+        }
+    }
+    tables = {}
+    for name, spec in specs.items():
+        table = dynamodb.create_table(TableName=f"{prefix}{name}", BillingMode='PAY_PER_REQUEST', **spec)
+        table.wait_until_exists()
+        tables[name] = table
+    return tables
+
+def ws_event(route_key, connection_id, body=None, query=None):
+    """Build an API Gateway WebSocket event"""
+    event = {
+        'requestContext': {
+            'routeKey': route_key,
+            'connectionId': connection_id,
+            'domainName': DOMAIN_NAME,
+            'stage': STAGE
+        }
+    }
+    if body is not None:
+        event['body'] = json.dumps(body)
+    if query is not None:
+        event['queryStringParameters'] = query
+    return event
+
+def percentile(values, pct):
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def run_phase(label, events, workers, counter, stub=None):
+    """Invoke lambda_handler for every event concurrently and report timings"""
+    calls_before = counter.calls
+    fanout_ms = []
+    fanout_lock = threading.Lock()
+
+    def invoke(event):
+        delivered_before = len(stub.deliveries) if stub else 0
+        start = time.perf_counter()
+        result = chat_handler.lambda_handler(event, None)
+        if stub is not None and result.get('statusCode') == 200 and event['requestContext']['routeKey'] == 'sendMessage':
+            message_id = json.loads(result['body'])['messageId']
+            with stub.lock:
+                delivered = [d for d in stub.deliveries[delivered_before:] if d[2].get('messageId') == message_id]
+            with fanout_lock:
+                fanout_ms.extend((t - start) * 1000 for t, _, _ in delivered)
+        return result
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(invoke, events))
+    elapsed = time.perf_counter() - start
+
+    errors = sum(1 for r in results if r.get('statusCode') != 200)
+    calls = counter.calls - calls_before
+    print(f"{label:<18} {len(events):>6} events  {len(events) / elapsed:>9.1f}/s  "
+          f"{calls / max(len(events), 1):>5.2f} DynamoDB calls/event  {errors} errors")
+    if fanout_ms:
+        print(f"{'':<18} fan-out latency ms  p50={percentile(fanout_ms, 50):.2f}  "
+              f"p95={percentile(fanout_ms, 95):.2f}  p99={percentile(fanout_ms, 99):.2f}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--endpoint', default=os.environ.get('DYNAMODB_ENDPOINT', 'http://localhost:8000'))
+    parser.add_argument('--customers', type=int, default=500)
+    parser.add_argument('--admins', type=int, default=10)
+    parser.add_argument('--messages', type=int, default=5, help='messages sent per customer')
+    parser.add_argument('--workers', type=int, default=64)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+
+    # Point the handler at DynamoDB Local and the recording stub
+    dynamodb = boto3.resource('dynamodb', endpoint_url=args.endpoint)
+    counter = DynamoCallCounter(dynamodb.meta.client)
+    prefix = f"bench_{uuid.uuid4().hex[:8]}_"
+    tables = create_tables(dynamodb, prefix)
+
+    chat_handler.connections_table = tables['connections']
+    chat_handler.messages_table = tables['messages']
+    chat_handler.conversations_table = tables['conversations']
+
+    stub = RecordingApiGatewayClient()
+    chat_handler.apigw_clients[f"https://{DOMAIN_NAME}/{STAGE}"] = stub
+
+    customers = [f"customer{i}@bench.local" for i in range(args.customers)]
+    admins = [f"admin{i}@bench.local" for i in range(args.admins)]
+
+    try:
+        connect_events = (
+            [ws_event('$connect', f"c-{i}", query={'userId': u, 'role': 'customer'}) for i, u in enumerate(customers)] +
+            [ws_event('$connect', f"a-{i}", query={'userId': u, 'role': 'admin'}) for i, u in enumerate(admins)]
+        )
+        run_phase('$connect', connect_events, args.workers, counter)
+
+        # Each customer talks to one admin; the admin replies to every other message
+        assigned = {c: random.choice(admins) for c in customers}
+        send_events = []
+        for round_number in range(args.messages):
+            for i, customer in enumerate(customers):
+                admin = assigned[customer]
+                send_events.append(ws_event('sendMessage', f"c-{i}", body={
+                    'senderId': customer, 'recipientId': admin, 'message': f"hello {round_number}"
+                }))
+                if round_number % 2 == 0:
+                    send_events.append(ws_event('sendMessage', f"a-{admins.index(admin)}", body={
+                        'senderId': admin, 'recipientId': customer, 'message': f"reply {round_number}"
+                    }))
+        run_phase('sendMessage', send_events, args.workers, counter, stub)
+
+        history_events = [
+            ws_event('getMessages', f"c-{i}", body={'user1': c, 'user2': assigned[c]})
+            for i, c in enumerate(customers)
+        ]
+        run_phase('getMessages', history_events, args.workers, counter)
+
+        inbox_events = [
+            ws_event('getConversations', f"a-{i}", body={'adminEmail': a})
+            for i, a in enumerate(admins)
+        ]
+        run_phase('getConversations', inbox_events, args.workers, counter)
+
+        broadcast_events = [
+            ws_event('broadcast', f"a-{i}", body={'senderId': a, 'message': 'kitchen closes in 30 minutes'})
+            for i, a in enumerate(admins[:1])
+        ]
+        run_phase('broadcast', broadcast_events, args.workers, counter)
+
+        print(f"Deliveries recorded: {len(stub.deliveries)}")
+    finally:
+        for table in tables.values():
+            table.delete()
+
+if __name__ == '__main__':
+    main()
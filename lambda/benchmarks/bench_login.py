@@ -0,0 +1,155 @@
+"""
+Login latency benchmark: sequential initiate_auth -> get_user -> get_item
+vs login_handler (ID token claims + USERS_TABLE read overlapping initiate_auth)
+
+Cognito is a stub that sleeps --cognito-ms per call; USERS_TABLE lives in
+DynamoDB Local. Without REDIS_ENDPOINT the profile pre-warm is recorded
+instead of written.
+
+Start DynamoDB Local first:
+    docker run -p 8000:8000 amazon/dynamodb-local
+Then, from the lambda/ directory:
+    python benchmarks/bench_login.py --logins 200 --cognito-ms 40
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'local')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'local')
+os.environ.setdefault('COGNITO_CLIENT_ID', 'bench-client')
+os.environ.setdefault('COGNITO_CLIENT_SECRET', 'bench-secret')
+# Every benchmark login comes from one address; measure auth, not the rate limiter
+os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import boto3
+import cognito_client
+import jwt
+import login_handler
+
+class StubCognito:
+    """Cognito stand-in with a fixed per-call latency"""
+
+    class exceptions:
+        class NotAuthorizedException(Exception):
+            pass
+
+        class UserNotFoundException(Exception):
+            pass
+
+        class UserNotConfirmedException(Exception):
+            pass
+
+    def __init__(self, latency_seconds):
+        self.latency = latency_seconds
+        self.calls = 0
+
+    def initiate_auth(self, AuthParameters, **kwargs):
+        time.sleep(self.latency)
+        self.calls += 1
+        username = AuthParameters['USERNAME']
+        now = int(time.time())
+        id_token = jwt.encode({
+            'sub': username, 'cognito:username': username, 'token_use': 'id',
+            'aud': os.environ['COGNITO_CLIENT_ID'], 'iat': now, 'exp': now + 3600,
+            'email': f'{username}@example.com', 'name': username.title(), 'custom:role': 'customer'
+        }, 'bench-signing-key-not-verified-by-login', algorithm='HS256')
+        return {'AuthenticationResult': {
+            'AccessToken': f'access-{username}', 'IdToken': id_token,
+            'RefreshToken': 'refresh', 'ExpiresIn': 3600
+        }}
+
+    def get_user(self, AccessToken):
+        time.sleep(self.latency)
+        self.calls += 1
+        username = AccessToken.split('-', 1)[1]
+        return {'Username': username, 'UserAttributes': [
+            {'Name': 'email', 'Value': f'{username}@example.com'},
+            {'Name': 'name', 'Value': username.title()},
+            {'Name': 'custom:role', 'Value': 'customer'}
+        ]}
+
+def sequential_login(cognito, table, username, password):
+    """Previous behaviour: three round trips one after another"""
+    tokens = cognito.initiate_auth(
+        ClientId=login_handler.CLIENT_ID,
+        AuthFlow='USER_PASSWORD_AUTH',
+        AuthParameters={'USERNAME': username, 'PASSWORD': password,
+                        'SECRET_HASH': cognito_client.generate_secret_hash(username)}
+    )['AuthenticationResult']
+    user_info = cognito.get_user(AccessToken=tokens['AccessToken'])
+    attributes = {attr['Name']: attr['Value'] for attr in user_info['UserAttributes']}
+    db_user = table.get_item(Key={'id': username}).get('Item', {})
+    return login_handler.merge_profile(username, attributes, db_user)
+
+def handler_login(username, password):
+    event = {'httpMethod': 'POST', 'body': json.dumps({'username': username, 'password': password})}
+    response = login_handler.lambda_handler(event, None)
+    assert response['statusCode'] == 200, response['body']
+    return json.loads(response['body'])['userInfo']
+
+def summarize(name, samples):
+    ordered = sorted(samples)
+    p50 = ordered[len(ordered) // 2]
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{name:<12} p50 {p50:7.1f} ms   p95 {p95:7.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--endpoint', default=os.environ.get('DYNAMODB_ENDPOINT', 'http://localhost:8000'))
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--cognito-ms', type=float, default=40.0)
+    args = parser.parse_args()
+
+    dynamodb = boto3.resource('dynamodb', endpoint_url=args.endpoint)
+    table = dynamodb.create_table(
+        TableName=f"bench_{uuid.uuid4().hex[:8]}_users",
+        KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+        AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    table.wait_until_exists()
+
+    cognito = StubCognito(args.cognito_ms / 1000)
+    login_handler.cognito = cognito
+    login_handler.dynamodb = dynamodb
+    login_handler.USERS_TABLE = table.name
+    prewarmed = []
+    if not os.environ.get('REDIS_ENDPOINT'):
+        login_handler.cache_profile = lambda username, profile: prewarmed.append(username)
+
+    try:
+        usernames = [f'user{i}' for i in range(args.logins)]
+        with table.batch_writer() as batch:
+            for username in usernames:
+                batch.put_item(Item={'id': username, 'username': username, 'role': 'customer',
+                                     'email': f'{username}@example.com', 'name': username.title()})
+
+        for name, login in (
+            ('sequential', lambda u: sequential_login(cognito, table, u, 'pw')),
+            ('handler', lambda u: handler_login(u, 'pw')),
+        ):
+            cognito.calls = 0
+            login(usernames[0])  # warm connections
+            samples = []
+            for username in usernames:
+                start = time.perf_counter()
+                profile = login(username)
+                samples.append((time.perf_counter() - start) * 1000)
+                assert profile['email'] == f'{username}@example.com'
+            summarize(name, samples)
+            print(f"{'':<12} cognito calls/login {cognito.calls / (len(usernames) + 1):.1f}")
+
+        if prewarmed:
+            print(f"profile cache pre-warmed for {len(prewarmed)} logins")
+    finally:
+        table.delete()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+USERS_TABLE provisioning benchmark: user_provisioning.backfill vs one
+get_item / put_item per user
+
+Cognito is a local user pool stub that serves list_users pages (60 users,
+--cognito-ms per page); USERS_TABLE lives in DynamoDB Local and is seeded with
+complete rows, rows missing their name, and gaps. The second backfill must
+find nothing to do. Without REDIS_ENDPOINT profile cache invalidation is skipped.
+
+Start DynamoDB Local first:
+    docker run -p 8000:8000 amazon/dynamodb-local
+Then, from the lambda/ directory:
+    python benchmarks/bench_provisioning.py --users 2000 --gap 0.2
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'local')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'local')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import boto3
+import user_directory
+import user_provisioning
+
+class StubUserPool:
+    """Cognito stand-in for list_users: paginated, with a fixed per-page latency"""
+
+    def __init__(self, users, latency_seconds):
+        self.users = users
+        self.latency = latency_seconds
+        self.calls = 0
+
+    def list_users(self, UserPoolId, Limit=60, PaginationToken=None):
+        time.sleep(self.latency)
+        self.calls += 1
+        start = int(PaginationToken or 0)
+        response = {'Users': self.users[start:start + Limit]}
+        if start + Limit < len(self.users):
+            response['PaginationToken'] = str(start + Limit)
+        return response
+
+def make_user(index, status='CONFIRMED'):
+    now = datetime.now(timezone.utc)
+    return {
+        'Username': f'user{index}',
+        'UserStatus': status,
+        'UserCreateDate': now,
+        'UserLastModifiedDate': now,
+        'Attributes': [
+            {'Name': 'email', 'Value': f'user{index}@example.com'},
+            {'Name': 'name', 'Value': f'User {index}'},
+            {'Name': 'custom:role', 'Value': 'customer'}
+        ]
+    }
+
+def per_user_backfill(pool, table):
+    """Naive version: one get_item and, if needed, one put_item per user"""
+    for user in user_provisioning.iter_cognito_users(pool, 'bench'):
+        profile = user_provisioning.cognito_profile(user)
+        if profile and 'Item' not in table.get_item(Key={'id': profile['id']}):
+            table.put_item(Item=profile)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--endpoint', default=os.environ.get('DYNAMODB_ENDPOINT', 'http://localhost:8000'))
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--gap', type=float, default=0.2, help='Share of users without a USERS_TABLE row')
+    parser.add_argument('--cognito-ms', type=float, default=50.0)
+    args = parser.parse_args()
+
+    dynamodb = boto3.resource('dynamodb', endpoint_url=args.endpoint)
+    tables = []
+
+    def create_table():
+        table = dynamodb.create_table(
+            TableName=f"bench_{uuid.uuid4().hex[:8]}_users",
+            KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'id', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        table.wait_until_exists()
+        tables.append(table)
+        return table
+
+    users = [make_user(i) for i in range(args.users)]
+    users += [make_user(args.users + i, 'UNCONFIRMED') for i in range(10)]
+    random.seed(7)
+    rows, gaps, stale = [], set(), set()
+    for user in users[:args.users]:
+        profile = user_provisioning.cognito_profile(user)
+        roll = random.random()
+        if roll < args.gap:
+            gaps.add(profile['id'])
+            continue
+        if roll < args.gap + 0.02:
+            stale.add(profile['id'])
+            profile = {**profile, 'name': '', 'avatarUrl': 'https://example.com/a.png'}
+        rows.append(profile)
+
+    pool = StubUserPool(users, args.cognito_ms / 1000)
+    user_provisioning.dynamodb = dynamodb
+    user_directory.dynamodb = dynamodb
+    if not os.environ.get('REDIS_ENDPOINT'):
+        # Each failed Redis connect costs seconds; there is no profile cache to invalidate anyway
+        user_provisioning.invalidate_profile = lambda username: None
+    try:
+        for name in ('per-user', 'backfill'):
+            table = create_table()
+            with table.batch_writer() as batch:
+                for row in rows:
+                    batch.put_item(Item=row)
+            user_provisioning.USERS_TABLE = user_directory.USERS_TABLE = table.name
+
+            pool.calls = 0
+            start = time.perf_counter()
+            if name == 'per-user':
+                per_user_backfill(pool, table)
+            else:
+                summary = user_provisioning.backfill(client=pool)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<10} {elapsed:7.2f} s   list_users pages {pool.calls}")
+
+        assert summary['created'] == len(gaps), summary
+        assert summary['repaired'] == len(stale), summary
+        repaired = table.get_item(Key={'id': next(iter(stale))})['Item'] if stale else None
+        assert repaired is None or (repaired['name'] and repaired['avatarUrl']), repaired
+        print(f"{'':<10} created {summary['created']}, repaired {summary['repaired']}, "
+              f"unconfirmed skipped {len(users) - args.users}")
+
+        again = user_provisioning.backfill(client=pool)
+        assert again['created'] == 0 and again['repaired'] == 0, again
+        print("second backfill: nothing to do")
+    finally:
+        for table in tables:
+            table.delete()
+
+if __name__ == '__main__':
+    main()
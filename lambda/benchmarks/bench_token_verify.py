@@ -0,0 +1,69 @@
+"""
+Local JWT verification against a locally generated RSA key pair
+Serves a JWKS over localhost and times verification; correctness is covered
+by tests/test_token_verifier.py
+Run from the lambda/ directory: python benchmarks/bench_token_verify.py
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+ITERATIONS = int(os.environ.get('BENCH_ITERATIONS', '2000'))
+POOL_ID = 'us-east-1_bench'
+CLIENT_ID = 'bench-client'
+KID = 'bench-key'
+
+private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+jwk.update({'kid': KID, 'alg': 'RS256', 'use': 'sig'})
+jwks_requests = []
+
+class JwksHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        jwks_requests.append(self.path)
+        body = json.dumps({'keys': [jwk]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+server = HTTPServer(('127.0.0.1', 0), JwksHandler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+
+os.environ['COGNITO_USER_POOL_ID'] = POOL_ID
+os.environ['COGNITO_REGION'] = 'us-east-1'
+os.environ['COGNITO_CLIENT_ID'] = CLIENT_ID
+os.environ['COGNITO_JWKS_URL'] = f'http://127.0.0.1:{server.server_port}/.well-known/jwks.json'
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import token_verifier
+
+def make_token(expires_in=3600):
+    now = int(time.time())
+    claims = {
+        'sub': 'c0ffee', 'iss': token_verifier.ISSUER, 'token_use': 'access',
+        'iat': now, 'exp': now + expires_in, 'username': 'alice', 'client_id': CLIENT_ID
+    }
+    return jwt.encode(claims, private_key, algorithm='RS256', headers={'kid': KID})
+
+if __name__ == '__main__':
+    token = make_token()
+    token_verifier.verify_token(token)  # first call fetches the JWKS
+    print(f"JWKS fetches: {len(jwks_requests)}")
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        token_verifier.verify_token(token)
+    per_call_ms = (time.perf_counter() - start) * 1000 / ITERATIONS
+    print(f"local verification: {per_call_ms:.3f} ms/token over {ITERATIONS} tokens "
+          f"(cognito.get_user is a network round trip, typically tens of ms)")
+    server.shutdown()
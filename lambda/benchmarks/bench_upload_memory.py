@@ -0,0 +1,67 @@
+"""
+Memory benchmark: one-shot base64 decode + put_object vs streaming decode + multipart
+Run from the lambda/ directory: python benchmarks/bench_upload_memory.py [size_mb ...]
+"""
+
+import base64
+import os
+import sys
+import tracemalloc
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import image_upload
+
+# botocore reads streaming bodies in 1 MB blocks to checksum and send them
+SEND_BLOCK_SIZE = 1024 * 1024
+
+class StubS3:
+    """Accepts uploads without keeping the bytes, like a network sink"""
+
+    def put_object(self, Body, **kwargs):
+        if hasattr(Body, 'read'):
+            while Body.read(SEND_BLOCK_SIZE):
+                pass
+        return {}
+
+    def create_multipart_upload(self, **kwargs):
+        return {'UploadId': 'bench'}
+
+    def upload_part(self, Body, PartNumber, **kwargs):
+        return {'ETag': f'"{PartNumber}"'}
+
+    def complete_multipart_upload(self, **kwargs):
+        return {}
+
+    def abort_multipart_upload(self, **kwargs):
+        return {}
+
+def one_shot_upload(s3, data):
+    """Previous behaviour: decode everything, then put_object"""
+    file_bytes = base64.b64decode(data)
+    s3.put_object(Bucket='bench', Key='bench.jpg', Body=file_bytes, ContentType='image/jpeg')
+
+def streaming_upload(s3, data):
+    image_upload.stream_base64_upload(s3, 'bench', 'bench.jpg', data, 'image/jpeg')
+
+def peak_extra_mb(fn, s3, data):
+    """Peak memory allocated by fn beyond the already-parsed base64 string"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    fn(s3, data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / (1024 * 1024)
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [2, 9, 20, 40]
+    s3 = StubS3()
+    print(f"part size {image_upload.MULTIPART_PART_SIZE // (1024 * 1024)} MB, "
+          f"decode chunk {image_upload.DECODE_CHUNK_CHARS // 1024} KB of base64")
+    print(f"{'image MB':>9} {'one-shot MB':>12} {'streaming MB':>13}")
+    for size_mb in sizes:
+        data = base64.b64encode(os.urandom(size_mb * 1024 * 1024)).decode('ascii')
+        one_shot = peak_extra_mb(one_shot_upload, s3, data)
+        streaming = peak_extra_mb(streaming_upload, s3, data)
+        print(f"{size_mb:>9} {one_shot:>12.1f} {streaming:>13.1f}")
@@ -4,6 +4,9 @@ import uuid
 import os
 from decimal import Decimal
 from datetime import datetime
+from auth_middleware import principal_ids, require_auth
+from dynamo_scan import iter_scan, scan_all
+from http_cache import content_changed
 
 # Initialize DynamoDB
 dynamodb = boto3.resource('dynamodb')
@@ -17,6 +20,13 @@ sns_client = boto3.client('sns')
 ADMIN_TOPIC_ARN = os.environ.get('ADMIN_TOPIC_ARN', 'arn:aws:sns:us-east-1:533266957010:AdminBookingAlerts')
 CUSTOMER_TOPIC_ARN = os.environ.get('CUSTOMER_TOPIC_ARN', 'arn:aws:sns:us-east-1:533266957010:CustomerNotifications')
 
+# Attributes the booking views read
+BOOKING_LIST_FIELDS = (
+    'id', 'userId', 'customerName', 'phone', 'email', 'date', 'time', 'guests',
+    'tableId', 'tableNumber', 'status', 'selectedItems', 'total', 'totalPrice',
+    'specialRequests', 'createdAt'
+)
+
 # CORS headers
 CORS_HEADERS = {
     'Access-Control-Allow-Origin': '*',
@@ -44,6 +54,7 @@ def convert_to_decimal(data):
         return Decimal(str(data))
     return data
 
+@require_auth(CORS_HEADERS, admin_methods=('DELETE',), public_methods=('POST',))
 def lambda_handler(event, context):
     """Main handler for booking management"""
     
@@ -63,12 +74,15 @@ def lambda_handler(event, context):
         query_params = event.get("queryStringParameters") or {}
         
         # Route to appropriate function
+        # Verified caller (None for guest bookings)
+        principal = event.get('auth')
+        
         if http_method == "GET":
-            return get_bookings(query_params)
+            return get_bookings(query_params, principal)
         elif http_method == "POST":
-            return create_booking(body)
+            return create_booking(body, principal)
         elif http_method == "PUT":
-            return update_booking(body)
+            return update_booking(body, principal)
         elif http_method == "DELETE":
             return delete_booking(body)
         else:
@@ -84,22 +98,32 @@ def lambda_handler(event, context):
             'body': json.dumps({'error': str(e)})
         }
 
-def get_bookings(query_params):
-    """Get all bookings or filter by user"""
+def get_bookings(query_params, principal):
+    """Get all bookings (admin) or filter by user"""
     try:
         user_id = query_params.get('userId')
         
+        # Customers may only list their own bookings
+        if not principal['isAdmin'] and user_id not in principal_ids(principal):
+            return {
+                'statusCode': 403,
+                'headers': CORS_HEADERS,
+                'body': json.dumps({'error': 'Not allowed to view these bookings'})
+            }
+        
         if user_id:
             # Get bookings for specific user
-            response = booking_table.scan(
+            items = scan_all(
+                booking_table,
+                BOOKING_LIST_FIELDS,
                 FilterExpression='userId = :uid',
                 ExpressionAttributeValues={':uid': user_id}
             )
         else:
             # Get all bookings (for admin)
-            response = booking_table.scan()
+            items = scan_all(booking_table, BOOKING_LIST_FIELDS)
         
-        items = decimal_to_native(response.get('Items', []))
+        items = decimal_to_native(items)
         
         return {
             'statusCode': 200,
@@ -123,12 +147,12 @@ def generate_booking_id(date):
         date_part = date.replace('-', '')  # 20240215
         
         # Get count of bookings for this date
-        response = booking_table.scan(
+        count = sum(1 for _ in iter_scan(
+            booking_table,
+            ('id',),
             FilterExpression='begins_with(id, :prefix)',
             ExpressionAttributeValues={':prefix': f'BK-{date_part}'}
-        )
-        
-        count = len(response.get('Items', []))
+        ))
         sequence = str(count + 1).zfill(3)  # 001, 002, 003...
         
         return f'BK-{date_part}-{sequence}'
@@ -137,7 +161,7 @@ def generate_booking_id(date):
         print(f"Error generating booking ID: {e}")
         return f'BK-{str(uuid.uuid4())[:8]}'
 
-def create_booking(data):
+def create_booking(data, principal):
     """Create new booking and reserve table"""
     try:
         # Validate required fields
@@ -155,6 +179,13 @@ def create_booking(data):
         
         # Get userId (from auth or guest)
         user_id = data.get('userId', 'guest')
+        if principal and not principal['isAdmin']:
+            # Signed-in customers always book as themselves
+            if user_id not in principal_ids(principal):
+                user_id = principal['email'] or principal['username']
+        elif not principal and user_id not in ('guest', data.get('email')):
+            # Guests may only file bookings under their own email
+            user_id = 'guest'
         
         # Find available table for the number of guests
         table_id = data.get('tableId')
@@ -217,6 +248,7 @@ def create_booking(data):
             ExpressionAttributeNames={'#status': 'status'},
             ExpressionAttributeValues={':status': 'RESERVED'}
         )
+        content_changed('tables')
         
         # Notify admin of new booking
         try:
@@ -273,7 +305,9 @@ def find_available_table(guests, date, time):
     """Find an available table that fits the party size"""
     try:
         # Get all tables with enough seats
-        response = table_table.scan(
+        tables = iter_scan(
+            table_table,
+            ('id',),
             FilterExpression='seats >= :guests AND #status = :status',
             ExpressionAttributeNames={'#status': 'status'},
             ExpressionAttributeValues={
@@ -282,8 +316,6 @@ def find_available_table(guests, date, time):
             }
         )
         
-        tables = response.get('Items', [])
-        
         # Check each table for availability at the requested time
         for table in tables:
             if is_table_available(table['id'], date, time):
@@ -298,7 +330,9 @@ def is_table_available(table_id, date, time):
     """Check if table is available at specific date/time"""
     try:
         # Check if there's any booking for this table at this time
-        response = booking_table.scan(
+        bookings = iter_scan(
+            booking_table,
+            ('id',),
             FilterExpression='tableId = :tid AND #date = :date AND #time = :time AND #status IN (:pending, :confirmed)',
             ExpressionAttributeNames={
                 '#date': 'date',
@@ -314,14 +348,14 @@ def is_table_available(table_id, date, time):
             }
         )
         
-        # If no bookings found, table is available
-        return len(response.get('Items', [])) == 0
+        # If no bookings found, table is available (stops at the first match)
+        return next(bookings, None) is None
     except Exception as e:
         print(f"Error checking table availability: {e}")
         return False
 
-def update_booking(data):
-    """Update booking status"""
+def update_booking(data, principal):
+    """Update booking status (customers may only cancel their own bookings)"""
     try:
         if not data.get('id'):
             return {
@@ -341,6 +375,16 @@ def update_booking(data):
         
         current_booking = booking_response['Item']
         
+        if not principal['isAdmin']:
+            owns_booking = current_booking.get('userId') in principal_ids(principal)
+            fields = {key for key, value in data.items() if key != 'id' and value is not None}
+            if not owns_booking or fields != {'status'} or data['status'] != 'CANCELLED':
+                return {
+                    'statusCode': 403,
+                    'headers': CORS_HEADERS,
+                    'body': json.dumps({'error': 'Customers can only cancel their own bookings'})
+                }
+        
         # Build update expression
         update_expression = "SET "
         expression_attribute_values = {}
@@ -379,6 +423,7 @@ def update_booking(data):
                 ExpressionAttributeNames={'#status': 'status'},
                 ExpressionAttributeValues={':status': 'AVAILABLE'}
             )
+            content_changed('tables')
         
 
         new_status = data.get('status')
@@ -572,6 +617,7 @@ def delete_booking(data):
                     ExpressionAttributeNames={'#status': 'status'},
                     ExpressionAttributeValues={':status': 'AVAILABLE'}
                 )
+                content_changed('tables')
         
         # Delete booking
         booking_table.delete_item(Key={'id': data['id']})
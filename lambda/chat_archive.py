@@ -0,0 +1,248 @@
+"""
+Chat Retention: archival and compaction for CHAT_MESSAGES
+Runs on a schedule (EventBridge). For every conversation, messages older than
+ARCHIVE_AFTER_DAYS are compacted into one gzip JSON-lines blob, recorded on the
+conversation summary, and then stamped with a DynamoDB TTL so they expire.
+The summary's archivedThrough is the exclusive end of the archived range:
+archived messages have timestamp < archivedThrough, live ones >= it.
+Conversations without a summary item (from before summaries) get one from
+chat_handler.backfill_conversation_summaries before each run.
+
+CHAT_MESSAGES must have TTL enabled on the 'expiresAt' attribute.
+Archives go to S3 when CHAT_ARCHIVE_BUCKET is set, otherwise to CHAT_ARCHIVE_DIR
+on the local filesystem (for local runs and tests).
+"""
+
+import boto3
+import gzip
+import json
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from decimal import Decimal
+from boto3.dynamodb.conditions import Key
+
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', '90'))
+TTL_GRACE_DAYS = int(os.environ.get('TTL_GRACE_DAYS', '7'))
+ARCHIVE_BUCKET = os.environ.get('CHAT_ARCHIVE_BUCKET', '')
+ARCHIVE_DIR = os.environ.get('CHAT_ARCHIVE_DIR', '/tmp/chat-archive')
+ARCHIVE_PREFIX = 'chat-archive/'
+ARCHIVE_CACHE_SIZE = 32
+TTL_STAMP_CONCURRENCY = 8
+
+# Initialize AWS clients
+dynamodb = boto3.resource('dynamodb')
+messages_table = dynamodb.Table('CHAT_MESSAGES')
+conversations_table = dynamodb.Table(os.environ.get('CONVERSATIONS_TABLE', 'CHAT_CONVERSATIONS'))
+
+# S3 client (created on first use, reused across Lambda invocations)
+s3_client = None
+
+# Decoded archive chunks are immutable, so keep the most recent ones in memory
+archive_cache = OrderedDict()
+
+def get_s3_client():
+    """Get or create S3 client"""
+    global s3_client
+    if s3_client is None:
+        s3_client = boto3.client('s3')
+    return s3_client
+
+def decimal_to_native(obj):
+    """Convert Decimal to native Python types"""
+    if isinstance(obj, Decimal):
+        return int(obj) if obj % 1 == 0 else float(obj)
+    elif isinstance(obj, list):
+        return [decimal_to_native(i) for i in obj]
+    elif isinstance(obj, dict):
+        return {k: decimal_to_native(v) for k, v in obj.items()}
+    return obj
+
+def write_archive(key, data):
+    """Store a compressed archive blob in S3 or the local archive directory"""
+    if ARCHIVE_BUCKET:
+        get_s3_client().put_object(
+            Bucket=ARCHIVE_BUCKET,
+            Key=key,
+            Body=data,
+            ContentType='application/x-ndjson',
+            ContentEncoding='gzip'
+        )
+        return
+
+    path = os.path.join(ARCHIVE_DIR, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+def read_archive(key):
+    """Load a compressed archive blob from S3 or the local archive directory"""
+    if ARCHIVE_BUCKET:
+        response = get_s3_client().get_object(Bucket=ARCHIVE_BUCKET, Key=key)
+        return response['Body'].read()
+
+    with open(os.path.join(ARCHIVE_DIR, key), 'rb') as f:
+        return f.read()
+
+def encode_messages(messages):
+    """Encode messages as gzip-compressed JSON lines"""
+    lines = '\n'.join(json.dumps(decimal_to_native(m), separators=(',', ':')) for m in messages)
+    return gzip.compress(lines.encode('utf-8'))
+
+def decode_messages(data):
+    """Decode gzip-compressed JSON lines into a list of messages"""
+    text = gzip.decompress(data).decode('utf-8')
+    return [json.loads(line) for line in text.splitlines() if line]
+
+def load_archive_chunk(key):
+    """Return the messages of one archive chunk, using the in-memory cache"""
+    if key in archive_cache:
+        archive_cache.move_to_end(key)
+        return archive_cache[key]
+
+    messages = decode_messages(read_archive(key))
+    archive_cache[key] = messages
+    if len(archive_cache) > ARCHIVE_CACHE_SIZE:
+        archive_cache.popitem(last=False)
+    return messages
+
+def read_archived_messages(summary, before, limit):
+    """
+    Read up to `limit` archived messages older than `before` (oldest first)
+    Chunks are walked newest to oldest and only as many as needed are loaded
+    """
+    page = []
+    for chunk in reversed(summary.get('archives', [])):
+        if len(page) >= limit:
+            break
+        if before and chunk['from'] >= before:
+            continue
+        older = [m for m in load_archive_chunk(chunk['key']) if not before or m['timestamp'] < before]
+        page = older[-(limit - len(page)):] + page
+    return page
+
+def read_all_archived_messages(summary):
+    """Every archived message of a conversation (oldest first)"""
+    return [m for chunk in summary.get('archives', []) for m in load_archive_chunk(chunk['key'])]
+
+def query_messages_to_archive(conversation_id, archived_through, cutoff):
+    """Query live messages from the archive watermark (inclusive) up to the cutoff (exclusive)"""
+    if archived_through and cutoff <= archived_through:
+        # A run with a larger archiveAfterDays already archived past this cutoff
+        # (between() would fail with low > high)
+        return []
+    if archived_through:
+        key_condition = Key('conversationId').eq(conversation_id) & Key('timestamp').between(archived_through, cutoff)
+    else:
+        key_condition = Key('conversationId').eq(conversation_id) & Key('timestamp').lt(cutoff)
+
+    query_kwargs = {
+        'IndexName': 'conversationId-timestamp-index',
+        'KeyConditionExpression': key_condition,
+        'ScanIndexForward': True
+    }
+    response = messages_table.query(**query_kwargs)
+    items = response.get('Items', [])
+
+    while 'LastEvaluatedKey' in response:
+        response = messages_table.query(ExclusiveStartKey=response['LastEvaluatedKey'], **query_kwargs)
+        items.extend(response.get('Items', []))
+
+    # between() is inclusive on both ends; the cutoff belongs to the next run
+    return [m for m in items if archived_through <= m['timestamp'] < cutoff]
+
+def compact_conversation(summary, cutoff):
+    """
+    Archive one conversation's messages older than cutoff
+    Returns the number of messages archived
+    """
+    conversation_id = summary['conversationId']
+    archived_through = summary.get('archivedThrough', '')
+
+    messages = query_messages_to_archive(conversation_id, archived_through, cutoff)
+    if not messages:
+        return 0
+
+    archives = summary.get('archives', [])
+    key = f"{ARCHIVE_PREFIX}{conversation_id}/{len(archives):05d}.jsonl.gz"
+    write_archive(key, encode_messages(messages))
+
+    first_ts = messages[0]['timestamp']
+    last_ts = messages[-1]['timestamp']
+
+    # Record the chunk before anything can expire, so reads can always find it;
+    # the watermark is the cutoff, so a message stamped exactly at it is archived next run
+    conversations_table.update_item(
+        Key={'conversationId': conversation_id},
+        UpdateExpression='SET archivedThrough = :cutoff, archives = list_append(if_not_exists(archives, :empty), :chunk)',
+        ExpressionAttributeValues={
+            ':cutoff': cutoff,
+            ':empty': [],
+            ':chunk': [{'key': key, 'from': first_ts, 'to': last_ts, 'count': len(messages)}]
+        }
+    )
+
+    # Stamp TTL on the archived live copies; the items came from a GSI projection,
+    # so only the attribute is set instead of re-putting them
+    expires_at = int(time.time()) + TTL_GRACE_DAYS * 86400
+
+    def stamp(message):
+        try:
+            messages_table.update_item(
+                Key={'messageId': message['messageId']},
+                UpdateExpression='SET expiresAt = :expires',
+                ConditionExpression='attribute_exists(messageId)',
+                ExpressionAttributeValues={':expires': expires_at}
+            )
+        except messages_table.meta.client.exceptions.ConditionalCheckFailedException:
+            pass  # Deleted since the query
+
+    with ThreadPoolExecutor(max_workers=TTL_STAMP_CONCURRENCY) as pool:
+        list(pool.map(stamp, messages))
+
+    print(f"✅ Archived {len(messages)} messages for {conversation_id} → {key}")
+    return len(messages)
+
+def lambda_handler(event, context):
+    """
+    Scheduled compaction job
+    Optional event: { "archiveAfterDays": 30 }
+    """
+    archive_after_days = int((event or {}).get('archiveAfterDays', ARCHIVE_AFTER_DAYS))
+    cutoff = (datetime.utcnow() - timedelta(days=archive_after_days)).isoformat() + 'Z'
+
+    conversations = 0
+    archived = 0
+
+    # Only conversations with a summary item are compacted; create the missing ones first
+    # (imported here: chat_handler imports this module)
+    from chat_handler import backfill_conversation_summaries
+    backfill_conversation_summaries()
+
+    response = conversations_table.scan()
+    summaries = response.get('Items', [])
+    while 'LastEvaluatedKey' in response:
+        response = conversations_table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
+        summaries.extend(response.get('Items', []))
+
+    for summary in summaries:
+        try:
+            count = compact_conversation(summary, cutoff)
+            if count:
+                conversations += 1
+                archived += count
+        except Exception as e:
+            print(f"❌ Compaction failed for {summary.get('conversationId')}: {str(e)}")
+
+    print(f"✅ Compaction complete: {archived} messages from {conversations} conversations (cutoff {cutoff})")
+
+    return {
+        'statusCode': 200,
+        'body': json.dumps({
+            'cutoff': cutoff,
+            'conversations': conversations,
+            'archived': archived
+        })
+    }
@@ -1,31 +1,77 @@
 import boto3
 import json
 import os
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from decimal import Decimal
 
+from boto3.dynamodb.conditions import Key
+from botocore.config import Config
+from auth_middleware import resolve_principal
+from botocore.exceptions import ClientError
+from chat_archive import read_all_archived_messages, read_archived_messages
+from token_verifier import TokenError
+from user_directory import get_display_profiles
+
 # Initialize AWS clients
 dynamodb = boto3.resource('dynamodb')
 connections_table = dynamodb.Table('CHAT_CONNECTIONS')
 messages_table = dynamodb.Table('CHAT_MESSAGES')
+# One summary item per conversation: last message, per-sender counters and read watermarks
+conversations_table = dynamodb.Table(os.environ.get('CONVERSATIONS_TABLE', 'CHAT_CONVERSATIONS'))
+
+# Marker item written once every conversation from before summaries has one
+SUMMARY_BACKFILL_MARKER = '__summaries_backfilled__'
+summaries_backfilled = False
 
 # API Gateway Management API client (for sending messages back to clients)
 # Endpoint will be set from environment variable
 APIGW_ENDPOINT = os.environ.get('APIGW_ENDPOINT', '')
 
+MESSAGE_PAGE_SIZE = int(os.environ.get('MESSAGE_PAGE_SIZE', '50'))
+
+# Broadcast fan-out: worker threads and overall post_to_connection rate
+BROADCAST_CONCURRENCY = int(os.environ.get('BROADCAST_CONCURRENCY', '20'))
+BROADCAST_RATE_PER_SECOND = float(os.environ.get('BROADCAST_RATE_PER_SECOND', '400'))
+BROADCAST_MAX_RETRIES = 3
+THROTTLE_ERROR_CODES = ('LimitExceededException', 'TooManyRequestsException', 'ThrottlingException')
+
+# Keep-alive pool shared by every post_to_connection call in this container
+APIGW_CLIENT_CONFIG = Config(
+    max_pool_connections=int(os.environ.get('APIGW_MAX_POOL_CONNECTIONS', '50')),
+    connect_timeout=2,
+    read_timeout=5,
+    tcp_keepalive=True,
+    retries={'max_attempts': 2, 'mode': 'standard'}
+)
+
+# Clients cached per endpoint URL (reuse across Lambda invocations)
+apigw_clients = {}
+
 def get_apigw_client(event):
-    """Create API Gateway Management API client with correct endpoint"""
+    """Get or create API Gateway Management API client for the event's endpoint"""
     domain_name = event['requestContext']['domainName']
     stage = event['requestContext']['stage']
     endpoint_url = f"https://{domain_name}/{stage}"
     
-    return boto3.client('apigatewaymanagementapi', endpoint_url=endpoint_url)
+    client = apigw_clients.get(endpoint_url)
+    if client is None:
+        client = boto3.client(
+            'apigatewaymanagementapi',
+            endpoint_url=endpoint_url,
+            config=APIGW_CLIENT_CONFIG
+        )
+        apigw_clients[endpoint_url] = client
+    return client
 
 def lambda_handler(event, context):
     """
     Main handler for WebSocket chat
-    Routes: $connect, $disconnect, sendMessage, getMessages
+    Routes: $connect, $disconnect, sendMessage, getMessages, getUsers,
+            getConversations, markRead, broadcast
     """
     
     route_key = event.get('requestContext', {}).get('routeKey')
@@ -44,6 +90,10 @@ def lambda_handler(event, context):
             return handle_get_users(event, connection_id)
         elif route_key == 'getConversations':
             return handle_get_conversations(event, connection_id)
+        elif route_key == 'markRead':
+            return handle_mark_read(event, connection_id)
+        elif route_key == 'broadcast':
+            return handle_broadcast(event, connection_id)
         else:
             return {'statusCode': 400, 'body': 'Unknown route'}
             
@@ -57,13 +107,34 @@ def handle_connect(event, connection_id):
     """
     Handle new WebSocket connection
     Store connectionId + userId in DynamoDB
+    
+    Browsers can't set headers on a WebSocket, so the access token comes in the
+    query string. The role is taken from the verified token only; connections
+    without a token are customers
     """
     
-    # Get userId and role from query parameters
-    # Example: wss://...?userId=user@email.com&role=admin
+    # Example: wss://...?userId=user@email.com&token=<access token>
     query_params = event.get('queryStringParameters') or {}
     user_id = query_params.get('userId', 'guest')
-    role = query_params.get('role', 'customer')
+    role = 'customer'
+    
+    token = query_params.get('token')
+    if token:
+        try:
+            principal = resolve_principal(token)
+        except TokenError as e:
+            print(f"❌ Token rejected on connect: {str(e)}")
+            return {'statusCode': 401, 'body': 'Invalid or expired token'}
+        # Conversations and connections are keyed by email
+        user_id = principal['email'] or (
+            get_display_profiles([principal['username']]).get(principal['username'], {}).get('email')
+        )
+        if not user_id:
+            print(f"❌ No email on record for {principal['username']}, connection refused")
+            return {'statusCode': 403, 'body': 'No email on record for this user'}
+        role = principal['role']
+    elif query_params.get('role', 'customer') != 'customer':
+        print(f"⚠️ Unverified role '{query_params['role']}' requested for {user_id}, connecting as customer")
     
     # Store connection
     connections_table.put_item(
@@ -129,6 +200,11 @@ def handle_send_message(event, connection_id):
         print(f" Error saving message: {str(e)}")
         raise
 
+    # Update conversation summary (one item write, drives unread counts)
+    try:
+        update_conversation_summary(conversation_id, sender_id, recipient_id, message, timestamp)
+    except Exception as e:
+        print(f"⚠️ Error updating conversation summary: {str(e)}")
     
     # Find recipient's connection AND sender's connection (to confirm message sent)
     try:
@@ -203,16 +279,15 @@ def handle_get_messages(event, connection_id):
     # Create conversation ID
     conversation_id = '_'.join(sorted([user1, user2]))
     
-    # Query messages
-    from boto3.dynamodb.conditions import Key
-    
-    response = messages_table.query(
-        IndexName='conversationId-timestamp-index',
-        KeyConditionExpression=Key('conversationId').eq(conversation_id),
-        ScanIndexForward=True  # Oldest first
-    )
+    limit = body.get('limit')
+    before = body.get('before')
+    page_info = {}
     
-    messages = response.get('Items', [])
+    if limit or before:
+        # Paged history: newest page first, falls through to the archive past live data
+        messages, page_info = get_message_page(conversation_id, before, int(limit or MESSAGE_PAGE_SIZE))
+    else:
+        messages = get_full_history(conversation_id)
     
     # Convert Decimal to native types
     messages = decimal_to_native(messages)
@@ -225,7 +300,8 @@ def handle_get_messages(event, connection_id):
             ConnectionId=connection_id,
             Data=json.dumps({
                 'type': 'messageHistory',
-                'messages': messages
+                'messages': messages,
+                **page_info
             }).encode('utf-8')
         )
     except Exception as e:
@@ -236,6 +312,63 @@ def handle_get_messages(event, connection_id):
         'body': json.dumps({'count': len(messages)})
     }
 
+def get_full_history(conversation_id):
+    """Whole conversation, oldest first: the compacted archive, then live messages"""
+    summary = conversations_table.get_item(Key={'conversationId': conversation_id}).get('Item', {})
+    archived_through = summary.get('archivedThrough', '')
+    
+    key_condition = Key('conversationId').eq(conversation_id)
+    if archived_through:
+        # Archived copies awaiting TTL deletion are served from the archive instead
+        key_condition = key_condition & Key('timestamp').gte(archived_through)
+    query_kwargs = {
+        'IndexName': 'conversationId-timestamp-index',
+        'KeyConditionExpression': key_condition,
+        'ScanIndexForward': True  # Oldest first
+    }
+    response = messages_table.query(**query_kwargs)
+    live = response.get('Items', [])
+    while 'LastEvaluatedKey' in response:
+        response = messages_table.query(ExclusiveStartKey=response['LastEvaluatedKey'], **query_kwargs)
+        live.extend(response.get('Items', []))
+    
+    return read_all_archived_messages(summary) + live
+
+def get_message_page(conversation_id, before, limit):
+    """
+    Return up to `limit` messages older than `before` (oldest first) plus paging info
+    Live messages at or after the summary's archivedThrough watermark come from
+    DynamoDB; anything older is read from the compacted archive
+    """
+    summary = conversations_table.get_item(Key={'conversationId': conversation_id}).get('Item', {})
+    archived_through = summary.get('archivedThrough', '')
+    
+    page = []
+    if not before or before > archived_through:
+        key_condition = Key('conversationId').eq(conversation_id)
+        if before:
+            key_condition = key_condition & Key('timestamp').lt(before)
+        
+        response = messages_table.query(
+            IndexName='conversationId-timestamp-index',
+            KeyConditionExpression=key_condition,
+            ScanIndexForward=False,  # Newest first
+            Limit=limit
+        )
+        # Archived copies awaiting TTL deletion are served from the archive instead
+        page = [m for m in response.get('Items', []) if m['timestamp'] >= archived_through]
+        page.reverse()
+    
+    if len(page) < limit and archived_through:
+        cursor = page[0]['timestamp'] if page else before
+        page = read_archived_messages(summary, cursor, limit - len(page)) + page
+    
+    page_info = {
+        'nextBefore': page[0]['timestamp'] if page else None,
+        'hasMore': len(page) == limit
+    }
+    return page, page_info
+
 def handle_get_users(event, connection_id):
     """
     Handle fetching online users by role
@@ -266,6 +399,7 @@ def handle_get_users(event, connection_id):
              }
              
     user_list = list(users.values())
+    add_display_profiles(user_list)
     
     apigw_client = get_apigw_client(event)
     try:
@@ -292,55 +426,217 @@ def decimal_to_native(obj):
     else:
         return obj
 
-def handle_get_conversations(event, connection_id):
+def sent_count_attr(user_id):
+    """Summary attribute counting messages sent by user_id"""
+    return f"sentCount_{user_id}"
+
+def read_count_attr(user_id):
+    """Summary attribute holding user_id's read watermark (messages seen from the other side)"""
+    return f"readCount_{user_id}"
+
+def update_conversation_summary(conversation_id, sender_id, recipient_id, message, timestamp):
     """
-    Handle fetching all conversations for admin
-    Returns list of unique users who have chatted with admin
+    Record the latest message on the conversation summary item
+    Increments the sender's counter so unread = sentCount(other) - readCount(me)
+    """
+    conversations_table.update_item(
+        Key={'conversationId': conversation_id},
+        UpdateExpression=(
+            'SET participants = :participants, lastMessage = :message, '
+            'lastTimestamp = :timestamp, lastSenderId = :sender ADD #sent :one'
+        ),
+        ExpressionAttributeNames={'#sent': sent_count_attr(sender_id)},
+        ExpressionAttributeValues={
+            ':participants': sorted([sender_id, recipient_id]),
+            ':message': message,
+            ':timestamp': timestamp,
+            ':sender': sender_id,
+            ':one': 1
+        }
+    )
+
+def unread_count(summary, user_id, other_user):
+    """Unread messages for user_id in a conversation summary (O(1), no message reads)"""
+    sent = int(summary.get(sent_count_attr(other_user), 0))
+    read = int(summary.get(read_count_attr(user_id), 0))
+    return max(sent - read, 0)
+
+def handle_mark_read(event, connection_id):
+    """
+    Handle marking a conversation as read
+    Moves the reader's watermark up to the other user's sent count in a single
+    item update instead of flipping the 'read' flag on every message
     """
     body = json.loads(event.get('body', '{}'))
-    admin_email = body.get('adminEmail')
+    user_id = body.get('userId')
+    other_user = body.get('otherUserId')
     
-    if not admin_email:
-        return {'statusCode': 400, 'body': 'Missing adminEmail'}
+    if not all([user_id, other_user]):
+        return {'statusCode': 400, 'body': 'Missing userId or otherUserId'}
+    
+    conversation_id = '_'.join(sorted([user_id, other_user]))
+    read_at = datetime.utcnow().isoformat() + 'Z'
+    
+    try:
+        conversations_table.update_item(
+            Key={'conversationId': conversation_id},
+            UpdateExpression='SET #read = if_not_exists(#sent, :zero), #readAt = :readAt',
+            ConditionExpression='attribute_exists(conversationId)',
+            ExpressionAttributeNames={
+                '#read': read_count_attr(user_id),
+                '#sent': sent_count_attr(other_user),
+                '#readAt': f"readAt_{user_id}"
+            },
+            ExpressionAttributeValues={':zero': 0, ':readAt': read_at}
+        )
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+            raise
+        # Nothing has been sent in this conversation yet
+        return {'statusCode': 200, 'body': json.dumps({'unread': 0})}
+    
+    # Let the other user's open sessions know their messages were read
+    try:
+        response = connections_table.scan(
+            FilterExpression='userId = :otherUser',
+            ExpressionAttributeValues={':otherUser': other_user}
+        )
+        apigw_client = get_apigw_client(event)
+        for item in response.get('Items', []):
+            try:
+                apigw_client.post_to_connection(
+                    ConnectionId=item['connectionId'],
+                    Data=json.dumps({
+                        'type': 'readReceipt',
+                        'conversationId': conversation_id,
+                        'readerId': user_id,
+                        'readAt': read_at
+                    }).encode('utf-8')
+                )
+            except Exception as send_error:
+                print(f"⚠️ Failed to send read receipt to {item['connectionId']}: {str(send_error)}")
+    except Exception as e:
+        print(f"❌ Error sending read receipt: {str(e)}")
+    
+    return {'statusCode': 200, 'body': json.dumps({'unread': 0, 'readAt': read_at})}
+
+def get_conversations_from_summaries(admin_email):
+    """Build the admin inbox from conversation summary items"""
+    scan_kwargs = {
+        'FilterExpression': 'contains(participants, :admin)',
+        'ExpressionAttributeValues': {':admin': admin_email}
+    }
+    response = conversations_table.scan(**scan_kwargs)
+    summaries = response.get('Items', [])
+    
+    while 'LastEvaluatedKey' in response:
+        response = conversations_table.scan(ExclusiveStartKey=response['LastEvaluatedKey'], **scan_kwargs)
+        summaries.extend(response.get('Items', []))
+    
+    conversations = {}
+    for summary in summaries:
+        others = [p for p in summary.get('participants', []) if p != admin_email]
+        if not others:
+            continue
+        other_user = others[0]
+        conversations[other_user] = {
+            'userId': other_user,
+            'lastMessage': summary.get('lastMessage', ''),
+            'lastTimestamp': summary.get('lastTimestamp', ''),
+            'unread': unread_count(summary, admin_email, other_user)
+        }
+    return conversations
+
+def backfill_conversation_summaries():
+    """
+    Create summary items for conversations that predate them (one CHAT_MESSAGES scan)
+    Runs until a marker item records completion; existing summaries are never
+    touched and legacy messages count as read, as the old inbox reported them
+    """
+    global summaries_backfilled
+    if summaries_backfilled:
+        return
+    marker = conversations_table.get_item(
+        Key={'conversationId': SUMMARY_BACKFILL_MARKER}, ConsistentRead=True
+    ).get('Item')
+    if marker:
+        summaries_backfilled = True
+        return
     
-    # Scan messages table to find all conversations involving admin
     response = messages_table.scan()
     all_messages = response.get('Items', [])
-    
-    # Handle pagination if there are more items
     while 'LastEvaluatedKey' in response:
         response = messages_table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
         all_messages.extend(response.get('Items', []))
     
-    # Extract unique users who chatted with admin
-    conversations = {}
+    summaries = {}
     for msg in all_messages:
+        # Broadcast records are not conversations
+        if msg.get('type') == 'broadcast' or not msg.get('conversationId'):
+            continue
         sender = msg.get('senderId', '')
         recipient = msg.get('recipientId', '')
-        timestamp = msg.get('timestamp', '')
-        message = msg.get('message', '')
-        
-        # Find the other user (not admin)
-        other_user = None
-        if sender == admin_email:
-            other_user = recipient
-        elif recipient == admin_email:
-            other_user = sender
-        
-        if other_user and other_user != admin_email:
-            # Update or add to conversations
-            if other_user not in conversations:
-                conversations[other_user] = {
-                    'userId': other_user,
-                    'lastMessage': message,
-                    'lastTimestamp': timestamp,
-                    'unread': 0
-                }
-            else:
-                # Update if this message is newer
-                if timestamp > conversations[other_user]['lastTimestamp']:
-                    conversations[other_user]['lastMessage'] = message
-                    conversations[other_user]['lastTimestamp'] = timestamp
+        summary = summaries.setdefault(msg['conversationId'], {
+            'conversationId': msg['conversationId'],
+            'participants': sorted([sender, recipient]),
+            'lastTimestamp': ''
+        })
+        summary[sent_count_attr(sender)] = summary.get(sent_count_attr(sender), 0) + 1
+        if msg.get('timestamp', '') >= summary['lastTimestamp']:
+            summary.update(lastMessage=msg.get('message', ''), lastTimestamp=msg.get('timestamp', ''),
+                           lastSenderId=sender)
+    
+    created = 0
+    for summary in summaries.values():
+        for user_id in summary['participants']:
+            other_user = next((p for p in summary['participants'] if p != user_id), user_id)
+            summary[read_count_attr(user_id)] = summary.get(sent_count_attr(other_user), 0)
+        try:
+            conversations_table.put_item(
+                Item=summary,
+                ConditionExpression='attribute_not_exists(conversationId)'
+            )
+            created += 1
+        except ClientError as e:
+            # A message since the scan already created the summary
+            if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+                raise
+    
+    conversations_table.put_item(Item={
+        'conversationId': SUMMARY_BACKFILL_MARKER,
+        'completedAt': datetime.utcnow().isoformat() + 'Z'
+    })
+    summaries_backfilled = True
+    print(f"✅ Backfilled {created} conversation summaries from {len(all_messages)} messages")
+
+def add_display_profiles(entries):
+    """Add name and avatarUrl to userId entries (one batch lookup for the whole list)"""
+    try:
+        profiles = get_display_profiles(entry['userId'] for entry in entries)
+    except Exception as e:
+        print(f"⚠️ Profile lookup failed: {str(e)}")
+        return entries
+    for entry in entries:
+        profile = profiles.get(entry['userId'])
+        if profile:
+            entry['name'] = profile.get('name', '')
+            entry['avatarUrl'] = profile.get('avatarUrl', '')
+    return entries
+
+def handle_get_conversations(event, connection_id):
+    """
+    Handle fetching all conversations for admin
+    Returns list of unique users who have chatted with admin, with unread counts
+    """
+    body = json.loads(event.get('body', '{}'))
+    admin_email = body.get('adminEmail')
+    
+    if not admin_email:
+        return {'statusCode': 400, 'body': 'Missing adminEmail'}
+    
+    # Conversations from before summary items existed get one on the first inbox load
+    backfill_conversation_summaries()
+    conversations = get_conversations_from_summaries(admin_email)
     
     # Sort by last timestamp (most recent first)
     conversation_list = sorted(
@@ -351,6 +647,7 @@ def handle_get_conversations(event, connection_id):
     
     # Convert to native types
     conversation_list = decimal_to_native(conversation_list)
+    add_display_profiles(conversation_list)
     
     apigw_client = get_apigw_client(event)
     try:
@@ -365,3 +662,138 @@ def handle_get_conversations(event, connection_id):
         print(f"❌ Error sending conversation list: {str(e)}")
         
     return {'statusCode': 200, 'body': json.dumps({'count': len(conversation_list)})}
+
+class RateLimiter:
+    """Token bucket shared by broadcast worker threads"""
+    
+    def __init__(self, rate_per_second):
+        self.interval = 1.0 / rate_per_second
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+def get_connections_by_role(role):
+    """Resolve connections for a role from the role-index GSI on CHAT_CONNECTIONS"""
+    query_kwargs = {
+        'IndexName': 'role-index',
+        'KeyConditionExpression': Key('role').eq(role)
+    }
+    response = connections_table.query(**query_kwargs)
+    items = response.get('Items', [])
+    
+    while 'LastEvaluatedKey' in response:
+        response = connections_table.query(ExclusiveStartKey=response['LastEvaluatedKey'], **query_kwargs)
+        items.extend(response.get('Items', []))
+    
+    return items
+
+def deliver_to_connection(apigw_client, limiter, target_connection_id, data):
+    """
+    Post one payload with rate limiting and backoff on throttling
+    Returns 'delivered', 'gone' or 'failed'
+    """
+    for attempt in range(BROADCAST_MAX_RETRIES + 1):
+        limiter.wait()
+        try:
+            apigw_client.post_to_connection(ConnectionId=target_connection_id, Data=data)
+            return 'delivered'
+        except ClientError as e:
+            code = e.response.get('Error', {}).get('Code', '')
+            if code == 'GoneException':
+                return 'gone'
+            if code in THROTTLE_ERROR_CODES and attempt < BROADCAST_MAX_RETRIES:
+                time.sleep(0.05 * (2 ** attempt))
+                continue
+            print(f"⚠️ Broadcast to {target_connection_id} failed: {code or str(e)}")
+            return 'failed'
+        except Exception as e:
+            print(f"⚠️ Broadcast to {target_connection_id} failed: {str(e)}")
+            return 'failed'
+    return 'failed'
+
+def handle_broadcast(event, connection_id):
+    """
+    Handle admin broadcast to every connected user with a role
+    - Writes one broadcast record to CHAT_MESSAGES (not one row per recipient)
+    - Resolves targets from the role index
+    - Delivers through a concurrent, rate-limited fan-out and returns one summary
+    """
+    body = json.loads(event.get('body', '{}'))
+    sender_id = body.get('senderId')
+    message = body.get('message')
+    target_role = body.get('role', 'customer')
+    
+    if not all([sender_id, message]):
+        return {'statusCode': 400, 'body': 'Missing required fields'}
+    
+    # Only admin connections may broadcast
+    sender_connection = connections_table.get_item(Key={'connectionId': connection_id}).get('Item', {})
+    if sender_connection.get('role') != 'admin' or sender_connection.get('userId') != sender_id:
+        return {'statusCode': 403, 'body': 'Only admins can broadcast'}
+    
+    broadcast_id = str(uuid.uuid4())
+    timestamp = datetime.utcnow().isoformat() + 'Z'
+    
+    messages_table.put_item(
+        Item={
+            'messageId': broadcast_id,
+            'conversationId': f"broadcast_{target_role}",
+            'type': 'broadcast',
+            'senderId': sender_id,
+            'recipientId': f"role:{target_role}",
+            'message': message,
+            'timestamp': timestamp
+        }
+    )
+    
+    targets = {item['connectionId'] for item in get_connections_by_role(target_role)}
+    targets.discard(connection_id)
+    
+    data = json.dumps({
+        'type': 'broadcast',
+        'messageId': broadcast_id,
+        'senderId': sender_id,
+        'message': message,
+        'timestamp': timestamp
+    }).encode('utf-8')
+    
+    apigw_client = get_apigw_client(event)
+    limiter = RateLimiter(BROADCAST_RATE_PER_SECOND)
+    
+    summary = {'delivered': 0, 'gone': 0, 'failed': 0}
+    with ThreadPoolExecutor(max_workers=BROADCAST_CONCURRENCY) as pool:
+        results = pool.map(
+            lambda target: (target, deliver_to_connection(apigw_client, limiter, target, data)),
+            targets
+        )
+        gone_connections = []
+        for target, result in results:
+            summary[result] += 1
+            if result == 'gone':
+                gone_connections.append(target)
+    
+    # Clean up stale connections in one batch
+    if gone_connections:
+        with connections_table.batch_writer() as batch:
+            for target in gone_connections:
+                batch.delete_item(Key={'connectionId': target})
+    
+    summary = {'broadcastId': broadcast_id, 'timestamp': timestamp, 'targets': len(targets), **summary}
+    print(f"✅ Broadcast {broadcast_id}: {summary}")
+    
+    try:
+        apigw_client.post_to_connection(
+            ConnectionId=connection_id,
+            Data=json.dumps({'type': 'broadcastSummary', **summary}).encode('utf-8')
+        )
+    except Exception as e:
+        print(f"❌ Error sending broadcast summary: {str(e)}")
+    
+    return {'statusCode': 200, 'body': json.dumps(summary)}
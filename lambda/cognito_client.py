@@ -0,0 +1,145 @@
+"""
+Shared Cognito client for the auth handlers
+One tuned cognito-idp client per container (timeouts, standard retries,
+keep-alive pool), a memoised SECRET_HASH, and in-process call metrics:
+latency per operation plus throttled and failed attempts, emitted to
+CloudWatch as Embedded Metric Format log lines so auth latency regressions
+show up on a dashboard
+"""
+
+import base64
+import functools
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+
+import boto3
+from botocore.config import Config
+
+CLIENT_ID = os.environ.get('COGNITO_CLIENT_ID')
+CLIENT_SECRET = os.environ.get('COGNITO_CLIENT_SECRET')
+
+# Fail fast instead of holding a login for botocore's 60 s defaults
+COGNITO_CLIENT_CONFIG = Config(
+    connect_timeout=2,
+    read_timeout=5,
+    retries={'max_attempts': 3, 'mode': 'standard'},
+    tcp_keepalive=True,
+    max_pool_connections=int(os.environ.get('COGNITO_MAX_POOL_CONNECTIONS', '10'))
+)
+THROTTLE_ERROR_CODES = ('TooManyRequestsException', 'ThrottlingException', 'LimitExceededException')
+
+METRICS_NAMESPACE = os.environ.get('COGNITO_METRICS_NAMESPACE', 'Restaurant/Cognito')
+METRICS_INTERVAL_SECONDS = int(os.environ.get('COGNITO_METRICS_INTERVAL', '60'))
+# Latency samples kept per operation between emits (EMF accepts up to 100 values)
+LATENCY_SAMPLES = 100
+
+cognito = boto3.client('cognito-idp', config=COGNITO_CLIENT_CONFIG)
+
+# operation -> counters and latency samples since the last emit
+call_metrics = defaultdict(lambda: {
+    'calls': 0, 'errors': 0, 'throttles': 0, 'maxMs': 0.0, 'samples': deque(maxlen=LATENCY_SAMPLES)
+})
+metrics_lock = threading.Lock()
+metrics_emitted_at = time.time()
+
+@functools.lru_cache(maxsize=1)
+def secret_key_hmac():
+    """HMAC keyed with the client secret; copies skip re-deriving the key pads"""
+    return hmac.new(CLIENT_SECRET.encode('utf-8'), digestmod=hashlib.sha256)
+
+@functools.lru_cache(maxsize=4096)
+def generate_secret_hash(username: str) -> str:
+    """SECRET_HASH for a username (Base64 HMAC-SHA256 of username + client id), memoised"""
+    dig = secret_key_hmac().copy()
+    dig.update((username + CLIENT_ID).encode('utf-8'))
+    return base64.b64encode(dig.digest()).decode()
+
+def get_cognito_metrics() -> dict:
+    """Snapshot of the metrics collected since the last emit, per operation"""
+    with metrics_lock:
+        snapshot = {}
+        for operation, metrics in call_metrics.items():
+            samples = sorted(metrics['samples'])
+            snapshot[operation] = {
+                'calls': metrics['calls'],
+                'errors': metrics['errors'],
+                'throttles': metrics['throttles'],
+                'p50Ms': round(samples[len(samples) // 2], 1) if samples else None,
+                'p95Ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1) if samples else None,
+                'maxMs': round(metrics['maxMs'], 1)
+            }
+        return snapshot
+
+def emit_metrics() -> None:
+    """Print one EMF line per operation and start a new interval"""
+    global metrics_emitted_at
+    with metrics_lock:
+        pending = {operation: metrics for operation, metrics in call_metrics.items() if metrics['calls']}
+        call_metrics.clear()
+        metrics_emitted_at = time.time()
+
+    for operation, metrics in pending.items():
+        print(json.dumps({
+            '_aws': {
+                'Timestamp': int(metrics_emitted_at * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': METRICS_NAMESPACE,
+                    'Dimensions': [['Operation']],
+                    'Metrics': [
+                        {'Name': 'Latency', 'Unit': 'Milliseconds'},
+                        {'Name': 'Calls', 'Unit': 'Count'},
+                        {'Name': 'Errors', 'Unit': 'Count'},
+                        {'Name': 'Throttles', 'Unit': 'Count'}
+                    ]
+                }]
+            },
+            'Operation': operation,
+            'Latency': [round(ms, 1) for ms in metrics['samples']],
+            'Calls': metrics['calls'],
+            'Errors': metrics['errors'],
+            'Throttles': metrics['throttles']
+        }))
+
+def record_call(operation: str, elapsed_ms: float, failed: bool) -> None:
+    with metrics_lock:
+        metrics = call_metrics[operation]
+        metrics['calls'] += 1
+        metrics['errors'] += int(failed)
+        metrics['maxMs'] = max(metrics['maxMs'], elapsed_ms)
+        metrics['samples'].append(elapsed_ms)
+        due = time.time() - metrics_emitted_at >= METRICS_INTERVAL_SECONDS
+    if due:
+        emit_metrics()
+
+def start_timer(model, context, **kwargs):
+    context['cognito_started'] = time.perf_counter()
+    # after-call-error is emitted without the model, so the operation travels in the context
+    context['cognito_operation'] = model.name
+
+def finish_timer(context, http_response=None, exception=None, **kwargs):
+    started = context.get('cognito_started')
+    if started is None:
+        return
+    failed = exception is not None or (http_response is not None and http_response.status_code >= 300)
+    record_call(context['cognito_operation'], (time.perf_counter() - started) * 1000, failed)
+
+def count_throttle(operation, response=None, **kwargs):
+    """Every throttled attempt counts, including ones the retry handler recovers from"""
+    if response is None:
+        return None
+    error_code = response[1].get('Error', {}).get('Code')
+    if error_code in THROTTLE_ERROR_CODES:
+        with metrics_lock:
+            call_metrics[operation.name]['throttles'] += 1
+    return None
+
+service_id = cognito.meta.service_model.service_id.hyphenize()
+cognito.meta.events.register(f'before-call.{service_id}', start_timer)
+cognito.meta.events.register(f'after-call.{service_id}', finish_timer)
+cognito.meta.events.register(f'after-call-error.{service_id}', finish_timer)
+cognito.meta.events.register_first(f'needs-retry.{service_id}', count_throttle)
@@ -0,0 +1,86 @@
+"""
+Paginated DynamoDB scan helpers
+A single scan() call stops at 1 MB; these follow LastEvaluatedKey so listings
+never silently drop items, optionally across parallel segments
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+# Parallel segments used by scan_all when the caller does not choose
+SCAN_SEGMENTS = int(os.environ.get('SCAN_SEGMENTS', '1'))
+
+def build_projection(fields: Sequence[str]) -> Dict[str, Any]:
+    """
+    Build ProjectionExpression kwargs, aliasing every field so reserved words
+    (status, date, time, name...) are safe
+    """
+    names = {f'#p{i}': field for i, field in enumerate(fields)}
+    return {
+        'ProjectionExpression': ', '.join(names.keys()),
+        'ExpressionAttributeNames': names
+    }
+
+def merge_scan_kwargs(scan_kwargs: Optional[dict], fields: Optional[Sequence[str]]) -> dict:
+    """Combine caller scan kwargs with a projection"""
+    kwargs = dict(scan_kwargs or {})
+    if fields:
+        projection = build_projection(fields)
+        kwargs['ProjectionExpression'] = projection['ProjectionExpression']
+        kwargs['ExpressionAttributeNames'] = {
+            **kwargs.get('ExpressionAttributeNames', {}),
+            **projection['ExpressionAttributeNames']
+        }
+    return kwargs
+
+def iter_scan(table, fields: Optional[Sequence[str]] = None, segment: Optional[int] = None,
+              total_segments: Optional[int] = None, **scan_kwargs) -> Iterator[dict]:
+    """
+    Stream every item of a table (or one segment), page by page
+
+    Args:
+        table: boto3 DynamoDB Table resource
+        fields: Attributes to read (ProjectionExpression), None for all
+        segment / total_segments: Parallel scan segment to read
+        **scan_kwargs: Extra scan arguments (FilterExpression, ...)
+
+    Yields:
+        Items as returned by DynamoDB
+    """
+    kwargs = merge_scan_kwargs(scan_kwargs, fields)
+    if total_segments:
+        kwargs['Segment'] = segment
+        kwargs['TotalSegments'] = total_segments
+
+    while True:
+        response = table.scan(**kwargs)
+        yield from response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def scan_all(table, fields: Optional[Sequence[str]] = None, segments: Optional[int] = None,
+             **scan_kwargs) -> List[dict]:
+    """
+    Read every item of a table into a list
+
+    Args:
+        table: boto3 DynamoDB Table resource
+        fields: Attributes to read (ProjectionExpression), None for all
+        segments: Number of parallel scan segments (defaults to SCAN_SEGMENTS, 1 = sequential)
+        **scan_kwargs: Extra scan arguments (FilterExpression, ...)
+
+    Returns:
+        All matching items
+    """
+    segments = segments or SCAN_SEGMENTS
+    if segments <= 1:
+        return list(iter_scan(table, fields, **scan_kwargs))
+
+    def read_segment(segment):
+        return list(iter_scan(table, fields, segment=segment, total_segments=segments, **scan_kwargs))
+
+    with ThreadPoolExecutor(max_workers=segments) as pool:
+        results = pool.map(read_segment, range(segments))
+    return [item for segment_items in results for item in segment_items]
@@ -0,0 +1,120 @@
+"""
+Conditional GET support for public listing endpoints
+Serves ETag / Cache-Control headers from a Redis content version and answers
+If-None-Match with 304 without touching DynamoDB
+
+Writers call content_changed() to bump the version. If that bump is lost (a
+Redis blip), the version would keep validating stale bodies, so every rebuilt
+body is checked against the digest first recorded for its version: a
+mismatch bumps the version. Snapshots are rebuilt at least every
+SNAPSHOT_MAX_AGE seconds, which bounds how long a lost bump goes unnoticed
+"""
+
+import hashlib
+import os
+import time
+from typing import Callable, Optional
+
+from redis_cache import bump_content_version, claim_version_digest, get_content_version
+
+DEFAULT_CACHE_CONTROL = 'public, max-age=60, must-revalidate'
+SNAPSHOT_MAX_AGE = int(os.environ.get('SNAPSHOT_MAX_AGE', '60'))
+
+# Last rendered body per resource: name -> {'version', 'body', 'builtAt'}
+snapshots = {}
+
+def get_if_none_match(event: dict) -> Optional[str]:
+    """Read If-None-Match from REST API (v1) or HTTP API (v2) headers"""
+    headers = event.get('headers') or {}
+    for key, value in headers.items():
+        if key.lower() == 'if-none-match':
+            return value
+    return None
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value (may be a list or '*') against an ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates or f'W/{etag}' in candidates
+
+def body_digest(body: str) -> str:
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()[:32]
+
+def content_changed(name: str) -> Optional[int]:
+    """
+    Bump a resource's content version after a write
+
+    Returns:
+        New version, or None if the bump failed (the local snapshot is dropped;
+        other containers notice through the digest check)
+    """
+    version = bump_content_version(name)
+    if version is None:
+        snapshots.pop(name, None)
+        print(f"⚠️ Content version bump failed for {name}, cached ETags may lag up to {SNAPSHOT_MAX_AGE}s")
+    return version
+
+def conditional_get(event: dict, name: str, build_body: Callable[[], str], headers: dict,
+                    cache_control: str = DEFAULT_CACHE_CONTROL) -> dict:
+    """
+    Build a GET response with ETag validation
+
+    Args:
+        event: API Gateway event
+        name: Resource name, also the content version key (e.g. "menu")
+        build_body: Function that reads DynamoDB and returns the JSON body
+        headers: Base response headers (CORS)
+        cache_control: Cache-Control header value
+
+    Returns:
+        API Gateway response (200 with body, or 304 without)
+    """
+    if_none_match = get_if_none_match(event)
+    version = get_content_version(name)
+
+    if version is not None:
+        snapshot = snapshots.get(name)
+        if snapshot and snapshot['version'] == version and time.time() - snapshot['builtAt'] < SNAPSHOT_MAX_AGE:
+            body = snapshot['body']
+        else:
+            body = build_body()
+            digest = body_digest(body)
+            recorded = claim_version_digest(name, version, digest)
+            if recorded is not None and recorded != digest:
+                # The content changed without a version bump (lost bump): bump it now
+                version = bump_content_version(name) or version
+                claim_version_digest(name, version, digest)
+            snapshots[name] = {'version': version, 'body': body, 'builtAt': time.time()}
+
+        etag = f'"{name}-{version}"'
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, headers, cache_control)
+    else:
+        # Redis unavailable: fall back to a content hash (saves bandwidth, not the read)
+        body = build_body()
+        etag = '"' + body_digest(body) + '"'
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag, headers, cache_control)
+
+    return {
+        'statusCode': 200,
+        'headers': {**headers, **validator_headers(etag, cache_control)},
+        'body': body
+    }
+
+def not_modified(etag: str, headers: dict, cache_control: str) -> dict:
+    """304 response with validator headers and no body"""
+    return {
+        'statusCode': 304,
+        'headers': {**headers, **validator_headers(etag, cache_control)},
+        'body': ''
+    }
+
+def validator_headers(etag: str, cache_control: str) -> dict:
+    """ETag and Cache-Control headers, exposed to browser CORS clients"""
+    return {
+        'ETag': etag,
+        'Cache-Control': cache_control,
+        'Access-Control-Expose-Headers': 'ETag'
+    }
@@ -0,0 +1,609 @@
+"""
+Shared image upload subsystem behind upload_image_handler and lambda_image_upload
+One module-level S3 client, content-type detection from magic bytes and
+configurable size/type limits; both Lambda entry points are thin wrappers
+"""
+
+import boto3
+import base64
+import binascii
+import hashlib
+import io
+import json
+import os
+import re
+from botocore.config import Config
+from datetime import datetime, timedelta, timezone
+from auth_middleware import get_bearer_token, resolve_principal
+from botocore.exceptions import ClientError
+from image_variants import PENDING_PREFIX, create_variants, variant_keys
+from token_verifier import TokenError
+
+BUCKET_NAME = os.environ.get('IMAGE_BUCKET', 'brewcraft-images')
+# Point at a local S3 stand-in (MinIO, moto server) for testing
+S3_ENDPOINT_URL = os.environ.get('S3_ENDPOINT_URL') or None
+MAX_UPLOAD_BYTES = int(os.environ.get('MAX_UPLOAD_BYTES', str(10 * 1024 * 1024)))
+PRESIGN_EXPIRES_SECONDS = int(os.environ.get('PRESIGN_EXPIRES_SECONDS', '300'))
+SUPPORTED_CONTENT_TYPES = ('image/jpeg', 'image/png', 'image/webp', 'image/gif')
+# Comma-separated subset of SUPPORTED_CONTENT_TYPES, e.g. "image/jpeg,image/png"
+ALLOWED_CONTENT_TYPES = tuple(
+    t.strip() for t in os.environ.get('ALLOWED_CONTENT_TYPES', ','.join(SUPPORTED_CONTENT_TYPES)).split(',')
+    if t.strip() in SUPPORTED_CONTENT_TYPES
+)
+
+# Streaming base64 upload: decode on demand, multipart above the threshold
+DECODE_CHUNK_CHARS = 256 * 1024  # multiple of 4, decodes to 192 KB
+MULTIPART_THRESHOLD = int(os.environ.get('MULTIPART_THRESHOLD', str(8 * 1024 * 1024)))
+MULTIPART_PART_SIZE = max(int(os.environ.get('MULTIPART_PART_SIZE', str(8 * 1024 * 1024))), 5 * 1024 * 1024)
+
+# Content-addressed keys: images/<sha256><ext>, never overwritten, cacheable forever
+CONTENT_PREFIX = 'images/'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+EXTENSIONS = {'image/jpeg': '.jpg', 'image/png': '.png', 'image/webp': '.webp', 'image/gif': '.gif'}
+
+# Presigned uploads never completed are swept from PENDING_PREFIX after this long
+PENDING_MAX_AGE_SECONDS = int(os.environ.get('PENDING_MAX_AGE_SECONDS', str(24 * 3600)))
+
+# Build thumbnails/WebP during the request; set to false when the S3 trigger does it
+IMAGE_VARIANTS_INLINE = os.environ.get('IMAGE_VARIANTS_INLINE', 'true').lower() == 'true'
+
+# S3 client (reuse across Lambda invocations)
+s3 = boto3.client(
+    's3',
+    endpoint_url=S3_ENDPOINT_URL,
+    config=Config(
+        signature_version='s3v4',
+        tcp_keepalive=True,
+        retries={'mode': 'standard', 'max_attempts': 3}
+    )
+)
+
+# CORS headers
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Content-Type,Authorization',
+    'Access-Control-Allow-Methods': 'POST,OPTIONS'
+}
+
+def handle_upload(event):
+    """
+    Handle an upload request (API Gateway REST or HTTP API event)
+
+    Body is one of:
+        { "action": "presign", ... }  -> presigned POST for a direct browser upload
+        { "action": "complete", ... } -> verify and publish a presigned upload
+        { "file": "<base64>", "fileName": "..." } -> upload through the Lambda
+
+    Every action requires a bearer token
+    """
+    # Log without the body: it can hold megabytes of base64
+    print("EVENT:", json.dumps({k: v for k, v in event.items() if k != 'body'}, default=str))
+    
+    # Handle OPTIONS for CORS preflight
+    http_method = event.get("httpMethod") or event.get("requestContext", {}).get("http", {}).get("method", "POST")
+    if http_method == "OPTIONS":
+        return {
+            'statusCode': 200,
+            'headers': CORS_HEADERS,
+            'body': ''
+        }
+    
+    try:
+        # Parse body if it's a string (HTTP API v2)
+        body = event.get('body', '{}')
+        if isinstance(body, str):
+            body = json.loads(body)
+        
+        # Every action writes to the bucket, so anonymous callers get nothing
+        if authenticated(event) is None:
+            return {
+                'statusCode': 401,
+                'headers': CORS_HEADERS,
+                'body': json.dumps({'error': 'Missing or invalid authorization header'})
+            }
+
+        # Direct-to-S3 flow: presign, browser uploads, then complete
+        action = body.get('action')
+        if action == 'presign':
+            return create_presigned_upload(body)
+        if action == 'complete':
+            return complete_presigned_upload(body)
+
+        return upload_base64(body)
+    except Exception as e:
+        print(f"ERROR: {str(e)}")
+        return {
+            'statusCode': 500,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({'error': str(e)})
+        }
+
+def authenticated(event):
+    """Verified caller of an upload action, or None"""
+    token = get_bearer_token(event)
+    if not token:
+        return None
+    try:
+        return resolve_principal(token)
+    except TokenError as e:
+        print(f"❌ Token rejected: {str(e)}")
+        return None
+
+def upload_base64(body):
+    """
+    Upload a base64-encoded image sent through the Lambda
+    Body: { "file": "<base64>", "fileName": "latte.jpg" }
+    """
+    file_data = body.get('file')
+    file_name = body.get('fileName')
+
+    if not file_data or not file_name:
+        return {
+            'statusCode': 400,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({'error': 'Missing file or fileName'})
+        }
+
+    # MIME-style base64 wraps lines; b64decode(validate=True) would reject the breaks
+    file_data = strip_whitespace(file_data)
+
+    if base64_decoded_size(file_data) > MAX_UPLOAD_BYTES:
+        return {
+            'statusCode': 413,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({'error': f'File exceeds {MAX_UPLOAD_BYTES} bytes'})
+        }
+
+    # Content type comes from the bytes, not the file name
+    try:
+        content_type = detect_content_type(next(iter_base64_chunks(file_data), b''))
+    except ValueError:
+        return {
+            'statusCode': 400,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({'error': 'file is not valid base64'})
+        }
+    if content_type not in ALLOWED_CONTENT_TYPES:
+        return {
+            'statusCode': 400,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({'error': f'Unsupported image type. Allowed: {", ".join(ALLOWED_CONTENT_TYPES)}'})
+        }
+
+    # Store under the content digest; identical bytes are uploaded once
+    digest = base64_sha256(file_data)
+    key = content_key(digest, content_type)
+
+    if object_exists(key):
+        print(f"Duplicate upload skipped: {key}")
+        variants = {name: public_url(variant_key) for name, variant_key in variant_keys(key).items()}
+        deduplicated = True
+    else:
+        # Decode base64 while uploading to S3 (multipart for large files)
+        decoded = stream_base64_upload(s3, BUCKET_NAME, key, file_data, content_type)
+        variants = build_variants(key, decoded)
+        deduplicated = False
+
+    return {
+        'statusCode': 200,
+        'headers': CORS_HEADERS,
+        'body': json.dumps({
+            'message': 'File uploaded successfully!',
+            'url': public_url(key),
+            'fileName': file_name,
+            'key': key,
+            'sha256': digest,
+            'contentType': content_type,
+            'deduplicated': deduplicated,
+            'variants': variants
+        })
+    }
+
+def detect_content_type(header):
+    """
+    Identify an image from its leading bytes
+
+    Returns:
+        MIME type, or None if the bytes are not a supported image
+    """
+    if header.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if header.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if header[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif'
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+def strip_whitespace(data):
+    """Remove line breaks and spaces from a base64 string (copied only if it has any)"""
+    return re.sub(r'\s+', '', data) if re.search(r'\s', data) else data
+
+class Base64Reader(io.RawIOBase):
+    """
+    Seekable read-only file over the decoded bytes of a base64 string
+    Each read decodes only the 4-character groups it covers
+    """
+
+    def __init__(self, data):
+        if len(data) % 4:
+            raise ValueError('Invalid base64 payload length')
+        self.data = data
+        self.size = base64_decoded_size(data)
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self.position = max(0, offset)
+        return self.position
+
+    def readinto(self, buffer):
+        end = min(self.position + len(buffer), self.size)
+        written = 0
+        with memoryview(buffer).cast('B') as target:
+            # Decode at most DECODE_CHUNK_CHARS of base64 at a time, however large the buffer
+            while self.position < end:
+                first_group = self.position // 3
+                last_group = min(-(-end // 3), first_group + DECODE_CHUNK_CHARS // 4)
+                decoded = memoryview(base64.b64decode(self.data[first_group * 4:last_group * 4], validate=True))
+                chunk = decoded[self.position - first_group * 3:min(end, last_group * 3) - first_group * 3]
+                target[written:written + len(chunk)] = chunk
+                written += len(chunk)
+                self.position += len(chunk)
+        return written
+
+def open_base64(data):
+    """Buffered file object over a base64 string's decoded bytes"""
+    return io.BufferedReader(Base64Reader(data), buffer_size=DECODE_CHUNK_CHARS // 4 * 3)
+
+def iter_base64_chunks(data, chunk_chars=DECODE_CHUNK_CHARS):
+    """Decode a base64 string piece by piece, never holding the whole decoded payload"""
+    if len(data) % 4:
+        raise ValueError('Invalid base64 payload length')
+    for start in range(0, len(data), chunk_chars):
+        yield base64.b64decode(data[start:start + chunk_chars], validate=True)
+
+def fill_buffer(reader, buffer):
+    """
+    readinto() a preallocated buffer one decode chunk at a time
+
+    Returns:
+        Bytes read; less than len(buffer) only at the end of the stream
+    """
+    filled = 0
+    step = DECODE_CHUNK_CHARS // 4 * 3
+    with memoryview(buffer) as view:
+        while filled < len(buffer):
+            count = reader.readinto(view[filled:filled + step])
+            if not count:
+                break
+            filled += count
+    return filled
+
+def base64_decoded_size(data):
+    """Size of the decoded payload, without decoding it"""
+    return len(data) // 4 * 3 - data[-2:].count('=')
+
+def base64_sha256(data):
+    """SHA-256 hex digest of a base64 payload, decoded chunk by chunk"""
+    sha = hashlib.sha256()
+    for chunk in iter_base64_chunks(data):
+        sha.update(chunk)
+    return sha.hexdigest()
+
+def content_key(digest, content_type, prefix=CONTENT_PREFIX):
+    """Content-addressed object key for a SHA-256 hex digest"""
+    return f"{prefix}{digest}{EXTENSIONS.get(content_type, '')}"
+
+def object_exists(key):
+    """HEAD check for an existing object in the image bucket"""
+    try:
+        s3.head_object(Bucket=BUCKET_NAME, Key=key)
+        return True
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+            return False
+        raise
+
+def stream_base64_upload(s3, bucket, key, data, content_type):
+    """
+    Upload a base64 string to S3 without decoding it in one piece
+    Small files use a single put_object that reads a decoding file object;
+    anything above MULTIPART_THRESHOLD goes through multipart upload, filling
+    one reused MULTIPART_PART_SIZE buffer in DECODE_CHUNK_CHARS slices. Both
+    carry S3 SHA-256 checksums (per part for multipart), so S3 verifies every
+    byte it stores
+
+    Returns:
+        A seekable file object over the decoded bytes (rewound), e.g. for variants
+    """
+    decoded = open_base64(data)
+    decoded_size = base64_decoded_size(data)
+    if decoded_size <= MULTIPART_THRESHOLD:
+        s3.put_object(
+            Bucket=bucket,
+            Key=key,
+            Body=decoded,
+            ContentLength=decoded_size,
+            ChecksumAlgorithm='SHA256',
+            ContentType=content_type,
+            CacheControl=IMMUTABLE_CACHE_CONTROL,
+            ACL='public-read'  # Make publicly accessible
+        )
+        decoded.seek(0)
+        return decoded
+
+    upload = s3.create_multipart_upload(
+        Bucket=bucket,
+        Key=key,
+        ChecksumAlgorithm='SHA256',
+        ContentType=content_type,
+        CacheControl=IMMUTABLE_CACHE_CONTROL,
+        ACL='public-read'
+    )
+    upload_id = upload['UploadId']
+    parts = []
+
+    body = bytearray(MULTIPART_PART_SIZE)
+
+    try:
+        while True:
+            size = fill_buffer(decoded, body)
+            if not size:
+                break
+            if size < len(body):
+                # Short read only happens on the last part
+                del body[size:]
+            part_number = len(parts) + 1
+            checksum = base64.b64encode(hashlib.sha256(body).digest()).decode()
+            response = s3.upload_part(
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=body,
+                ChecksumSHA256=checksum
+            )
+            parts.append({'ETag': response['ETag'], 'PartNumber': part_number, 'ChecksumSHA256': checksum})
+        s3.complete_multipart_upload(
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={'Parts': parts}
+        )
+    except Exception:
+        s3.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
+
+    print(f"✅ Multipart upload {key}: {len(parts)} parts")
+    decoded.seek(0)
+    return decoded
+
+def public_url(key):
+    """Public URL of an object in the image bucket"""
+    if S3_ENDPOINT_URL:
+        return f"{S3_ENDPOINT_URL.rstrip('/')}/{BUCKET_NAME}/{key}"
+    return f'https://{BUCKET_NAME}.s3.amazonaws.com/{key}'
+
+def build_variants(key, data=None):
+    """
+    Generate thumbnails and WebP for an upload (or leave it to the S3 trigger)
+    Returns variant name -> URL; keys are predictable, so URLs are returned either way
+    """
+    if IMAGE_VARIANTS_INLINE:
+        try:
+            written = create_variants(BUCKET_NAME, key, data)
+            return {name: public_url(variant_key) for name, variant_key in written.items()}
+        except Exception as e:
+            print(f"⚠️ Variant generation failed: {str(e)}")
+            return {}
+    return {name: public_url(variant_key) for name, variant_key in variant_keys(key).items()}
+
+def parse_sha256(value):
+    """Accept a SHA-256 digest as hex or base64; return (hex, base64) or None"""
+    if not isinstance(value, str):
+        return None
+    try:
+        if re.fullmatch(r'[0-9a-fA-F]{64}', value):
+            raw = bytes.fromhex(value)
+        else:
+            raw = base64.b64decode(value, validate=True)
+    except (ValueError, binascii.Error):
+        return None
+    if len(raw) != 32:
+        return None
+    return raw.hex(), base64.b64encode(raw).decode()
+
+def create_presigned_upload(body):
+    """
+    Return a presigned POST so the browser uploads the image straight to S3
+    The upload lands under PENDING_PREFIX and is only published to its
+    content-digest key by the complete action; if that key already exists no
+    upload is needed
+    Body: { "action": "presign", "fileName": "...", "contentType": "image/png",
+            "size": 12345, "sha256": "<hex or base64 digest>" }
+    """
+    content_type = body.get('contentType')
+    size = body.get('size')
+    digest = parse_sha256(body.get('sha256'))
+
+    if content_type not in ALLOWED_CONTENT_TYPES:
+        return {
+            'statusCode': 400,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({'error': f'Unsupported content type. Allowed: {", ".join(ALLOWED_CONTENT_TYPES)}'})
+        }
+    if not isinstance(size, int) or size <= 0 or size > MAX_UPLOAD_BYTES:
+        return {
+            'statusCode': 400,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({'error': f'size must be between 1 and {MAX_UPLOAD_BYTES} bytes'})
+        }
+    if digest is None:
+        return {
+            'statusCode': 400,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({'error': 'sha256 of the file is required'})
+        }
+
+    digest_hex, digest_b64 = digest
+    key = content_key(digest_hex, content_type)
+    pending_key = content_key(digest_hex, content_type, PENDING_PREFIX)
+
+    if object_exists(key):
+        return {
+            'statusCode': 200,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({
+                'exists': True,
+                'key': key,
+                'url': public_url(key),
+                'variants': {name: public_url(variant_key) for name, variant_key in variant_keys(key).items()}
+            })
+        }
+
+    # S3 enforces type, size and the checksum (so the key matches the bytes) at upload time
+    presigned = s3.generate_presigned_post(
+        Bucket=BUCKET_NAME,
+        Key=pending_key,
+        Fields={
+            'Content-Type': content_type,
+            'Cache-Control': IMMUTABLE_CACHE_CONTROL,
+            'acl': 'public-read',
+            'x-amz-checksum-sha256': digest_b64
+        },
+        Conditions=[
+            {'acl': 'public-read'},
+            {'Content-Type': content_type},
+            {'Cache-Control': IMMUTABLE_CACHE_CONTROL},
+            {'x-amz-checksum-sha256': digest_b64},
+            ['content-length-range', 1, MAX_UPLOAD_BYTES]
+        ],
+        ExpiresIn=PRESIGN_EXPIRES_SECONDS
+    )
+
+    return {
+        'statusCode': 200,
+        'headers': CORS_HEADERS,
+        'body': json.dumps({
+            'exists': False,
+            'upload': presigned,
+            'key': pending_key,
+            'url': public_url(key),
+            'expiresIn': PRESIGN_EXPIRES_SECONDS
+        })
+    }
+
+def complete_presigned_upload(body):
+    """
+    Confirm a presigned upload landed and matches the limits and its digest,
+    then copy it to its content-addressed key
+    Only keys under PENDING_PREFIX (issued by presign) are accepted, so
+    published images can never be touched through this action
+    Body: { "action": "complete", "key": "pending/<sha256>.png" }
+    """
+    key = body.get('key', '')
+    match = re.fullmatch(re.escape(PENDING_PREFIX) + r'([0-9a-f]{64})(\.[a-z]+)?', key)
+    if not match:
+        return {
+            'statusCode': 400,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({'error': 'Invalid upload key'})
+        }
+
+    try:
+        head = s3.head_object(Bucket=BUCKET_NAME, Key=key, ChecksumMode='ENABLED')
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+            return {
+                'statusCode': 404,
+                'headers': CORS_HEADERS,
+                'body': json.dumps({'error': 'Upload not found'})
+            }
+        raise
+
+    # The declared Content-Type must match what the bytes actually are
+    header = s3.get_object(Bucket=BUCKET_NAME, Key=key, Range='bytes=0-15')['Body'].read()
+
+    expected_checksum = base64.b64encode(bytes.fromhex(match.group(1))).decode()
+    checksum = head.get('ChecksumSHA256')
+    if (head.get('ContentType') not in ALLOWED_CONTENT_TYPES
+            or detect_content_type(header) != head.get('ContentType')
+            or head.get('ContentLength', 0) > MAX_UPLOAD_BYTES
+            or (checksum and checksum != expected_checksum)):
+        s3.delete_object(Bucket=BUCKET_NAME, Key=key)
+        return {
+            'statusCode': 400,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({'error': 'Uploaded object violates type, size or checksum limits'})
+        }
+    if not checksum:
+        # presign makes S3 require the checksum, so this object didn't come from it
+        return {
+            'statusCode': 400,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({'error': 'Upload has no SHA-256 checksum'})
+        }
+
+    # Publish under the digest key (S3 keeps type and cache headers on copy)
+    image_key = content_key(match.group(1), head['ContentType'])
+    if not object_exists(image_key):
+        s3.copy_object(
+            Bucket=BUCKET_NAME,
+            Key=image_key,
+            CopySource={'Bucket': BUCKET_NAME, 'Key': key},
+            ChecksumAlgorithm='SHA256',
+            ACL='public-read'
+        )
+    s3.delete_object(Bucket=BUCKET_NAME, Key=key)
+
+    return {
+        'statusCode': 200,
+        'headers': CORS_HEADERS,
+        'body': json.dumps({
+            'message': 'File uploaded successfully!',
+            'url': public_url(image_key),
+            'key': image_key,
+            'size': head.get('ContentLength'),
+            'contentType': head.get('ContentType'),
+            'variants': build_variants(image_key)
+        })
+    }
+
+def sweep_pending_uploads(max_age_seconds=PENDING_MAX_AGE_SECONDS):
+    """
+    Delete presigned uploads that were never completed
+    complete removes its pending object, so anything under PENDING_PREFIX older
+    than a presigned POST can still be used is abandoned
+
+    Returns:
+        Number of objects deleted
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=max(max_age_seconds, PRESIGN_EXPIRES_SECONDS))
+    deleted = 0
+
+    for page in s3.get_paginator('list_objects_v2').paginate(Bucket=BUCKET_NAME, Prefix=PENDING_PREFIX):
+        stale = [{'Key': obj['Key']} for obj in page.get('Contents', []) if obj['LastModified'] < cutoff]
+        if not stale:
+            continue
+        # A page holds at most 1000 keys, the delete_objects limit
+        response = s3.delete_objects(Bucket=BUCKET_NAME, Delete={'Objects': stale, 'Quiet': True})
+        for error in response.get('Errors', []):
+            print(f"❌ Could not delete {error.get('Key')}: {error.get('Message')}")
+        deleted += len(stale) - len(response.get('Errors', []))
+
+    print(f"✅ Swept {deleted} abandoned uploads from {PENDING_PREFIX}")
+    return deleted
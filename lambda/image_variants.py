@@ -0,0 +1,143 @@
+"""
+Image derivative pipeline for uploaded menu and avatar images
+Produces fixed-width thumbnails and a WebP variant with metadata stripped,
+stored next to the original under predictable keys:
+
+    uploads/abc/latte.jpg       -> original
+    uploads/abc/latte.w320.jpg  -> thumbnail (JPEG)
+    uploads/abc/latte.w640.jpg  -> thumbnail (JPEG)
+    uploads/abc/latte.full.webp -> WebP, at most MAX_WEBP_WIDTH wide
+
+Runs inline from image_upload or as an S3 ObjectCreated trigger.
+Requires Pillow (Lambda layer); without it processing is skipped.
+"""
+
+import boto3
+import io
+import os
+from urllib.parse import unquote_plus
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow layer not attached
+    Image = None
+
+THUMBNAIL_WIDTHS = (320, 640)
+MAX_WEBP_WIDTH = int(os.environ.get('MAX_WEBP_WIDTH', '1600'))
+JPEG_QUALITY = 82
+WEBP_QUALITY = 80
+VARIANT_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Presigned uploads land here until image_upload verifies and publishes them
+PENDING_PREFIX = 'pending/'
+
+# S3 client (reuse across Lambda invocations)
+s3 = boto3.client('s3', endpoint_url=os.environ.get('S3_ENDPOINT_URL') or None)
+
+def split_key(key):
+    """Split an object key into stem and extension"""
+    stem, ext = os.path.splitext(key)
+    return stem, ext.lower()
+
+def is_variant_key(key):
+    """True for keys produced by this pipeline (prevents S3 trigger loops)"""
+    stem, _ = split_key(key)
+    return stem.endswith('.full') or any(stem.endswith(f'.w{width}') for width in THUMBNAIL_WIDTHS)
+
+def variant_keys(key):
+    """Predictable variant keys for an original key"""
+    stem, _ = split_key(key)
+    keys = {f'w{width}': f'{stem}.w{width}.jpg' for width in THUMBNAIL_WIDTHS}
+    keys['webp'] = f'{stem}.full.webp'
+    return keys
+
+def resize_to_width(image, width):
+    """Resize keeping aspect ratio; never upscale"""
+    if image.width <= width:
+        return image.copy()
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.LANCZOS)
+
+def encode(image, fmt, quality):
+    """Encode without EXIF/ICC/XMP metadata"""
+    buffer = io.BytesIO()
+    if fmt == 'JPEG':
+        if image.mode not in ('RGB', 'L'):
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.convert('RGBA').split()[-1])
+            image = background
+        image.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+    else:
+        image.save(buffer, 'WEBP', quality=quality, method=4)
+    return buffer.getvalue()
+
+def render_variants(data):
+    """
+    Render every variant from the original bytes or a seekable file object
+
+    Returns:
+        Dict of variant name -> (bytes, content type), empty if Pillow is unavailable
+    """
+    if Image is None:
+        print("⚠️ Pillow not available, skipping image variants")
+        return {}
+
+    with Image.open(data if hasattr(data, 'read') else io.BytesIO(data)) as original:
+        original.seek(0)  # first frame of animated images
+        # Apply EXIF orientation before the metadata is dropped
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA', 'L'):
+            image = image.convert('RGBA' if 'transparency' in original.info else 'RGB')
+
+        variants = {}
+        for width in THUMBNAIL_WIDTHS:
+            variants[f'w{width}'] = (encode(resize_to_width(image, width), 'JPEG', JPEG_QUALITY), 'image/jpeg')
+        variants['webp'] = (encode(resize_to_width(image, MAX_WEBP_WIDTH), 'WEBP', WEBP_QUALITY), 'image/webp')
+        return variants
+
+def create_variants(bucket, key, data=None):
+    """
+    Render and store variants for an uploaded image
+
+    Args:
+        bucket: S3 bucket
+        key: Original object key
+        data: Original bytes (or a seekable file object) if already at hand,
+            otherwise read from S3
+
+    Returns:
+        Dict of variant name -> object key for the variants written
+    """
+    if data is None:
+        data = s3.get_object(Bucket=bucket, Key=key)['Body'].read()
+
+    keys = variant_keys(key)
+    written = {}
+    for name, (body, content_type) in render_variants(data).items():
+        s3.put_object(
+            Bucket=bucket,
+            Key=keys[name],
+            Body=body,
+            ContentType=content_type,
+            CacheControl=VARIANT_CACHE_CONTROL,
+            ACL='public-read'
+        )
+        written[name] = keys[name]
+
+    if written:
+        print(f"✅ Variants for {key}: {', '.join(written.values())}")
+    return written
+
+def lambda_handler(event, context):
+    """S3 ObjectCreated trigger: build variants for new originals"""
+    processed = 0
+    for record in event.get('Records', []):
+        bucket = record['s3']['bucket']['name']
+        key = unquote_plus(record['s3']['object']['key'])
+        if is_variant_key(key) or key.startswith(PENDING_PREFIX):
+            continue
+        try:
+            create_variants(bucket, key)
+            processed += 1
+        except Exception as e:
+            print(f"❌ Variant generation failed for {key}: {str(e)}")
+    return {'statusCode': 200, 'processed': processed}
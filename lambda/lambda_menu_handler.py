@@ -1,16 +1,44 @@
 import boto3
+import copy
 import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
+from boto3.dynamodb.types import TypeSerializer
+from botocore.exceptions import ClientError
+from auth_middleware import require_auth
+from dynamo_scan import scan_all
+from http_cache import conditional_get, content_changed
+from menu_index import get_menu_index
 
 # Initialize DynamoDB resource
 dynamodb = boto3.resource('dynamodb')
 table = dynamodb.Table('MENU_TABLES')
 
+# Bulk import settings (BatchWriteItem accepts at most 25 items per request)
+BATCH_WRITE_SIZE = 25
+BATCH_WRITE_WORKERS = 4
+BATCH_WRITE_MAX_RETRIES = 5
+# Tries at storing backfilled dish ids while other writers keep changing the list
+DISH_ID_BACKFILL_ATTEMPTS = 3
+
+serializer = TypeSerializer()
+
+# Query string parameters served from the in-memory menu index
+SEARCH_PARAMS = ('categoryId', 'q', 'minPrice', 'maxPrice', 'tag')
+
+# Attributes the menu pages read from each category
+MENU_LIST_FIELDS = ('id', 'title', 'dishes')
+
+# Dish fields that a dish-level patch may set
+DISH_FIELDS = ('name', 'description', 'price', 'image', 'tags')
+
 # CORS headers
 CORS_HEADERS = {
     'Access-Control-Allow-Origin': '*',
-    'Access-Control-Allow-Headers': 'Content-Type',
-    'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS'
+    'Access-Control-Allow-Headers': 'Content-Type,Authorization,If-None-Match',
+    'Access-Control-Allow-Methods': 'GET,POST,PUT,PATCH,DELETE,OPTIONS'
 }
 
 def decimal_to_native(obj):
@@ -33,6 +61,7 @@ def convert_to_decimal(data):
         return Decimal(str(data))
     return data
 
+@require_auth(CORS_HEADERS, admin_methods=('POST', 'PUT', 'PATCH', 'DELETE'), public_methods=('GET',))
 def lambda_handler(event, context):
     # Handle OPTIONS for CORS preflight
     if event.get("httpMethod") == "OPTIONS":
@@ -47,13 +76,19 @@ def lambda_handler(event, context):
         http_method = event.get("httpMethod") or event.get("requestContext", {}).get("http", {}).get("method", "GET")
 
         if http_method == "GET":
-            return get_menu_items()
+            query_params = event.get("queryStringParameters") or {}
+            if any(query_params.get(key) for key in SEARCH_PARAMS):
+                return search_menu_items(query_params)
+            return get_menu_items(event)
         elif http_method == "POST":
             body = json.loads(event.get("body", "{}"))
             return create_food_item(body)
         elif http_method == "PUT":
             body = json.loads(event.get("body", "{}"))
             return update_food_item(body)
+        elif http_method == "PATCH":
+            body = json.loads(event.get("body", "{}"))
+            return patch_dish(body)
         elif http_method == "DELETE":
             body = json.loads(event.get("body", "{}"))
             return delete_food_item(body)
@@ -70,14 +105,58 @@ def lambda_handler(event, context):
             'body': json.dumps({'error': str(e)})
         }
 
-def get_menu_items():
+def scan_menu():
+    """Read every menu category from DynamoDB"""
+    return decimal_to_native(scan_all(table, MENU_LIST_FIELDS))
+
+def get_menu_items(event):
     try:
-        response = table.scan()
-        items = decimal_to_native(response.get('Items', []))
+        def build_body():
+            return json.dumps({'message': 'Menu retrieved successfully', 'data': scan_menu()})
+        
+        return conditional_get(event, 'menu', build_body, CORS_HEADERS)
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({'error': str(e)})
+        }
+
+def search_menu_items(query_params):
+    """
+    Search dishes by categoryId, name prefix (q), price range (minPrice/maxPrice) and tag
+    GET /getMenu?q=lat&maxPrice=50000
+    """
+    try:
+        min_price = query_params.get('minPrice')
+        max_price = query_params.get('maxPrice')
+        try:
+            min_price = float(min_price) if min_price else None
+            max_price = float(max_price) if max_price else None
+        except ValueError:
+            return {
+                'statusCode': 400,
+                'headers': CORS_HEADERS,
+                'body': json.dumps({'error': 'minPrice and maxPrice must be numbers'})
+            }
+        
+        index = get_menu_index(scan_menu)
+        dishes = index.search(
+            category_id=query_params.get('categoryId'),
+            prefix=query_params.get('q'),
+            min_price=min_price,
+            max_price=max_price,
+            tag=query_params.get('tag')
+        )
+        
         return {
             'statusCode': 200,
             'headers': CORS_HEADERS,
-            'body': json.dumps({'message': 'Menu retrieved successfully', 'data': items})
+            'body': json.dumps({
+                'message': 'Menu search results',
+                'count': len(dishes),
+                'data': decimal_to_native(dishes)
+            })
         }
     except Exception as e:
         return {
@@ -90,20 +169,7 @@ def create_food_item(data):
     try:
         # Handle list of items
         if isinstance(data, list):
-            for item in data:
-                if not item.get("id") or not item.get("title") or not item.get("dishes"):
-                    return {
-                        'statusCode': 400,
-                        'headers': CORS_HEADERS,
-                        'body': json.dumps({'error': 'Missing required fields'})
-                    }
-                item["id"] = str(item["id"])
-                table.put_item(Item=convert_to_decimal(item))
-            return {
-                'statusCode': 201,
-                'headers': CORS_HEADERS,
-                'body': json.dumps({'message': 'All food items created successfully'})
-            }
+            return bulk_import_food_items(data)
         
         # Handle single item
         if not data.get("id") or not data.get("title") or not data.get("dishes"):
@@ -114,7 +180,9 @@ def create_food_item(data):
             }
         
         data["id"] = str(data["id"])
+        assign_dish_ids(data)
         table.put_item(Item=convert_to_decimal(data))
+        content_changed('menu')
         
         return {
             'statusCode': 201,
@@ -131,6 +199,119 @@ def create_food_item(data):
             'body': json.dumps({'error': str(e)})
         }
 
+def new_dish_id():
+    """Short random dish id, unique within a category"""
+    return uuid.uuid4().hex[:12]
+
+def assign_dish_ids(category):
+    """Give every dish in a category a dishId so it can be patched individually"""
+    for dish in category.get("dishes") or []:
+        if isinstance(dish, dict) and not dish.get("dishId"):
+            dish["dishId"] = new_dish_id()
+    return category
+
+def validate_food_item(item):
+    """Return an error message for an invalid menu item, or None"""
+    if not isinstance(item, dict):
+        return 'Item must be an object'
+    if not item.get("id") or not item.get("title") or not item.get("dishes"):
+        return 'Missing required fields'
+    return None
+
+def write_batch(chunk):
+    """
+    Write up to 25 items with BatchWriteItem, retrying unprocessed items with backoff
+    Returns the ids that could not be written
+    """
+    requests = [
+        {'PutRequest': {'Item': {k: serializer.serialize(v) for k, v in item.items()}}}
+        for item in chunk
+    ]
+    
+    for attempt in range(BATCH_WRITE_MAX_RETRIES + 1):
+        response = dynamodb.meta.client.batch_write_item(RequestItems={table.name: requests})
+        requests = response.get('UnprocessedItems', {}).get(table.name, [])
+        if not requests:
+            return []
+        if attempt < BATCH_WRITE_MAX_RETRIES:
+            time.sleep(min(0.05 * (2 ** attempt), 2))
+    
+    return [r['PutRequest']['Item']['id']['S'] for r in requests]
+
+def bulk_import_food_items(items):
+    """
+    Bulk import: validate the whole payload first, then write in 25-item
+    BatchWriteItem chunks across a small thread pool
+    """
+    # Validate everything before writing anything
+    errors = []
+    seen_ids = set()
+    for index, item in enumerate(items):
+        error = validate_food_item(item)
+        if not error:
+            item_id = str(item["id"])
+            if item_id in seen_ids:
+                error = f'Duplicate id: {item_id}'
+            seen_ids.add(item_id)
+        if error:
+            errors.append({'index': index, 'id': item.get("id") if isinstance(item, dict) else None, 'error': error})
+    
+    if errors:
+        return {
+            'statusCode': 400,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({'error': 'Validation failed, nothing was imported', 'errors': errors})
+        }
+    
+    prepared = []
+    for item in items:
+        item["id"] = str(item["id"])
+        assign_dish_ids(item)
+        prepared.append(convert_to_decimal(item))
+    
+    chunks = [prepared[i:i + BATCH_WRITE_SIZE] for i in range(0, len(prepared), BATCH_WRITE_SIZE)]
+    
+    failed_ids = set()
+    with ThreadPoolExecutor(max_workers=BATCH_WRITE_WORKERS) as pool:
+        futures = [(chunk, pool.submit(write_batch, chunk)) for chunk in chunks]
+        for chunk, future in futures:
+            try:
+                failed_ids.update(future.result())
+            except Exception as e:
+                print(f"Batch write failed: {e}")
+                failed_ids.update(item["id"] for item in chunk)
+    
+    results = [
+        {'id': item["id"], 'status': 'failed' if item["id"] in failed_ids else 'created'}
+        for item in prepared
+    ]
+    created = len(results) - len(failed_ids)
+    if created:
+        content_changed('menu')
+    
+    if failed_ids:
+        return {
+            'statusCode': 207,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({
+                'message': f'{created} of {len(results)} food items created',
+                'created': created,
+                'failed': len(failed_ids),
+                'results': results
+            })
+        }
+    
+    return {
+        'statusCode': 201,
+        'headers': CORS_HEADERS,
+        'body': json.dumps({
+            'message': 'All food items created successfully',
+            'created': created,
+            'failed': 0,
+            'results': results
+        })
+    }
+
 def update_food_item(data):
     try:
         if 'id' not in data:
@@ -141,6 +322,7 @@ def update_food_item(data):
             }
 
         data['id'] = str(data['id'])
+        assign_dish_ids(data)
         
         # Build update expression
         update_expression = "SET "
@@ -158,6 +340,7 @@ def update_food_item(data):
             ExpressionAttributeValues=expression_attribute_values,
             ReturnValues="ALL_NEW"
         )
+        content_changed('menu')
         
         return {
             'statusCode': 200,
@@ -174,6 +357,202 @@ def update_food_item(data):
             'body': json.dumps({'error': str(e)})
         }
 
+def find_dish_index(category_id, dish_id):
+    """
+    Locate a dish's list position, reading only the dishes attribute
+    Categories created before dish ids existed get ids assigned once here; the
+    write only applies if the list is unchanged, otherwise it is re-read
+    """
+    for _ in range(DISH_ID_BACKFILL_ATTEMPTS):
+        response = table.get_item(
+            Key={'id': category_id},
+            ProjectionExpression='dishes'
+        )
+        if 'Item' not in response:
+            return None
+        
+        dishes = response['Item'].get('dishes') or []
+        if all(dish.get('dishId') for dish in dishes):
+            break
+        
+        original = copy.deepcopy(dishes)
+        assign_dish_ids(response['Item'])
+        try:
+            table.update_item(
+                Key={'id': category_id},
+                UpdateExpression='SET dishes = :dishes',
+                ConditionExpression='dishes = :original',
+                ExpressionAttributeValues={':dishes': dishes, ':original': original}
+            )
+            break
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+                raise
+    # If every backfill lost a race, ids assigned here were never stored and can't
+    # match; dishes that already had ids are still found (updates check dishId)
+    
+    for index, dish in enumerate(dishes):
+        if dish.get('dishId') == dish_id:
+            return index
+    return None
+
+def compile_dish_update(index, dish_id, fields):
+    """Compile a dish field update into a targeted list/map update expression"""
+    set_parts = []
+    names = {}
+    values = {':dishId': dish_id}
+    for n, (key, value) in enumerate(fields.items()):
+        names[f'#f{n}'] = key
+        values[f':v{n}'] = convert_to_decimal(value)
+        set_parts.append(f'dishes[{index}].#f{n} = :v{n}')
+    
+    return {
+        'UpdateExpression': 'SET ' + ', '.join(set_parts),
+        'ConditionExpression': f'dishes[{index}].dishId = :dishId',
+        'ExpressionAttributeNames': names,
+        'ExpressionAttributeValues': values
+    }
+
+def compile_dish_remove(index, dish_id):
+    """Compile a dish removal into a conditional REMOVE of one list element"""
+    return {
+        'UpdateExpression': f'REMOVE dishes[{index}]',
+        'ConditionExpression': f'dishes[{index}].dishId = :dishId',
+        'ExpressionAttributeValues': {':dishId': dish_id}
+    }
+
+def patch_dish(data):
+    """
+    Dish-level patch without rewriting the category's dishes list
+    PATCH body: { "id": categoryId, "op": "add" | "update" | "remove",
+                  "dishId": "...", "dish": { ...fields }, "index": optional position hint }
+    """
+    try:
+        category_id = str(data.get('id', ''))
+        op = data.get('op')
+        dish = data.get('dish') or {}
+        
+        if not category_id or op not in ('add', 'update', 'remove'):
+            return {
+                'statusCode': 400,
+                'headers': CORS_HEADERS,
+                'body': json.dumps({'error': 'Category id and op (add, update, remove) are required'})
+            }
+        
+        fields = {k: v for k, v in dish.items() if k in DISH_FIELDS}
+        
+        if op == 'add':
+            if not fields.get('name') or fields.get('price') is None:
+                return {
+                    'statusCode': 400,
+                    'headers': CORS_HEADERS,
+                    'body': json.dumps({'error': 'Dish name and price are required'})
+                }
+            new_dish = {**fields, 'dishId': new_dish_id()}
+            try:
+                table.update_item(
+                    Key={'id': category_id},
+                    UpdateExpression='SET dishes = list_append(if_not_exists(dishes, :empty), :dish)',
+                    ConditionExpression='attribute_exists(id)',
+                    ExpressionAttributeValues={':empty': [], ':dish': [convert_to_decimal(new_dish)]}
+                )
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+                    raise
+                return {
+                    'statusCode': 404,
+                    'headers': CORS_HEADERS,
+                    'body': json.dumps({'error': 'Category not found'})
+                }
+            content_changed('menu')
+            return {
+                'statusCode': 201,
+                'headers': CORS_HEADERS,
+                'body': json.dumps({'message': 'Dish added successfully', 'data': new_dish})
+            }
+        
+        dish_id = data.get('dishId')
+        if not dish_id:
+            return {
+                'statusCode': 400,
+                'headers': CORS_HEADERS,
+                'body': json.dumps({'error': 'dishId is required'})
+            }
+        if op == 'update' and not fields:
+            return {
+                'statusCode': 400,
+                'headers': CORS_HEADERS,
+                'body': json.dumps({'error': 'No dish fields to update'})
+            }
+        
+        # Try the client's index hint first, then look the dish up; the condition
+        # guards against the list having shifted since the position was read, and
+        # also fails for a hint past the end of the list. Bools and negative
+        # indexes are not positions, so those go straight to the lookup
+        index = data.get('index')
+        attempts = [index] if type(index) is int and index >= 0 else []
+        attempts.append(None)
+        
+        conflict = False
+        for hint in attempts:
+            position = hint if hint is not None else find_dish_index(category_id, dish_id)
+            if position is None:
+                conflict = False
+                break
+            
+            if op == 'update':
+                expression = compile_dish_update(position, dish_id, fields)
+            else:
+                expression = compile_dish_remove(position, dish_id)
+            
+            try:
+                response = table.update_item(
+                    Key={'id': category_id},
+                    ReturnValues='UPDATED_NEW' if op == 'update' else 'NONE',
+                    **expression
+                )
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+                    raise
+                conflict = True
+                continue
+            
+            content_changed('menu')
+            if op == 'update':
+                updated = response.get('Attributes', {}).get('dishes', [{}])[0]
+                return {
+                    'statusCode': 200,
+                    'headers': CORS_HEADERS,
+                    'body': json.dumps({
+                        'message': 'Dish updated successfully',
+                        'data': {**decimal_to_native(updated), 'dishId': dish_id, 'index': position}
+                    })
+                }
+            return {
+                'statusCode': 200,
+                'headers': CORS_HEADERS,
+                'body': json.dumps({'message': 'Dish removed successfully', 'dishId': dish_id})
+            }
+        
+        if conflict:
+            # The dish exists but the list kept moving under us
+            return {
+                'statusCode': 409,
+                'headers': CORS_HEADERS,
+                'body': json.dumps({'error': 'Category changed concurrently, please retry'})
+            }
+        return {
+            'statusCode': 404,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({'error': 'Dish not found'})
+        }
+    except Exception as e:
+        return {
+            'statusCode': 500,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({'error': str(e)})
+        }
+
 def delete_food_item(data):
     try:
         if 'id' not in data:
@@ -184,6 +563,7 @@ def delete_food_item(data):
             }
         
         table.delete_item(Key={'id': str(data['id'])})
+        content_changed('menu')
         
         return {
             'statusCode': 200,
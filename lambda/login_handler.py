@@ -1,27 +1,29 @@
 import json
 import boto3
 import os
-import hmac
-import hashlib
-import base64
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
+from cognito_client import CLIENT_ID, cognito, generate_secret_hash
+from rate_limit import check_rate_limit, rate_limited_response
+from token_verifier import claims_attributes, claims_username, unverified_claims
+from user_profile import cache_profile, merge_profile, report_missing_profile
 
-cognito = boto3.client('cognito-idp')
 dynamodb = boto3.resource('dynamodb')
 
-CLIENT_ID = os.environ.get('COGNITO_CLIENT_ID')
-CLIENT_SECRET = os.environ.get('COGNITO_CLIENT_SECRET')
 USERS_TABLE = os.environ.get('USERS_TABLE', 'USERS_TABLE')
 
-def generate_secret_hash(username):
-    """Generate SECRET_HASH for Cognito"""
-    message = username + CLIENT_ID
-    dig = hmac.new(
-        CLIENT_SECRET.encode('utf-8'),
-        message.encode('utf-8'),
-        hashlib.sha256
-    ).digest()
-    return base64.b64encode(dig).decode()
+# Reads USERS_TABLE while Cognito checks the password (reuse across Lambda invocations)
+profile_reader = ThreadPoolExecutor(max_workers=2)
+
+def read_db_user(username):
+    """USERS_TABLE item for a username ({} if absent), None if the read failed"""
+    try:
+        # Table uses 'id' as Partition Key, which stores the username
+        db_response = dynamodb.Table(USERS_TABLE).get_item(Key={'id': username})
+        return db_response.get('Item', {})
+    except Exception as db_error:
+        print(f"DynamoDB error: {str(db_error)}")
+        return None
 
 def lambda_handler(event, context):
     """
@@ -59,8 +61,17 @@ def lambda_handler(event, context):
                 'body': json.dumps({'error': 'Username and password are required'})
             }
         
+        # Turn away bursts (credential stuffing, retry loops) before they reach Cognito
+        retry_after = check_rate_limit('login', event, username)
+        if retry_after:
+            return rate_limited_response(retry_after, headers)
+        
         print(f"Login attempt for user: {username}")
         
+        # Start the profile read now so it overlaps the initiate_auth round trip; a failed
+        # login wastes one get_item, which the rate limit above keeps bounded
+        db_future = profile_reader.submit(read_db_user, username)
+        
         # Generate SECRET_HASH
         secret_hash = generate_secret_hash(username)
         
@@ -81,44 +92,28 @@ def lambda_handler(event, context):
         id_token = tokens['IdToken']
         refresh_token = tokens['RefreshToken']
         
-        # Get user info from Cognito
-        user_info = cognito.get_user(AccessToken=access_token)
+        # User attributes come from the ID token Cognito just returned (no get_user round trip)
+        claims = unverified_claims(id_token)
+        if claims:
+            attributes = claims_attributes(claims)
+        else:
+            user_info = cognito.get_user(AccessToken=access_token)
+            attributes = {attr['Name']: attr['Value'] for attr in user_info['UserAttributes']}
         
-        # Extract user attributes
-        attributes = {}
-        for attr in user_info['UserAttributes']:
-            attributes[attr['Name']] = attr['Value']
+        db_user = db_future.result()
+        db_ok = db_user is not None
+        db_user = db_user or {}
         
-        # Check if user is admin
-        is_admin = attributes.get('custom:role') == 'admin'
+        # Merge user data (role: DynamoDB > Cognito > 'customer')
+        user_data = merge_profile(username, attributes, db_user)
+        is_admin = user_data['isAdmin']
         
-        # Get additional user data from DynamoDB
-        table = dynamodb.Table(USERS_TABLE)
-        try:
-            # Table uses 'id' as Partition Key, which stores the username
-            db_response = table.get_item(Key={'id': username})
-            db_user = db_response.get('Item', {})
-        except Exception as db_error:
-            print(f"DynamoDB error: {str(db_error)}")
-            db_user = {}
-        
-        # Determine role: DynamoDB > Cognito > 'customer'
-        db_role = db_user.get('role')
-        cognito_role = attributes.get('custom:role')
-        final_role = db_role or cognito_role or 'customer'
-        
-        # Check if admin
-        is_admin = final_role == 'admin'
-        
-        # Merge user data
-        user_data = {
-            'username': username,
-            'email': attributes.get('email', ''),
-            'name': attributes.get('name', ''),
-            'role': final_role,
-            'isAdmin': is_admin,
-            **{k: v for k, v in db_user.items() if k != 'role'}
-        }
+        # Warm the profile cache for the /api/me call that follows (keyed like /api/me;
+        # skipped for email-alias logins, where the table key may differ)
+        if db_ok and claims and claims_username(claims) == username:
+            cache_profile(username, user_data)
+            if not db_user:
+                report_missing_profile(username)
         
         print(f"✅ Login successful for {username} (admin: {is_admin})")
         
@@ -1,8 +1,8 @@
 import json
-import boto3
 import os
-
-cognito = boto3.client('cognito-idp')
+from cognito_client import cognito
+from token_verifier import claims_username, revoke_user_tokens, unverified_claims
+from user_profile import invalidate_profile
 
 def lambda_handler(event, context):
     """
@@ -43,6 +43,14 @@ def lambda_handler(event, context):
         # Global sign out (invalidates all tokens)
         cognito.global_sign_out(AccessToken=access_token)
         
+        # Cognito accepted the token, so its claims are trustworthy here
+        claims = unverified_claims(access_token)
+        if claims:
+            username = claims_username(claims)
+            # Locally verified tokens would otherwise stay valid until they expire
+            revoke_user_tokens(username)
+            invalidate_profile(username)
+        
         print(f"✅ User logged out successfully")
         
         return {
@@ -0,0 +1,137 @@
+"""
+In-memory search index for MENU_TABLES
+Built once per Lambda container from the cached menu snapshot and rebuilt when
+the menu content version changes, so searches never rescan DynamoDB
+"""
+
+import time
+from bisect import bisect_left, bisect_right
+from decimal import Decimal
+from typing import Callable, List, Optional
+
+from redis_cache import cache_aside, get_content_version
+
+# Rebuild interval when Redis (and therefore the content version) is unavailable
+INDEX_MAX_AGE = 60
+SNAPSHOT_TTL = 600
+
+# Index for this container (reuse across Lambda invocations)
+menu_index = None
+
+def to_number(value) -> Optional[float]:
+    """Parse a price that may be stored as number, Decimal or string"""
+    if isinstance(value, (int, float, Decimal)):
+        return float(value)
+    try:
+        return float(str(value).replace(',', '').strip())
+    except (TypeError, ValueError):
+        return None
+
+class MenuIndex:
+    """Inverted index over every dish in every category"""
+
+    def __init__(self, categories: List[dict], version: Optional[int]):
+        self.version = version
+        self.built_at = time.time()
+        self.dishes = []
+        self.by_category = {}
+        self.by_tag = {}
+        words = []
+        prices = []
+
+        for category in categories:
+            category_id = str(category.get('id'))
+            positions = self.by_category.setdefault(category_id, [])
+            for dish in category.get('dishes') or []:
+                position = len(self.dishes)
+                self.dishes.append({
+                    **dish,
+                    'categoryId': category_id,
+                    'categoryTitle': category.get('title', '')
+                })
+                positions.append(position)
+
+                # Every word of the name is a prefix entry point ("iced latte" matches "lat")
+                name = str(dish.get('name', '')).lower()
+                for word in set([name] + name.split()):
+                    if word:
+                        words.append((word, position))
+
+                price = to_number(dish.get('price'))
+                if price is not None:
+                    prices.append((price, position))
+
+                for tag in dish.get('tags') or []:
+                    self.by_tag.setdefault(str(tag).lower(), set()).add(position)
+
+        words.sort()
+        prices.sort()
+        self.word_keys = [w for w, _ in words]
+        self.word_positions = [p for _, p in words]
+        self.price_keys = [p for p, _ in prices]
+        self.price_positions = [p for _, p in prices]
+
+    def prefix(self, text: str) -> set:
+        """Dishes with a name or name word starting with text"""
+        text = text.lower()
+        start = bisect_left(self.word_keys, text)
+        end = bisect_left(self.word_keys, text + '\uffff')
+        return set(self.word_positions[start:end])
+
+    def price_range(self, min_price: Optional[float], max_price: Optional[float]) -> set:
+        """Dishes with min_price <= price <= max_price"""
+        start = 0 if min_price is None else bisect_left(self.price_keys, min_price)
+        end = len(self.price_keys) if max_price is None else bisect_right(self.price_keys, max_price)
+        return set(self.price_positions[start:end])
+
+    def search(self, category_id: Optional[str] = None, prefix: Optional[str] = None,
+               min_price: Optional[float] = None, max_price: Optional[float] = None,
+               tag: Optional[str] = None) -> List[dict]:
+        """Intersect every given filter; results keep menu order"""
+        candidates = None
+
+        def narrow(positions):
+            nonlocal candidates
+            candidates = set(positions) if candidates is None else candidates & set(positions)
+
+        if category_id is not None:
+            narrow(self.by_category.get(str(category_id), []))
+        if tag:
+            narrow(self.by_tag.get(tag.lower(), set()))
+        if prefix:
+            narrow(self.prefix(prefix))
+        if min_price is not None or max_price is not None:
+            narrow(self.price_range(min_price, max_price))
+
+        if candidates is None:
+            return list(self.dishes)
+        return [self.dishes[p] for p in sorted(candidates)]
+
+def get_menu_index(load_categories: Callable[[], List[dict]]) -> MenuIndex:
+    """
+    Get the container's menu index, rebuilding it if the menu version changed
+
+    Args:
+        load_categories: Function that reads every category from MENU_TABLES
+
+    Returns:
+        Current MenuIndex
+    """
+    global menu_index
+    version = get_content_version('menu')
+
+    if menu_index is not None:
+        if version is not None and menu_index.version == version:
+            return menu_index
+        if version is None and time.time() - menu_index.built_at < INDEX_MAX_AGE:
+            return menu_index
+
+    if version is not None:
+        # Snapshot keyed by version, so every container builds from the same data
+        categories = cache_aside(f"menu:snapshot:{version}", load_categories, ttl=SNAPSHOT_TTL)
+    else:
+        categories = load_categories()
+
+    menu_index = MenuIndex(categories or [], version)
+    print(f"Menu index built: {len(menu_index.dishes)} dishes (version {version})")
+    return menu_index
@@ -0,0 +1,5 @@
+from image_upload import sweep_pending_uploads
+
+def lambda_handler(event, context):
+    # Scheduled (EventBridge) cleanup of abandoned presigned uploads; logic lives in image_upload
+    return {'statusCode': 200, 'deleted': sweep_pending_uploads()}
@@ -0,0 +1,168 @@
+"""
+Sliding-window rate limiting for the auth endpoints (login, register, resend code)
+Each request is checked against per-IP and per-username windows with one Lua
+call per window on Redis sorted sets, pipelined into a single round trip;
+callers already rejected are turned away in process until their window frees
+up, so bursts never reach Cognito
+"""
+
+import json
+import os
+import time
+import uuid
+from collections import defaultdict, deque
+from typing import List, Optional, Tuple
+
+from redis_cache import get_redis_client
+
+# action -> [(scope, max requests, window seconds)]; scope is 'ip' or 'username'
+RATE_LIMITS = {
+    'login': [('ip', 30, 60), ('username', 5, 60)],
+    'register': [('ip', 5, 600)],
+    'resend': [('ip', 10, 600), ('username', 3, 600)],
+}
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+
+# Check one window and record the request if it has room. Each key is its own
+# hash slot, so windows are checked by separate calls; a request one window
+# rejects is removed again from the others, so it doesn't extend its own ban
+# KEYS: the window's sorted set; ARGV: now_ms, member, limit, window_ms
+# Returns 0 if the request was recorded, else milliseconds until a slot frees
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local limit = tonumber(ARGV[3])
+local window = tonumber(ARGV[4])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+if redis.call('ZCARD', KEYS[1]) >= limit then
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    return tonumber(oldest[2]) + window - now
+end
+redis.call('ZADD', KEYS[1], now, ARGV[2])
+redis.call('PEXPIRE', KEYS[1], window)
+return 0
+"""
+
+# Registered script per Redis client (EVALSHA, reloaded automatically after a flush)
+sliding_window_scripts = {}
+
+# Keys rejected recently in this container: key -> blocked_until
+blocked_until = {}
+# Prune expired entries past this many keys
+MAX_TRACKED_KEYS = 10000
+
+# Fallback windows when Redis is unavailable (per container only): key -> timestamps
+local_windows = defaultdict(deque)
+
+def get_client_ip(event: dict) -> str:
+    """Caller IP for REST (v1) and HTTP API (v2) events"""
+    request_context = event.get('requestContext') or {}
+    return (request_context.get('identity', {}).get('sourceIp')
+            or request_context.get('http', {}).get('sourceIp')
+            or 'unknown')
+
+def limit_rules(action: str, event: dict, username: Optional[str]) -> List[Tuple[str, int, int]]:
+    """
+    Redis keys with their limit and window for one request
+    The caller (scope:value) is the key's hash tag, so one action's traffic is
+    spread over the cluster instead of landing on a single shard
+    """
+    values = {'ip': get_client_ip(event), 'username': (username or '').strip().lower()}
+    return [
+        (f"ratelimit:{action}:{{{scope}:{values[scope]}}}", limit, window)
+        for scope, limit, window in RATE_LIMITS.get(action, [])
+        if values[scope]
+    ]
+
+def check_local(rules: List[Tuple[str, int, int]], now: float) -> List[float]:
+    """Same sliding window as the Lua script, kept in this container"""
+    waits = []
+    for key, limit, window in rules:
+        timestamps = local_windows[key]
+        while timestamps and timestamps[0] <= now - window:
+            timestamps.popleft()
+        waits.append(timestamps[0] + window - now if len(timestamps) >= limit else 0)
+    if not any(waits):
+        for key, _, _ in rules:
+            local_windows[key].append(now)
+    return waits
+
+def prune(now: float) -> None:
+    """Keep the in-process maps bounded"""
+    if len(blocked_until) > MAX_TRACKED_KEYS:
+        for key in [k for k, until in blocked_until.items() if until <= now]:
+            del blocked_until[key]
+    if len(local_windows) > MAX_TRACKED_KEYS:
+        for key in [k for k, timestamps in local_windows.items() if not timestamps]:
+            del local_windows[key]
+
+def check_rate_limit(action: str, event: dict, username: Optional[str] = None) -> Optional[int]:
+    """
+    Record a request and decide whether it may proceed
+
+    Args:
+        action: Key of RATE_LIMITS ('login', 'register', 'resend')
+        event: API Gateway event (for the caller IP)
+        username: Username the request targets, if any
+
+    Returns:
+        None if allowed, otherwise seconds to wait before retrying
+    """
+    if not RATE_LIMIT_ENABLED:
+        return None
+
+    rules = limit_rules(action, event, username)
+    if not rules:
+        return None
+
+    now = time.time()
+    # Already rejected: answer without a Redis round trip
+    wait = max((blocked_until.get(key, 0) - now for key, _, _ in rules), default=0)
+    if wait > 0:
+        return int(wait) + 1
+
+    client = get_redis_client()
+    if client is None:
+        waits = check_local(rules, now)
+    else:
+        try:
+            script = sliding_window_scripts.get(id(client))
+            if script is None:
+                script = sliding_window_scripts[id(client)] = client.register_script(SLIDING_WINDOW_SCRIPT)
+            now_ms, member = int(now * 1000), uuid.uuid4().hex
+            pipe = client.pipeline(transaction=False)
+            for key, limit, window in rules:
+                script(keys=[key], args=[now_ms, member, limit, window * 1000], client=pipe)
+            waits = [int(ms) / 1000 for ms in pipe.execute()]
+            if any(waits):
+                # Rejected: take the request back out of the windows that recorded it
+                pipe = client.pipeline(transaction=False)
+                for (key, _, _), key_wait in zip(rules, waits):
+                    if not key_wait:
+                        pipe.zrem(key, member)
+                pipe.execute()
+        except Exception as e:
+            print(f"❌ Rate limit check failed, falling back to per-container limits for {action}: {e}")
+            waits = check_local(rules, now)
+
+    prune(now)
+    wait = max(waits, default=0)
+    if wait <= 0:
+        return None
+
+    # Only the exhausted windows are blocked (one username at its limit doesn't block the whole IP)
+    for (key, _, _), key_wait in zip(rules, waits):
+        if key_wait > 0:
+            blocked_until[key] = now + key_wait
+    print(f"⚠️ Rate limited {action}: {', '.join(key for (key, _, _), w in zip(rules, waits) if w > 0)} ({wait:.1f}s)")
+    return int(wait) + 1
+
+def rate_limited_response(retry_after: int, headers: dict) -> dict:
+    """429 response with Retry-After"""
+    return {
+        'statusCode': 429,
+        'headers': {**headers, 'Retry-After': str(retry_after)},
+        'body': json.dumps({
+            'error': 'Too many requests. Please try again later.',
+            'retryAfter': retry_after
+        })
+    }
@@ -5,22 +5,29 @@ Provides caching layer to reduce DynamoDB read operations and improve performanc
 
 import json
 import os
+import time
 from decimal import Decimal
-from typing import Any, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 import redis
 
 # Environment variables for ElastiCache configuration
 REDIS_HOST = os.environ.get('REDIS_ENDPOINT', 'localhost')
 REDIS_PORT = int(os.environ.get('REDIS_PORT', '6379'))
 CACHE_TTL = int(os.environ.get('CACHE_TTL', '300'))  # Default 5 minutes
+# After a failed connect, skip Redis for this long instead of paying the connect timeout on every call
+CONNECT_RETRY_SECONDS = float(os.environ.get('REDIS_CONNECT_RETRY_SECONDS', '30'))
 
 # Initialize Redis client (reuse connection across Lambda invocations)
 redis_client = None
+# time.monotonic() before which no new connect is attempted
+connect_retry_at = 0.0
 
 def get_redis_client():
-    """Get or create Redis client connection"""
-    global redis_client
+    """Get or create Redis client connection (None while Redis is unavailable)"""
+    global redis_client, connect_retry_at
     if redis_client is None:
+        if time.monotonic() < connect_retry_at:
+            return None
         try:
             redis_client = redis.Redis(
                 host=REDIS_HOST,
@@ -35,8 +42,9 @@ def get_redis_client():
             redis_client.ping()
             print(f"Redis connected to {REDIS_HOST}:{REDIS_PORT}")
         except Exception as e:
-            print(f"Redis connection failed: {e}")
+            print(f"Redis connection failed: {e} (retrying in {CONNECT_RETRY_SECONDS:g}s)")
             redis_client = None
+            connect_retry_at = time.monotonic() + CONNECT_RETRY_SECONDS
     return redis_client
 
 def decimal_to_native(obj):
@@ -101,6 +109,56 @@ def set_cached(key: str, value: Any, ttl: Optional[int] = None) -> bool:
         print(f"Cache set error: {e}")
         return False
 
+def get_cached_many(keys: List[str]) -> List[Optional[Any]]:
+    """
+    Get several values in one round trip (MGET)
+
+    Args:
+        keys: Cache keys
+
+    Returns:
+        Values in key order, None for misses (all None if Redis unavailable)
+    """
+    client = get_redis_client()
+    if client is None or not keys:
+        return [None] * len(keys)
+
+    try:
+        values = client.mget(keys)
+        hits = sum(1 for value in values if value)
+        print(f"Cache MGET: {hits}/{len(keys)} hits")
+        return [json.loads(value) if value else None for value in values]
+    except Exception as e:
+        print(f"Cache mget error: {e}")
+        return [None] * len(keys)
+
+def set_cached_many(values: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+    """
+    Set several values in one round trip (pipelined SETEX)
+
+    Args:
+        values: Cache key -> value (JSON serialized)
+        ttl: Time to live in seconds (defaults to CACHE_TTL)
+
+    Returns:
+        True if successful, False otherwise
+    """
+    client = get_redis_client()
+    if client is None or not values:
+        return False
+
+    try:
+        ttl_seconds = ttl or CACHE_TTL
+        pipeline = client.pipeline(transaction=False)
+        for key, value in values.items():
+            pipeline.setex(key, ttl_seconds, json.dumps(decimal_to_native(value)))
+        pipeline.execute()
+        print(f"Cache SET: {len(values)} keys (TTL: {ttl_seconds}s)")
+        return True
+    except Exception as e:
+        print(f"Cache set error: {e}")
+        return False
+
 def delete_cached(key: str) -> bool:
     """
     Delete value from cache
@@ -195,6 +253,84 @@ def write_through(cache_key: str, data: Any, write_function, ttl: Optional[int]
     
     return result
 
+def get_content_version(name: str) -> Optional[int]:
+    """
+    Get the content version counter for a resource (e.g. "menu", "tables")
+    
+    Initialised from the current time in milliseconds when missing, so the
+    version keeps increasing even if Redis is flushed
+    
+    Args:
+        name: Resource name
+        
+    Returns:
+        Current version or None if Redis unavailable
+    """
+    client = get_redis_client()
+    if client is None:
+        return None
+    
+    key = f"version:{name}"
+    try:
+        version = client.get(key)
+        if version is None:
+            client.set(key, int(time.time() * 1000), nx=True)
+            version = client.get(key)
+        return int(version)
+    except Exception as e:
+        print(f"Version get error: {e}")
+        return None
+
+def claim_version_digest(name: str, version: int, digest: str, ttl: int = 86400) -> Optional[str]:
+    """
+    Record the body digest served for a content version (first writer wins)
+    
+    Args:
+        name: Resource name
+        version: Content version the body was built under
+        digest: Digest of the body
+        ttl: Time to live in seconds
+        
+    Returns:
+        The digest recorded for the version or None if Redis unavailable
+    """
+    client = get_redis_client()
+    if client is None:
+        return None
+    
+    key = f"version:{name}:{version}:digest"
+    try:
+        client.set(key, digest, nx=True, ex=ttl)
+        return client.get(key)
+    except Exception as e:
+        print(f"Version digest error: {e}")
+        return None
+
+def bump_content_version(name: str) -> Optional[int]:
+    """
+    Increment the content version for a resource after a write
+    
+    Args:
+        name: Resource name
+        
+    Returns:
+        New version or None if Redis unavailable
+    """
+    client = get_redis_client()
+    if client is None:
+        return None
+    
+    key = f"version:{name}"
+    try:
+        if not client.exists(key):
+            client.set(key, int(time.time() * 1000), nx=True)
+        version = client.incr(key)
+        print(f"Version BUMP: {key} -> {version}")
+        return version
+    except Exception as e:
+        print(f"Version bump error: {e}")
+        return None
+
 def get_cache_stats() -> dict:
     """
     Get Redis cache statistics
@@ -0,0 +1,132 @@
+import json
+import boto3
+import os
+from cognito_client import CLIENT_ID, cognito, generate_secret_hash
+from token_verifier import claims_attributes, claims_username, unverified_claims
+from user_profile import cache_profile, get_cached_profile, merge_profile, report_missing_profile
+
+dynamodb = boto3.resource('dynamodb')
+
+USERS_TABLE = os.environ.get('USERS_TABLE', 'USERS_TABLE')
+
+def load_profile(username, claims):
+    """
+    Profile from the cache (warmed by login and /api/me), else the USERS_TABLE
+    row merged with the new ID token's claims
+
+    Returns:
+        Merged profile, or None if the USERS_TABLE read failed (the role is unknown)
+    """
+    user_data = get_cached_profile(username)
+    if user_data is not None:
+        return user_data
+    try:
+        db_user = dynamodb.Table(USERS_TABLE).get_item(Key={'id': username}).get('Item', {})
+    except Exception as db_error:
+        print(f"DynamoDB error: {str(db_error)}")
+        return None
+    if not db_user:
+        report_missing_profile(username)
+    return cache_profile(username, merge_profile(username, claims_attributes(claims), db_user))
+
+def lambda_handler(event, context):
+    """
+    Renew a session with the refresh token returned by /api/login
+    POST /api/refresh
+    Body: { "refreshToken": "...", "username": "user" }
+    (username may be omitted if the expired access token is sent as
+    "Authorization: Bearer <access_token>"; it is only used for SECRET_HASH)
+    """
+
+    # CORS headers
+    headers = {
+        'Content-Type': 'application/json',
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Headers': 'Content-Type,Authorization',
+        'Access-Control-Allow-Methods': 'POST,OPTIONS'
+    }
+
+    # Handle OPTIONS request for CORS
+    if event.get('httpMethod') == 'OPTIONS':
+        return {
+            'statusCode': 200,
+            'headers': headers,
+            'body': ''
+        }
+
+    try:
+        body = json.loads(event.get('body') or '{}')
+        refresh_token = body.get('refreshToken')
+        username = body.get('username')
+
+        if not username:
+            # The (possibly expired) access token still names the user; Cognito checks the refresh token
+            headers_dict = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+            auth_header = headers_dict.get('authorization', '')
+            if auth_header.lower().startswith('bearer '):
+                claims = unverified_claims(auth_header.split(' ', 1)[1])
+                username = claims_username(claims) if claims else None
+
+        if not refresh_token or not username:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': json.dumps({'error': 'refreshToken and username are required'})
+            }
+
+        # Single Cognito call: no password check or get_user
+        auth_response = cognito.initiate_auth(
+            ClientId=CLIENT_ID,
+            AuthFlow='REFRESH_TOKEN_AUTH',
+            AuthParameters={
+                'REFRESH_TOKEN': refresh_token,
+                'SECRET_HASH': generate_secret_hash(username)
+            }
+        )
+
+        tokens = auth_response['AuthenticationResult']
+        id_token = tokens['IdToken']
+
+        claims = unverified_claims(id_token) or {}
+        canonical_username = claims_username(claims) if claims else username
+        user_data = load_profile(canonical_username, claims)
+
+        print(f"✅ Session refreshed for {canonical_username}")
+
+        response_body = {
+            'message': 'Session refreshed',
+            'accessToken': tokens['AccessToken'],
+            'idToken': id_token,
+            # Cognito only rotates the refresh token when rotation is enabled
+            'refreshToken': tokens.get('RefreshToken', refresh_token),
+            'expiresIn': tokens.get('ExpiresIn', 3600)
+        }
+        # Without the USERS_TABLE row the role is unknown; the client gets it from /api/me
+        if user_data is not None:
+            response_body['isAdmin'] = user_data['isAdmin']
+            response_body['userInfo'] = user_data
+
+        return {
+            'statusCode': 200,
+            'headers': headers,
+            'body': json.dumps(response_body)
+        }
+
+    except cognito.exceptions.NotAuthorizedException:
+        print(f"❌ Refresh rejected for {username}")
+        return {
+            'statusCode': 401,
+            'headers': headers,
+            'body': json.dumps({'error': 'Refresh token is invalid or expired'})
+        }
+
+    except Exception as e:
+        print(f"❌ Refresh error: {str(e)}")
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': json.dumps({
+                'error': 'Session refresh failed',
+                'message': str(e)
+            })
+        }
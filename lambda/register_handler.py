@@ -1,24 +1,8 @@
-import os
 import json
-import boto3
-import hmac
-import hashlib
-import base64
-
-cognito = boto3.client('cognito-idp')
-
-def generate_secret_hash(username, client_id, client_secret):
-    message = username + client_id
-    dig = hmac.new(
-        client_secret.encode('utf-8'),
-        message.encode('utf-8'),
-        hashlib.sha256
-    ).digest()
-    return base64.b64encode(dig).decode()
+from cognito_client import CLIENT_ID, cognito, generate_secret_hash
+from rate_limit import check_rate_limit, rate_limited_response
 
 def lambda_handler(event, context):
-    CLIENT_ID = os.environ['COGNITO_CLIENT_ID']
-    CLIENT_SECRET = os.environ['COGNITO_CLIENT_SECRET']
     headers = {
         'Content-Type': 'application/json',
         'Access-Control-Allow-Origin': '*',
@@ -28,6 +12,11 @@ def lambda_handler(event, context):
     if event.get('httpMethod') == 'OPTIONS':
         return {'statusCode': 200, 'headers': headers, 'body': ''}
 
+    # Turn away bursts before they reach Cognito
+    retry_after = check_rate_limit('register', event)
+    if retry_after:
+        return rate_limited_response(retry_after, headers)
+
     body = json.loads(event['body'])
     username = body['username']
     password = body['password']
@@ -38,7 +27,7 @@ def lambda_handler(event, context):
     try:
         cognito.sign_up(
             ClientId=CLIENT_ID,
-            SecretHash=generate_secret_hash(username, CLIENT_ID, CLIENT_SECRET),
+            SecretHash=generate_secret_hash(username),
             Username=username,
             Password=password,
             UserAttributes=[
@@ -1,15 +1,22 @@
 import boto3
 import json
+import uuid
 from decimal import Decimal
+from auth_middleware import require_auth
+from dynamo_scan import iter_scan, scan_all
+from http_cache import conditional_get, content_changed
 
 # Initialize DynamoDB
 dynamodb = boto3.resource('dynamodb')
 table = dynamodb.Table('TABLES_TABLE')
 
+# Attributes the table views read
+TABLE_LIST_FIELDS = ('id', 'tableNumber', 'seats', 'status')
+
 # CORS headers
 CORS_HEADERS = {
     'Access-Control-Allow-Origin': '*',
-    'Access-Control-Allow-Headers': 'Content-Type',
+    'Access-Control-Allow-Headers': 'Content-Type,Authorization,If-None-Match',
     'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS'
 }
 
@@ -33,6 +40,7 @@ def convert_to_decimal(data):
         return Decimal(str(data))
     return data
 
+@require_auth(CORS_HEADERS, admin_methods=('POST', 'PUT', 'DELETE'), public_methods=('GET',))
 def lambda_handler(event, context):
     """Main handler for table management"""
     
@@ -50,7 +58,7 @@ def lambda_handler(event, context):
         
         # Route to appropriate function
         if http_method == "GET":
-            return get_tables()
+            return get_tables(event)
         elif http_method == "POST":
             return create_table(body)
         elif http_method == "PUT":
@@ -70,20 +78,18 @@ def lambda_handler(event, context):
             'body': json.dumps({'error': str(e)})
         }
 
-def get_tables():
+def get_tables(event):
     """Get all tables"""
     try:
-        response = table.scan()
-        items = decimal_to_native(response.get('Items', []))
-        
-        return {
-            'statusCode': 200,
-            'headers': CORS_HEADERS,
-            'body': json.dumps({
+        def build_body():
+            items = decimal_to_native(scan_all(table, TABLE_LIST_FIELDS))
+            return json.dumps({
                 'message': 'Tables retrieved successfully',
                 'data': items
             })
-        }
+        
+        # Table status changes with bookings, so clients must revalidate every time
+        return conditional_get(event, 'tables', build_body, CORS_HEADERS, cache_control='no-cache')
     except Exception as e:
         return {
             'statusCode': 500,
@@ -95,8 +101,7 @@ def generate_table_id():
     """Generate readable table ID: TBL-001, TBL-002, etc."""
     try:
         # Get count of all tables
-        response = table.scan()
-        count = len(response.get('Items', []))
+        count = sum(1 for _ in iter_scan(table, ('id',)))
         sequence = str(count + 1).zfill(3)  # 001, 002, 003...
         
         return f'TBL-{sequence}'
@@ -137,6 +142,7 @@ def create_table(data):
         
         # Save to DynamoDB
         table.put_item(Item=data)
+        content_changed('tables')
         
         return {
             'statusCode': 201,
@@ -200,6 +206,7 @@ def update_table(data):
             kwargs['ExpressionAttributeNames'] = expression_attribute_names
         
         response = table.update_item(**kwargs)
+        content_changed('tables')
         
         return {
             'statusCode': 200,
@@ -237,6 +244,7 @@ def delete_table(data):
                 }
         
         table.delete_item(Key={'id': str(data['id'])})
+        content_changed('tables')
         
         return {
             'statusCode': 200,
@@ -0,0 +1,62 @@
+"""
+cognito_client call metrics: the botocore event hooks must record every call
+without changing what the caller sees
+Run from the lambda/ directory: python -m pytest tests
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+from botocore.exceptions import EndpointConnectionError
+
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'test')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'test')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import cognito_client
+from cognito_client import cognito
+
+@pytest.fixture(autouse=True)
+def fresh_metrics(monkeypatch):
+    cognito_client.call_metrics.clear()
+    # Keep the interval open so nothing is emitted (and cleared) mid-test
+    monkeypatch.setattr(cognito_client, 'METRICS_INTERVAL_SECONDS', 3600)
+    monkeypatch.setattr(cognito_client, 'metrics_emitted_at', cognito_client.time.time())
+    yield
+    cognito_client.call_metrics.clear()
+
+def respond(monkeypatch, status_code, parsed):
+    """Answer every request with a canned response (Stubber would skip the before-call hook)"""
+    http_response = SimpleNamespace(status_code=status_code, headers={}, content=b'')
+    monkeypatch.setattr(cognito._endpoint, 'make_request', lambda *args, **kwargs: (http_response, parsed))
+
+def test_successful_call_is_timed(monkeypatch):
+    respond(monkeypatch, 200, {'Username': 'alice', 'UserAttributes': [], 'ResponseMetadata': {}})
+    assert cognito.get_user(AccessToken='token')['Username'] == 'alice'
+
+    metrics = cognito_client.get_cognito_metrics()['GetUser']
+    assert metrics['calls'] == 1
+    assert metrics['errors'] == 0
+    assert metrics['p50Ms'] is not None
+
+def test_service_error_counts_as_error(monkeypatch):
+    respond(monkeypatch, 400, {'Error': {'Code': 'NotAuthorizedException', 'Message': 'no'}, 'ResponseMetadata': {}})
+    with pytest.raises(cognito.exceptions.NotAuthorizedException):
+        cognito.get_user(AccessToken='token')
+
+    assert cognito_client.get_cognito_metrics()['GetUser']['errors'] == 1
+
+def test_network_error_propagates_and_is_recorded(monkeypatch):
+    def unreachable(*args, **kwargs):
+        raise EndpointConnectionError(endpoint_url='https://cognito-idp.us-east-1.amazonaws.com/')
+
+    monkeypatch.setattr(cognito._endpoint, 'make_request', unreachable)
+    with pytest.raises(EndpointConnectionError):
+        cognito.get_user(AccessToken='token')
+
+    metrics = cognito_client.get_cognito_metrics()['GetUser']
+    assert metrics['calls'] == 1
+    assert metrics['errors'] == 1
@@ -0,0 +1,142 @@
+"""
+token_verifier against a locally generated RSA key pair
+The JWKS comes from the test key instead of Cognito and Redis is disabled,
+so revocation is checked through the in-process record
+Run from the lambda/ directory: python -m pytest tests
+"""
+
+import json
+import os
+import sys
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import token_verifier
+
+CLIENT_ID = 'test-client'
+ISSUER = 'https://cognito-idp.us-east-1.amazonaws.com/us-east-1_test'
+KID = 'test-key'
+
+private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+other_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+@pytest.fixture(autouse=True)
+def local_pool(monkeypatch):
+    """Point token_verifier at the test key; returns the list of JWKS fetches"""
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update({'kid': KID, 'alg': 'RS256', 'use': 'sig'})
+    fetches = []
+
+    def fetch_jwks():
+        fetches.append(time.time())
+        return {KID: jwt.PyJWK(jwk)}
+
+    monkeypatch.setattr(token_verifier, 'CLIENT_ID', CLIENT_ID)
+    monkeypatch.setattr(token_verifier, 'ISSUER', ISSUER)
+    monkeypatch.setattr(token_verifier, 'fetch_jwks', fetch_jwks)
+    monkeypatch.setattr(token_verifier, 'jwks_keys', {})
+    monkeypatch.setattr(token_verifier, 'jwks_fetched_at', 0.0)
+    monkeypatch.setattr(token_verifier, 'revocation_checks', {})
+    monkeypatch.setattr(token_verifier, 'get_redis_client', lambda: None)
+    return fetches
+
+def make_token(token_use='access', expires_in=3600, key=private_key, kid=KID, **overrides):
+    now = int(time.time())
+    claims = {
+        'sub': 'c0ffee', 'iss': ISSUER, 'token_use': token_use,
+        'iat': now, 'exp': now + expires_in, 'username': 'alice'
+    }
+    if token_use == 'id':
+        claims.update({'aud': CLIENT_ID, 'cognito:username': 'alice', 'email': 'alice@example.com',
+                       'name': 'Alice', 'custom:role': 'admin', 'email_verified': True})
+        del claims['username']
+    else:
+        claims['client_id'] = CLIENT_ID
+    claims.update(overrides)
+    return jwt.encode(claims, key, algorithm='RS256', headers={'kid': kid})
+
+def rejection(token):
+    with pytest.raises(token_verifier.TokenError) as excinfo:
+        token_verifier.verify_token(token)
+    return str(excinfo.value)
+
+def test_valid_access_token():
+    claims = token_verifier.verify_token(make_token())
+    assert token_verifier.claims_username(claims) == 'alice'
+
+def test_valid_id_token_attributes():
+    claims = token_verifier.verify_token(make_token('id'))
+    attributes = token_verifier.claims_attributes(claims)
+    assert token_verifier.claims_username(claims) == 'alice'
+    assert attributes['custom:role'] == 'admin'
+    assert attributes['email_verified'] == 'true'
+
+def test_expired_token():
+    assert rejection(make_token(expires_in=-60)) == 'Token expired'
+
+def test_expiry_within_leeway_is_accepted():
+    token_verifier.verify_token(make_token(expires_in=-(token_verifier.LEEWAY_SECONDS - 2)))
+
+@pytest.mark.parametrize('token_use, claim', [('access', 'client_id'), ('id', 'aud')])
+def test_wrong_audience(token_use, claim):
+    token = make_token(token_use, **{claim: 'someone-else'})
+    assert rejection(token) == 'Token was issued for another client'
+
+@pytest.mark.parametrize('token_use', ['access', 'id'])
+def test_missing_client_id_rejects(monkeypatch, token_use):
+    monkeypatch.setattr(token_verifier, 'CLIENT_ID', None)
+    assert rejection(make_token(token_use)).startswith('No app client id')
+
+def test_wrong_issuer():
+    assert rejection(make_token(iss='https://cognito-idp.us-east-1.amazonaws.com/other')).startswith('Invalid token')
+
+def test_bad_signature():
+    assert rejection(make_token(key=other_key)).startswith('Invalid token')
+
+def test_tampered_payload():
+    header, payload, signature = make_token().split('.')
+    assert rejection('.'.join([header, payload[:-2] + 'AA', signature])).startswith('Invalid token')
+
+def test_refresh_token_use_rejected():
+    assert rejection(make_token(token_use='refresh')).startswith('Unexpected token_use')
+
+def test_garbage_token():
+    assert rejection('not-a-jwt').startswith('Malformed token')
+
+def test_unknown_kid_does_not_refetch_jwks(local_pool):
+    token_verifier.verify_token(make_token())
+    assert rejection(make_token(kid='rotated-away')) == 'Unknown signing key'
+    assert rejection(make_token(kid='rotated-away')) == 'Unknown signing key'
+    assert len(local_pool) == 1
+
+def test_revoked_tokens_rejected():
+    signed_out = make_token(username='bob')
+    token_verifier.verify_token(signed_out)
+    token_verifier.revoke_user_tokens('bob')
+    assert rejection(signed_out) == 'Token revoked'
+
+def test_tokens_issued_after_revocation_pass():
+    token_verifier.revoke_user_tokens('bob')
+    token_verifier.verify_token(make_token(username='bob', iat=int(time.time()) + 1))
+
+def test_revocation_is_per_user():
+    token_verifier.revoke_user_tokens('bob')
+    token_verifier.verify_token(make_token())
+
+def test_revocation_record_outlives_the_signing_out_token(monkeypatch):
+    stored = {}
+
+    class Redis:
+        def setex(self, key, ttl, value):
+            stored[key] = (ttl, value)
+
+    monkeypatch.setattr(token_verifier, 'get_redis_client', lambda: Redis())
+    assert token_verifier.revoke_user_tokens('bob')
+    ttl, value = stored[token_verifier.revocation_key('bob')]
+    assert ttl >= token_verifier.MAX_TOKEN_LIFETIME_SECONDS
+    assert float(value) <= time.time()
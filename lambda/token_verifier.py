@@ -0,0 +1,230 @@
+"""
+Local verification of Cognito access and ID tokens
+Checks the RS256 signature against the user pool JWKS (fetched once per
+container, refreshed when an unknown key id shows up after a rotation), then
+expiry, issuer, audience/client_id and token_use, so requests don't need a
+cognito.get_user round trip just to authenticate
+Logout records the user's sign-out time in Redis; tokens issued before it are
+rejected (one GET per user, held in process for REVOCATION_CHECK_TTL)
+Requires PyJWT with the crypto extra (Lambda layer)
+"""
+
+import json
+import os
+import threading
+import time
+import urllib.request
+from typing import Dict, Optional, Sequence
+
+import jwt
+from redis_cache import get_redis_client
+
+COGNITO_REGION = os.environ.get('COGNITO_REGION') or os.environ.get('AWS_REGION', 'us-east-1')
+USER_POOL_ID = os.environ.get('COGNITO_USER_POOL_ID')
+CLIENT_ID = os.environ.get('COGNITO_CLIENT_ID')
+
+# Without a user pool id there is nothing to verify against, and without a client id
+# the audience can't be checked; callers fall back to Cognito
+LOCAL_VERIFICATION_ENABLED = bool(USER_POOL_ID and CLIENT_ID)
+
+ISSUER = f'https://cognito-idp.{COGNITO_REGION}.amazonaws.com/{USER_POOL_ID}'
+JWKS_URL = os.environ.get('COGNITO_JWKS_URL') or f'{ISSUER}/.well-known/jwks.json'
+JWKS_TIMEOUT_SECONDS = 3
+# Keys are re-read at most this often when a token names an unknown kid
+JWKS_MIN_REFRESH_SECONDS = int(os.environ.get('JWKS_MIN_REFRESH_SECONDS', '60'))
+# ...and unconditionally after this long, so retired keys drop out
+JWKS_MAX_AGE_SECONDS = int(os.environ.get('JWKS_MAX_AGE_SECONDS', str(24 * 3600)))
+# Tolerated clock skew for exp/iat
+LEEWAY_SECONDS = 5
+
+# Revocations reach other containers within this many seconds
+REVOCATION_CHECK_TTL = int(os.environ.get('REVOCATION_CHECK_TTL', '5'))
+# Longest access/ID token validity configured on the app client (Cognito allows up to 1 day);
+# a sign-out record is kept this long so every token issued before it has expired
+MAX_TOKEN_LIFETIME_SECONDS = int(os.environ.get('COGNITO_MAX_TOKEN_LIFETIME', str(24 * 3600)))
+
+# JWKS for this container (reuse across Lambda invocations)
+jwks_keys = {}
+jwks_fetched_at = 0.0
+jwks_lock = threading.Lock()
+
+# Sign-out times seen by this container: username -> (checked_at, signed_out_at or None)
+revocation_checks = {}
+
+class TokenError(Exception):
+    """Token is malformed, expired, or not issued for this user pool/client"""
+
+def fetch_jwks() -> Dict[str, jwt.PyJWK]:
+    """Download the user pool signing keys, keyed by kid"""
+    with urllib.request.urlopen(JWKS_URL, timeout=JWKS_TIMEOUT_SECONDS) as response:
+        jwks = json.loads(response.read())
+    return {key['kid']: jwt.PyJWK(key) for key in jwks.get('keys', [])}
+
+def get_signing_key(kid: str) -> jwt.PyJWK:
+    """
+    Get the public key for a kid, refreshing the cached JWKS if it is stale
+    or the kid is unknown (key rotation)
+    """
+    global jwks_keys, jwks_fetched_at
+
+    now = time.time()
+    if kid in jwks_keys and now - jwks_fetched_at < JWKS_MAX_AGE_SECONDS:
+        return jwks_keys[kid]
+
+    with jwks_lock:
+        # Another thread may have refreshed while we waited
+        stale = time.time() - jwks_fetched_at >= JWKS_MAX_AGE_SECONDS
+        can_refresh = time.time() - jwks_fetched_at >= JWKS_MIN_REFRESH_SECONDS
+        if (stale or kid not in jwks_keys) and can_refresh:
+            try:
+                jwks_keys = fetch_jwks()
+                jwks_fetched_at = time.time()
+                print(f"JWKS refreshed: {len(jwks_keys)} keys")
+            except Exception as e:
+                # Keep serving with the keys we have; an unknown kid still fails below
+                print(f"⚠️ JWKS fetch failed: {str(e)}")
+
+    if kid not in jwks_keys:
+        raise TokenError('Unknown signing key')
+    return jwks_keys[kid]
+
+def verify_token(token: str, token_use: Sequence[str] = ('access', 'id'),
+                 client_id: Optional[str] = None) -> dict:
+    """
+    Verify a Cognito JWT locally
+
+    Args:
+        token: Access or ID token
+        token_use: Accepted token types
+        client_id: App client the token must be issued for (defaults to COGNITO_CLIENT_ID)
+
+    Returns:
+        Verified claims
+
+    Raises:
+        TokenError: If the token is invalid for any reason
+    """
+    client_id = client_id or CLIENT_ID
+    if not client_id:
+        # A token for any app client in the pool would otherwise pass
+        raise TokenError('No app client id to check the token audience against')
+    try:
+        header = jwt.get_unverified_header(token)
+    except jwt.PyJWTError as e:
+        raise TokenError(f'Malformed token: {str(e)}')
+
+    if header.get('alg') != 'RS256' or not header.get('kid'):
+        raise TokenError('Unsupported token algorithm')
+
+    signing_key = get_signing_key(header['kid'])
+    try:
+        # Access tokens carry client_id instead of aud, so aud is checked below
+        claims = jwt.decode(
+            token,
+            signing_key.key,
+            algorithms=['RS256'],
+            issuer=ISSUER,
+            leeway=LEEWAY_SECONDS,
+            options={'verify_aud': False, 'require': ['exp', 'iss', 'token_use']}
+        )
+    except jwt.ExpiredSignatureError:
+        raise TokenError('Token expired')
+    except jwt.PyJWTError as e:
+        raise TokenError(f'Invalid token: {str(e)}')
+
+    if claims.get('token_use') not in token_use:
+        raise TokenError(f"Unexpected token_use: {claims.get('token_use')}")
+
+    audience = claims.get('aud') if claims['token_use'] == 'id' else claims.get('client_id')
+    if audience != client_id:
+        raise TokenError('Token was issued for another client')
+
+    if is_revoked(claims_username(claims), claims.get('iat', 0)):
+        raise TokenError('Token revoked')
+
+    return claims
+
+def revocation_key(username: str) -> str:
+    return f"revoked:user:{username}"
+
+def signed_out_at(username: str) -> Optional[float]:
+    """
+    Last sign-out time for a user, or None
+    Without Redis this fails open: tokens stay valid until they expire
+    """
+    entry = revocation_checks.get(username)
+    if entry and time.time() - entry[0] < REVOCATION_CHECK_TTL:
+        return entry[1]
+
+    value = None
+    client = get_redis_client()
+    if client is not None:
+        try:
+            stored = client.get(revocation_key(username))
+            value = float(stored) if stored else None
+        except Exception as e:
+            print(f"Revocation check error: {e}")
+    revocation_checks[username] = (time.time(), value)
+    return value
+
+def is_revoked(username: str, issued_at: float) -> bool:
+    """
+    True if the user signed out at or after issued_at
+    iat has whole-second resolution, so a token issued later within the same
+    second as the sign-out is rejected too (fails closed; the user signs in again)
+    """
+    revoked_at = signed_out_at(username)
+    return revoked_at is not None and issued_at <= revoked_at
+
+def revoke_user_tokens(username: str) -> bool:
+    """
+    Reject every token issued to a user up to now (after global_sign_out)
+    The record outlives any token of any session issued before it: it is kept
+    for MAX_TOKEN_LIFETIME_SECONDS, not the remaining life of the token that
+    signed out
+
+    Args:
+        username: Cognito username
+
+    Returns:
+        True if recorded in Redis
+    """
+    now = time.time()
+    revocation_checks[username] = (now, now)
+    ttl = MAX_TOKEN_LIFETIME_SECONDS + LEEWAY_SECONDS
+
+    client = get_redis_client()
+    if client is None:
+        return False
+    try:
+        client.setex(revocation_key(username), ttl, repr(now))
+        print(f"Tokens revoked for {username} (TTL: {ttl}s)")
+        return True
+    except Exception as e:
+        print(f"Revocation write error: {e}")
+        return False
+
+def unverified_claims(token: str) -> Optional[dict]:
+    """
+    Claims of a token without checking it
+    Only for tokens received directly from Cognito (initiate_auth) or already
+    accepted by it (e.g. logout); None if the token can't be decoded
+    """
+    try:
+        return jwt.decode(token, options={'verify_signature': False})
+    except jwt.PyJWTError:
+        return None
+
+def claims_username(claims: dict) -> str:
+    """Cognito username from access (username) or ID (cognito:username) token claims"""
+    return claims.get('username') or claims.get('cognito:username') or claims['sub']
+
+def claims_attributes(claims: dict) -> Dict[str, str]:
+    """
+    User attributes carried by the token, in cognito.get_user attribute naming
+    ID tokens carry email, name and custom attributes; access tokens only sub
+    """
+    skip = {'iss', 'aud', 'exp', 'iat', 'auth_time', 'jti', 'token_use', 'origin_jti',
+            'event_id', 'client_id', 'scope', 'username', 'cognito:username', 'cognito:groups'}
+    return {k: str(v).lower() if isinstance(v, bool) else str(v)
+            for k, v in claims.items() if k not in skip}
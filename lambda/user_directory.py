@@ -0,0 +1,233 @@
+"""
+Batch display-profile lookup for admin views (chat inbox, bookings list)
+Usernames resolve from this container's caches first, then one Redis MGET
+over the profile cache and display cards, then BatchGetItem on USERS_TABLE in
+100-key chunks (read in parallel) for whatever is left: two BatchGetItem calls
+for 200 cold users.
+
+Emails (chat and bookings store them) are mapped to usernames through the
+USERS_TABLE email index. That costs one Query per email not seen before,
+LOOKUP_CONCURRENCY in flight, so 200 never-seen emails are 200 Queries; the
+mapping is then cached for a day. The index has to exist:
+    aws dynamodb update-table --table-name USERS_TABLE \
+        --attribute-definitions AttributeName=email,AttributeType=S \
+        --global-secondary-index-updates '[{"Create": {"IndexName": "email-index",
+            "KeySchema": [{"AttributeName": "email", "KeyType": "HASH"}],
+            "Projection": {"ProjectionType": "KEYS_ONLY"}}}]'
+(add ProvisionedThroughput for a provisioned-capacity table)
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import boto3
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from dynamo_scan import build_projection
+from redis_cache import decimal_to_native, get_cached_many, set_cached_many
+from user_profile import PROFILE_LOCAL_TTL, local_profiles, profile_cache_key
+
+USERS_TABLE = os.environ.get('USERS_TABLE', 'USERS_TABLE')
+# GSI on USERS_TABLE with 'email' as partition key (only keys need to be projected)
+USERS_EMAIL_INDEX = os.environ.get('USERS_EMAIL_INDEX', 'email-index')
+
+# Attributes returned per user; 'id' is the USERS_TABLE key (the username)
+DISPLAY_FIELDS = ('username', 'name', 'email', 'avatarUrl', 'role')
+BATCH_GET_SIZE = 100  # DynamoDB BatchGetItem limit
+BATCH_GET_MAX_RETRIES = 5
+LOOKUP_CONCURRENCY = 4
+CARD_TTL = 300
+# Unknown ids are remembered briefly so an inbox of guests doesn't re-query every load
+MISSING_CARD_TTL = 60
+# A user's email rarely changes; the card TTL bounds how stale the profile itself gets
+EMAIL_MAPPING_TTL = 24 * 3600
+
+dynamodb = boto3.resource('dynamodb')
+
+# Display cards cached in this container: id -> (expires_at, card); card['username'] is None if unknown
+local_cards = {}
+# email -> (expires_at, username) for emails found in the index
+local_usernames = {}
+
+def card_cache_key(user_id: str) -> str:
+    return f"user:card:{user_id}"
+
+def email_cache_key(email: str) -> str:
+    return f"user:email:{email}"
+
+def display_card(user_id: str, item: Optional[dict]) -> dict:
+    """Display fields of a USERS_TABLE item or merged profile; unknown users get username None"""
+    if not item:
+        return {'id': user_id, 'username': None}
+    item = decimal_to_native(item)
+    card = {field: item.get(field, '') for field in DISPLAY_FIELDS}
+    card['id'] = user_id
+    card['username'] = item.get('username') or item.get('id') or user_id
+    return card
+
+def batch_get_users(usernames: Iterable[str], fields=DISPLAY_FIELDS) -> Dict[str, dict]:
+    """
+    Read USERS_TABLE items by username with BatchGetItem
+
+    Chunks of 100 keys are read in parallel; unprocessed keys are retried with backoff
+
+    Args:
+        usernames: USERS_TABLE ids
+        fields: Attributes to read ('id' is always included)
+
+    Returns:
+        username -> item for the users that exist
+    """
+    usernames = list(dict.fromkeys(u for u in usernames if u))
+    projection = build_projection(('id',) + tuple(f for f in fields if f != 'id'))
+
+    def read_chunk(chunk):
+        request = {'Keys': [{'id': username} for username in chunk], **projection}
+        items = []
+        for attempt in range(BATCH_GET_MAX_RETRIES + 1):
+            response = dynamodb.batch_get_item(RequestItems={USERS_TABLE: request})
+            items.extend(response.get('Responses', {}).get(USERS_TABLE, []))
+            request = response.get('UnprocessedKeys', {}).get(USERS_TABLE)
+            if not request:
+                return items
+            if attempt < BATCH_GET_MAX_RETRIES:
+                time.sleep(min(0.05 * (2 ** attempt), 2))
+        print(f"⚠️ BatchGetItem left {len(request['Keys'])} keys unprocessed")
+        return items
+
+    chunks = [usernames[i:i + BATCH_GET_SIZE] for i in range(0, len(usernames), BATCH_GET_SIZE)]
+    if len(chunks) <= 1:
+        results = [read_chunk(chunk) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=min(LOOKUP_CONCURRENCY, len(chunks))) as pool:
+            results = list(pool.map(read_chunk, chunks))
+    return {item['id']: item for chunk_items in results for item in chunk_items}
+
+def usernames_for_emails(emails: List[str]) -> Tuple[Dict[str, str], Set[str]]:
+    """
+    Map emails to usernames: cached mappings first (this container, then one
+    Redis MGET), then one email-index Query per remaining email, in parallel
+
+    Returns:
+        (email -> username for the emails found, emails whose lookup failed)
+    """
+    now = time.time()
+    usernames = {}
+    pending = []
+    for email in emails:
+        entry = local_usernames.get(email)
+        if entry and entry[0] > now:
+            usernames[email] = entry[1]
+        else:
+            pending.append(email)
+
+    if pending:
+        cached = get_cached_many([email_cache_key(email) for email in pending])
+        for email, username in zip(pending, cached):
+            if username:
+                usernames[email] = username
+                local_usernames[email] = (now + PROFILE_LOCAL_TTL, username)
+        pending = [email for email in pending if email not in usernames]
+    if not pending:
+        return usernames, set()
+
+    table = dynamodb.Table(USERS_TABLE)
+
+    def lookup(email):
+        try:
+            response = table.query(
+                IndexName=USERS_EMAIL_INDEX,
+                KeyConditionExpression=Key('email').eq(email),
+                ProjectionExpression='id',
+                Limit=1
+            )
+        except ClientError as e:
+            print(f"⚠️ Email lookup failed ({USERS_EMAIL_INDEX}): {str(e)}")
+            return email, None, True
+        items = response.get('Items', [])
+        return email, items[0]['id'] if items else None, False
+
+    with ThreadPoolExecutor(max_workers=min(LOOKUP_CONCURRENCY, len(pending))) as pool:
+        results = list(pool.map(lookup, pending))
+
+    found = {email: username for email, username, _ in results if username}
+    for email, username in found.items():
+        local_usernames[email] = (now + PROFILE_LOCAL_TTL, username)
+    set_cached_many({email_cache_key(email): username for email, username in found.items()}, EMAIL_MAPPING_TTL)
+    usernames.update(found)
+    return usernames, {email for email, _, failed in results if failed}
+
+def get_display_profiles(user_ids: Iterable[str]) -> Dict[str, dict]:
+    """
+    Display profiles for many users at once
+
+    Args:
+        user_ids: Usernames or emails (as stored in bookings and chat)
+
+    Returns:
+        id -> {'id', 'username', 'name', 'email', 'avatarUrl', 'role'} for known users
+    """
+    user_ids = list(dict.fromkeys(str(u).strip() for u in user_ids if u and str(u).strip()))
+    now = time.time()
+    cards = {}
+
+    # This container: merged profiles (fresher), then display cards
+    pending = []
+    for user_id in user_ids:
+        profile_entry = local_profiles.get(user_id)
+        card_entry = local_cards.get(user_id)
+        if profile_entry and profile_entry[0] > now:
+            cards[user_id] = display_card(user_id, profile_entry[1])
+        elif card_entry and card_entry[0] > now:
+            cards[user_id] = card_entry[1]
+        else:
+            pending.append(user_id)
+
+    # Redis: one MGET over cards and merged profiles (profiles are fresher)
+    if pending:
+        cached = get_cached_many(
+            [card_cache_key(u) for u in pending] + [profile_cache_key(u) for u in pending]
+        )
+        card_hits, profile_hits = cached[:len(pending)], cached[len(pending):]
+        missing = []
+        for user_id, card, profile in zip(pending, card_hits, profile_hits):
+            if profile is not None:
+                cards[user_id] = display_card(user_id, profile)
+            elif card is not None:
+                cards[user_id] = card
+            else:
+                missing.append(user_id)
+            if user_id in cards:
+                local_cards[user_id] = (now + PROFILE_LOCAL_TTL, cards[user_id])
+        pending = missing
+
+    # DynamoDB for the rest
+    if pending:
+        emails = [u for u in pending if '@' in u]
+        username_for = {u: u for u in pending if '@' not in u}
+        lookup_failed = set()
+        if emails:
+            found, lookup_failed = usernames_for_emails(emails)
+            username_for.update(found)
+        try:
+            items = batch_get_users(username_for.values())
+        except Exception as db_error:
+            print(f"DynamoDB error: {str(db_error)}")
+            items = None
+
+        if items is not None:
+            known, unknown = {}, {}
+            for user_id in pending:
+                if user_id in lookup_failed:
+                    # Not known to be missing; retried on the next call
+                    continue
+                card = display_card(user_id, items.get(username_for.get(user_id)))
+                (known if card['username'] else unknown)[card_cache_key(user_id)] = card
+                local_cards[user_id] = (now + PROFILE_LOCAL_TTL, card)
+                cards[user_id] = card
+            set_cached_many(known, CARD_TTL)
+            set_cached_many(unknown, MISSING_CARD_TTL)
+
+    return {user_id: card for user_id, card in cards.items() if card.get('username')}
@@ -2,8 +2,14 @@ import json
 import boto3
 import os
 from decimal import Decimal
+from cognito_client import cognito
+from token_verifier import (
+    LOCAL_VERIFICATION_ENABLED, TokenError, claims_attributes, claims_username, verify_token
+)
+from user_profile import (
+    cache_profile, get_cached_profile, invalidate_profile, merge_profile, report_missing_profile
+)
 
-cognito = boto3.client('cognito-idp')
 dynamodb = boto3.resource('dynamodb')
 
 USERS_TABLE = os.environ.get('USERS_TABLE', 'USERS_TABLE')
@@ -19,6 +25,37 @@ def decimal_to_native(obj):
     else:
         return obj
 
+def cognito_identity(access_token):
+    """Username and attributes via cognito.get_user (network call)"""
+    try:
+        user_info = cognito.get_user(AccessToken=access_token)
+    except Exception as cognito_err:
+        print(f"❌ Cognito get_user failed: {str(cognito_err)}")
+        raise cognito_err
+    attributes = {attr['Name']: attr['Value'] for attr in user_info['UserAttributes']}
+    return user_info['Username'], attributes
+
+def token_identity(token):
+    """
+    Authenticate the bearer token
+
+    Returns:
+        (username, attributes, claims); claims is None when Cognito did the check
+    """
+    if not LOCAL_VERIFICATION_ENABLED:
+        username, attributes = cognito_identity(token)
+        return username, attributes, None
+    claims = verify_token(token)
+    return claims_username(claims), claims_attributes(claims), claims
+
+def missing_profile_attributes(attributes, db_user):
+    """True when neither the token nor DynamoDB has email, name and role"""
+    return not (
+        (db_user.get('email') or attributes.get('email'))
+        and (db_user.get('name') or attributes.get('name'))
+        and (db_user.get('role') or attributes.get('custom:role'))
+    )
+
 def lambda_handler(event, context):
     """
     Get current user info from Cognito and DynamoDB
@@ -62,22 +99,8 @@ def lambda_handler(event, context):
         
         access_token = auth_header.split(' ')[1]
         
-        # Get user info from Cognito
-        try:
-            user_info = cognito.get_user(AccessToken=access_token)
-        except Exception as cognito_err:
-            print(f"❌ Cognito get_user failed: {str(cognito_err)}")
-            raise cognito_err
-
-        
-        # Extract username and attributes
-        username = user_info['Username']
-        attributes = {}
-        for attr in user_info['UserAttributes']:
-            attributes[attr['Name']] = attr['Value']
-        
-        # Check if admin
-        is_admin = attributes.get('custom:role') == 'admin'
+        # Verify the token locally (JWKS); Cognito is only called for missing attributes
+        username, attributes, claims = token_identity(access_token)
         
         # Get additional user data from DynamoDB
         table = dynamodb.Table(USERS_TABLE)
@@ -132,6 +155,12 @@ def lambda_handler(event, context):
                 final_role = db_role or attributes.get('custom:role') or 'customer'
                 updated_item['isAdmin'] = (final_role == 'admin')
                 
+                # Write-through; drop the cached profile if it can't be rebuilt without Cognito
+                if missing_profile_attributes(attributes, updated_item):
+                    invalidate_profile(username)
+                else:
+                    cache_profile(username, merge_profile(username, attributes, updated_item))
+                
                 return {
                     'statusCode': 200,
                     'headers': headers,
@@ -145,6 +174,16 @@ def lambda_handler(event, context):
                     'headers': headers,
                     'body': json.dumps({'error': 'Failed to update profile', 'details': str(e)})
                 }
+        # Profiles rarely change: serve repeat fetches from the profile cache
+        user_data = get_cached_profile(username)
+        if user_data is not None:
+            return {
+                'statusCode': 200,
+                'headers': headers,
+                'body': json.dumps({'userInfo': user_data})
+            }
+        
+        db_ok = True
         try:
             # Table uses 'id' as Partition Key, which stores the username
             db_response = table.get_item(Key={'id': username})
@@ -152,24 +191,21 @@ def lambda_handler(event, context):
         except Exception as db_error:
             print(f"DynamoDB error: {str(db_error)}")
             db_user = {}
+            db_ok = False
         
-        # Determine role: DynamoDB > Cognito > 'customer'
-        db_role = db_user.get('role')
-        cognito_role = attributes.get('custom:role')
-        final_role = db_role or cognito_role or 'customer'
+        # Access tokens carry no profile attributes; ask Cognito only if DynamoDB lacks them too
+        if claims is not None and claims.get('token_use') == 'access' and missing_profile_attributes(attributes, db_user):
+            _, cognito_attributes = cognito_identity(access_token)
+            attributes = {**attributes, **cognito_attributes}
         
-        # Check if admin
-        is_admin = final_role == 'admin'
+        # Merge user data (role: DynamoDB > Cognito > 'customer')
+        user_data = merge_profile(username, attributes, db_user)
         
-        # Merge user data
-        user_data = {
-            'username': username,
-            'email': attributes.get('email', ''),
-            'name': attributes.get('name', ''),
-            'role': final_role,
-            'isAdmin': is_admin,
-            **{k: v for k, v in db_user.items() if k != 'role'}
-        }
+        # Don't cache a profile built without the USERS_TABLE row
+        if db_ok:
+            cache_profile(username, user_data)
+            if not db_user:
+                report_missing_profile(username)
         
         print(f"✅ User info retrieved for {username}")
         
@@ -179,6 +215,14 @@ def lambda_handler(event, context):
             'body': json.dumps({'userInfo': user_data})
         }
         
+    except TokenError as e:
+        print(f"❌ Token rejected: {str(e)}")
+        return {
+            'statusCode': 401,
+            'headers': headers,
+            'body': json.dumps({'error': 'Invalid or expired token'})
+        }
+    
     except cognito.exceptions.NotAuthorizedException:
         print(f"❌ Invalid or expired token")
         return {
@@ -0,0 +1,74 @@
+"""
+Merged user profile cache
+The profile returned by /api/me and login (Cognito attributes + USERS_TABLE
+row + resolved role) is cached per username in process and in Redis, so
+repeat fetches cost no DynamoDB or Cognito calls
+"""
+
+import time
+from typing import Optional
+
+from redis_cache import decimal_to_native, delete_cached, get_cached, get_redis_client, set_cached
+
+PROFILE_TTL = 900
+# Short, so a profile updated through another container is picked up quickly
+PROFILE_LOCAL_TTL = 30
+
+# Usernames seen without a USERS_TABLE row, provisioned by the next reconcile run (user_provisioning)
+PENDING_PROVISION_KEY = 'user:provision:pending'
+
+# Profiles cached in this container: username -> (expires_at, profile)
+local_profiles = {}
+
+def profile_cache_key(username: str) -> str:
+    return f"user:profile:{username}"
+
+def merge_profile(username: str, attributes: dict, db_user: dict) -> dict:
+    """
+    Merge Cognito attributes with the USERS_TABLE item
+    Role precedence: DynamoDB > Cognito > 'customer'
+    """
+    db_user = decimal_to_native(db_user or {})
+    final_role = db_user.get('role') or attributes.get('custom:role') or 'customer'
+    return {
+        'username': username,
+        'email': attributes.get('email', ''),
+        'name': attributes.get('name', ''),
+        'role': final_role,
+        'isAdmin': final_role == 'admin',
+        **{k: v for k, v in db_user.items() if k != 'role'}
+    }
+
+def get_cached_profile(username: str) -> Optional[dict]:
+    """Cached profile from this container, then Redis; None on miss"""
+    entry = local_profiles.get(username)
+    if entry and entry[0] > time.time():
+        return entry[1]
+
+    profile = get_cached(profile_cache_key(username))
+    if profile is not None:
+        local_profiles[username] = (time.time() + PROFILE_LOCAL_TTL, profile)
+    return profile
+
+def cache_profile(username: str, profile: dict) -> dict:
+    """Store a merged profile in both cache layers"""
+    profile = decimal_to_native(profile)
+    local_profiles[username] = (time.time() + PROFILE_LOCAL_TTL, profile)
+    set_cached(profile_cache_key(username), profile, PROFILE_TTL)
+    return profile
+
+def invalidate_profile(username: str) -> None:
+    """Drop a profile from both cache layers (logout, unknown role after an update)"""
+    local_profiles.pop(username, None)
+    delete_cached(profile_cache_key(username))
+
+def report_missing_profile(username: str) -> None:
+    """Queue a user whose USERS_TABLE row is missing for the provisioning reconciler"""
+    client = get_redis_client()
+    if client is None or not username:
+        return
+    try:
+        client.sadd(PENDING_PROVISION_KEY, username)
+        print(f"Profile missing for {username}, queued for provisioning")
+    except Exception as e:
+        print(f"Provision queue error: {e}")
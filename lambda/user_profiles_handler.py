@@ -0,0 +1,61 @@
+import json
+from auth_middleware import require_auth
+from user_directory import get_display_profiles
+
+# Largest lookup accepted per request (an admin inbox or bookings page)
+MAX_LOOKUP_IDS = 500
+
+CORS_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Content-Type,Authorization',
+    'Access-Control-Allow-Methods': 'POST,OPTIONS'
+}
+
+@require_auth(CORS_HEADERS, admin_methods=('POST',))
+def lambda_handler(event, context):
+    """
+    Display profiles for many users in one request (admin only)
+    POST /api/users/profiles
+    Body: { "ids": ["alice", "bob@example.com", ...] }  (usernames or emails)
+    Returns: { "profiles": { "<id>": { username, name, email, avatarUrl, role } }, "missing": [...] }
+    """
+
+    if event.get('httpMethod') == 'OPTIONS':
+        return {'statusCode': 200, 'headers': CORS_HEADERS, 'body': ''}
+
+    try:
+        body = json.loads(event.get('body') or '{}')
+        ids = body.get('ids')
+
+        if not isinstance(ids, list) or not all(isinstance(i, str) for i in ids):
+            return {
+                'statusCode': 400,
+                'headers': CORS_HEADERS,
+                'body': json.dumps({'error': 'ids must be a list of usernames or emails'})
+            }
+        if len(ids) > MAX_LOOKUP_IDS:
+            return {
+                'statusCode': 400,
+                'headers': CORS_HEADERS,
+                'body': json.dumps({'error': f'At most {MAX_LOOKUP_IDS} ids per request'})
+            }
+
+        profiles = get_display_profiles(ids)
+
+        return {
+            'statusCode': 200,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({
+                'profiles': profiles,
+                'missing': [i for i in dict.fromkeys(ids) if i not in profiles]
+            })
+        }
+
+    except Exception as e:
+        print(f"❌ Profile lookup error: {str(e)}")
+        return {
+            'statusCode': 500,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({'error': 'Profile lookup failed', 'message': str(e)})
+        }
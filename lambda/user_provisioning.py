@@ -0,0 +1,258 @@
+"""
+USERS_TABLE provisioning from the Cognito user pool
+Profiles are normally written one at a time by verify_email_handler; when that
+write fails the user has no row and every login or /api/me repeats a get_item
+miss. This module closes the gaps in bulk:
+
+    backfill   page through Cognito list_users while USERS_TABLE is read with
+               parallel segment scans, then create missing rows with
+               conditional put_item calls (several in flight)
+    reconcile  incremental version for a schedule (EventBridge): only users
+               modified in Cognito since the last run, plus usernames the hot
+               path reported as missing, are checked (BatchGetItem, no scan)
+
+Creates only apply if the row still doesn't exist, and rows that exist but
+lack username, email, name or role get just those fields filled in place, so
+rows written by verify_email_handler or /api/me meanwhile are never overwritten
+
+Run as a Lambda ({"mode": "reconcile" | "backfill", "dryRun": false}) or locally:
+    python user_provisioning.py --mode backfill --dry-run
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import boto3
+from cognito_client import cognito
+from dynamo_scan import scan_all
+from redis_cache import get_redis_client
+from user_directory import batch_get_users
+from user_profile import PENDING_PROVISION_KEY, invalidate_profile
+
+USER_POOL_ID = os.environ.get('COGNITO_USER_POOL_ID')
+USERS_TABLE = os.environ.get('USERS_TABLE', 'USERS_TABLE')
+
+LIST_USERS_PAGE_SIZE = 60  # Cognito maximum
+PROVISION_SCAN_SEGMENTS = int(os.environ.get('PROVISION_SCAN_SEGMENTS', '4'))
+WRITE_CONCURRENCY = 4
+# Pending usernames handled per reconcile run
+MAX_PENDING_PER_RUN = 1000
+# Re-check users modified this long before the watermark (clock skew, in-flight runs)
+RECONCILE_OVERLAP_SECONDS = 300
+WATERMARK_KEY = 'user:provision:watermark'
+
+# Fields a USERS_TABLE row must carry; filled from Cognito when absent or empty
+PROFILE_FIELDS = ('username', 'email', 'name', 'role')
+# Statuses that can sign in (the same users verify_email_handler provisions)
+PROVISIONED_STATUSES = ('CONFIRMED', 'EXTERNAL_PROVIDER')
+
+dynamodb = boto3.resource('dynamodb')
+
+def iter_cognito_users(client=None, user_pool_id: Optional[str] = None) -> Iterator[dict]:
+    """Every user of the pool, page by page (list_users follows PaginationToken)"""
+    client = client or cognito
+    kwargs = {'UserPoolId': user_pool_id or USER_POOL_ID, 'Limit': LIST_USERS_PAGE_SIZE}
+    while True:
+        response = client.list_users(**kwargs)
+        yield from response.get('Users', [])
+        if not response.get('PaginationToken'):
+            break
+        kwargs['PaginationToken'] = response['PaginationToken']
+
+def cognito_profile(user: dict) -> Optional[dict]:
+    """USERS_TABLE row for a Cognito user (same shape as handle_confirm), None if not signed up"""
+    if user.get('UserStatus') not in PROVISIONED_STATUSES:
+        return None
+    attributes = {attr['Name']: attr['Value'] for attr in user.get('Attributes', [])}
+    created = user.get('UserCreateDate') or datetime.now(timezone.utc)
+    return {
+        'id': user['Username'],  # Partition Key
+        'username': user['Username'],
+        'email': attributes.get('email', ''),
+        'name': attributes.get('name', ''),
+        'role': (attributes.get('custom:role') or 'customer').lower(),
+        'confirmedAt': created.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S') + 'Z'
+    }
+
+def modified_since(user: dict, since: Optional[float]) -> bool:
+    modified = user.get('UserLastModifiedDate')
+    return since is None or modified is None or modified.timestamp() >= since
+
+def plan_changes(expected: Iterable[dict], existing: Dict[str, dict]) -> Tuple[List[dict], Dict[str, dict]]:
+    """
+    Diff Cognito profiles against USERS_TABLE rows
+
+    Returns:
+        (rows to create, username -> fields to fill on existing rows)
+    """
+    missing, repairs = [], {}
+    for profile in expected:
+        row = existing.get(profile['id'])
+        if row is None:
+            missing.append(profile)
+            continue
+        fields = {f: profile[f] for f in PROFILE_FIELDS if not row.get(f) and profile[f]}
+        if fields:
+            repairs[profile['id']] = fields
+    return missing, repairs
+
+def create_row(item: dict) -> bool:
+    """Create a missing row; skipped if it was created meanwhile"""
+    try:
+        dynamodb.Table(USERS_TABLE).put_item(
+            Item=item,
+            ConditionExpression='attribute_not_exists(#id)',
+            ExpressionAttributeNames={'#id': 'id'}
+        )
+        return True
+    except dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+        print(f"Row for {item['id']} created since the diff, left as is")
+        return True
+    except Exception as e:
+        print(f"⚠️ Create failed for {item['id']}: {str(e)}")
+        return False
+
+def repair_row(username: str, fields: dict) -> bool:
+    """
+    Fill absent or empty fields on an existing row, keeping values set meanwhile
+    Absent fields are filled with if_not_exists; fields still holding '' are
+    then set only while they are empty
+    """
+    table = dynamodb.Table(USERS_TABLE)
+    names = {f'#f{i}': field for i, field in enumerate(fields)}
+    values = {f':v{i}': value for i, value in enumerate(fields.values())}
+    try:
+        response = table.update_item(
+            Key={'id': username},
+            UpdateExpression='SET ' + ', '.join(f'{n} = if_not_exists({n}, {v})' for n, v in zip(names, values)),
+            ConditionExpression='attribute_exists(#id)',
+            ExpressionAttributeNames={**names, '#id': 'id'},
+            ExpressionAttributeValues=values,
+            ReturnValues='ALL_NEW'
+        )
+        current = response.get('Attributes', {})
+        empty = [i for i, field in enumerate(fields) if current.get(field) == '']
+        if empty:
+            table.update_item(
+                Key={'id': username},
+                UpdateExpression='SET ' + ', '.join(f'#f{i} = :v{i}' for i in empty),
+                ConditionExpression=' AND '.join(f'#f{i} = :empty' for i in empty),
+                ExpressionAttributeNames={f'#f{i}': names[f'#f{i}'] for i in empty},
+                ExpressionAttributeValues={**{f':v{i}': values[f':v{i}'] for i in empty}, ':empty': ''}
+            )
+        invalidate_profile(username)
+        return True
+    except dynamodb.meta.client.exceptions.ConditionalCheckFailedException:
+        print(f"Row for {username} changed since the diff, left as is")
+        invalidate_profile(username)
+        return True
+    except Exception as e:
+        print(f"⚠️ Repair failed for {username}: {str(e)}")
+        return False
+
+def apply_changes(missing: List[dict], repairs: Dict[str, dict]) -> Tuple[List[str], List[str]]:
+    """
+    Write a plan: creates and repairs, WRITE_CONCURRENCY in flight
+
+    Returns:
+        (usernames not created, usernames not repaired)
+    """
+    with ThreadPoolExecutor(max_workers=WRITE_CONCURRENCY) as pool:
+        created = list(pool.map(create_row, missing))
+        repaired = list(pool.map(repair_row, repairs.keys(), repairs.values()))
+    not_created = [item['id'] for item, ok in zip(missing, created) if not ok]
+    not_repaired = [username for username, ok in zip(repairs, repaired) if not ok]
+    return not_created, not_repaired
+
+def summarize(mode: str, checked: int, missing: list, repairs: dict,
+              failures: Tuple[List[str], List[str]], started: float, dry_run: bool) -> dict:
+    not_created, not_repaired = failures
+    summary = {
+        'mode': mode,
+        'dryRun': dry_run,
+        'checked': checked,
+        'created': 0 if dry_run else len(missing) - len(not_created),
+        'repaired': 0 if dry_run else len(repairs) - len(not_repaired),
+        'failed': not_created + not_repaired,
+        'seconds': round(time.time() - started, 2)
+    }
+    if dry_run:
+        summary.update(wouldCreate=[m['id'] for m in missing], wouldRepair=repairs)
+    print(f"Provisioning {mode}: {json.dumps({k: v for k, v in summary.items() if not k.startswith('would')})}")
+    return summary
+
+def backfill(dry_run: bool = False, client=None) -> dict:
+    """Full pass: every Cognito user against a parallel scan of USERS_TABLE"""
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        users_future = pool.submit(lambda: list(iter_cognito_users(client)))
+        rows_future = pool.submit(
+            scan_all, dynamodb.Table(USERS_TABLE), ('id',) + PROFILE_FIELDS, PROVISION_SCAN_SEGMENTS
+        )
+        users, rows = users_future.result(), rows_future.result()
+
+    expected = [p for p in map(cognito_profile, users) if p]
+    missing, repairs = plan_changes(expected, {row['id']: row for row in rows})
+    failures = ([], []) if dry_run else apply_changes(missing, repairs)
+    return summarize('backfill', len(expected), missing, repairs, failures, started, dry_run)
+
+def reconcile(dry_run: bool = False, client=None) -> dict:
+    """
+    Incremental pass: users modified since the last run plus reported misses
+    Falls back to a backfill on the first run (or without Redis)
+    """
+    started = time.time()
+    redis_client = get_redis_client()
+    watermark = redis_client.get(WATERMARK_KEY) if redis_client else None
+    if watermark is None:
+        summary = backfill(dry_run, client)
+        if redis_client and not dry_run:
+            redis_client.set(WATERMARK_KEY, started)
+        return summary
+
+    since = float(watermark) - RECONCILE_OVERLAP_SECONDS
+    # Read, not popped: usernames leave the set only once handled, so a failed run loses none
+    pending = set(redis_client.srandmember(PENDING_PROVISION_KEY, MAX_PENDING_PER_RUN) or [])
+
+    # list_users can't filter by date, so the pool is paged and filtered here
+    expected = [
+        profile for profile, user in ((cognito_profile(u), u) for u in iter_cognito_users(client))
+        if profile and (profile['id'] in pending or modified_since(user, since))
+    ]
+    existing = batch_get_users((p['id'] for p in expected), PROFILE_FIELDS)
+    missing, repairs = plan_changes(expected, existing)
+    failures = ([], []) if dry_run else apply_changes(missing, repairs)
+
+    if not dry_run:
+        # Failed users stay pending and are retried by the next run even if Cognito doesn't touch them again
+        handled = pending.difference(failures[0] + failures[1])
+        if handled:
+            redis_client.srem(PENDING_PROVISION_KEY, *handled)
+        redis_client.set(WATERMARK_KEY, started)
+    return summarize('reconcile', len(expected), missing, repairs, failures, started, dry_run)
+
+def lambda_handler(event, context):
+    """
+    Scheduled provisioning
+    Event: { "mode": "reconcile" | "backfill", "dryRun": false }
+    """
+    event = event or {}
+    mode = event.get('mode', 'reconcile')
+    dry_run = bool(event.get('dryRun', False))
+    if mode == 'backfill':
+        return backfill(dry_run)
+    if mode == 'reconcile':
+        return reconcile(dry_run)
+    return {'error': f'Unknown mode: {mode}'}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Provision USERS_TABLE from the Cognito user pool')
+    parser.add_argument('--mode', choices=('backfill', 'reconcile'), default='backfill')
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+    print(json.dumps(lambda_handler({'mode': args.mode, 'dryRun': args.dry_run}, None), indent=2, default=str))
@@ -1,28 +1,15 @@
 import os
 import json
 import boto3
-import hmac
-import hashlib
-import base64
 from datetime import datetime
+from cognito_client import CLIENT_ID, cognito, generate_secret_hash
+from rate_limit import check_rate_limit, rate_limited_response
+from user_profile import report_missing_profile
 
-cognito = boto3.client('cognito-idp')
 dynamodb = boto3.resource('dynamodb')
 
-CLIENT_ID = os.environ['COGNITO_CLIENT_ID']
-CLIENT_SECRET = os.environ['COGNITO_CLIENT_SECRET']
 USERS_TABLE = os.environ.get('USERS_TABLE', 'USERS_TABLE')
 
-def generate_secret_hash(username, client_id, client_secret):
-    """Generate SECRET_HASH for Cognito"""
-    message = username + client_id
-    dig = hmac.new(
-        client_secret.encode('utf-8'),
-        message.encode('utf-8'),
-        hashlib.sha256
-    ).digest()
-    return base64.b64encode(dig).decode()
-
 def lambda_handler(event, context):
     """
     Unified handler for email verification operations
@@ -64,6 +51,10 @@ def lambda_handler(event, context):
         
         # Route 2: /api/verify-email - Resend verification code
         else:
+            # Each resend sends an email; limit per IP and per username before calling Cognito
+            retry_after = check_rate_limit('resend', event, username)
+            if retry_after:
+                return rate_limited_response(retry_after, headers)
             return handle_resend(username, headers)
             
     except Exception as e:
@@ -95,7 +86,7 @@ def handle_confirm(body, headers):
     try:
         cognito.confirm_sign_up(
             ClientId=CLIENT_ID,
-            SecretHash=generate_secret_hash(username, CLIENT_ID, CLIENT_SECRET),
+            SecretHash=generate_secret_hash(username),
             Username=username,
             ConfirmationCode=code
         )
@@ -145,7 +136,8 @@ def handle_confirm(body, headers):
     except Exception as db_error:
         print(f"⚠️ DynamoDB save failed: {str(db_error)}")
         # Don't fail the request if Cognito confirm succeeded
-        # User can still login, profile will be created on first login
+        # User can still login; the provisioning reconciler creates the profile
+        report_missing_profile(username)
     
     return {
         'statusCode': 200,
@@ -163,7 +155,7 @@ def handle_resend(username, headers):
     try:
         cognito.resend_confirmation_code(
             ClientId=CLIENT_ID,
-            SecretHash=generate_secret_hash(username, CLIENT_ID, CLIENT_SECRET),
+            SecretHash=generate_secret_hash(username),
             Username=username
         )
         print(f"✅ Verification code resent to {username}")
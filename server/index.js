@@ -391,6 +391,7 @@ app.post('/upload', async (req, res) => {
   try {
     const lambda = new AWS.Lambda();
     const payload = {
+      headers: { Authorization: req.headers.authorization || '' },
       body: JSON.stringify({ file, fileName })
     };
 
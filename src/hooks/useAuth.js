@@ -72,8 +72,35 @@ export const AuthProvider = ({ children }) => {
     setUser(null);
   };
 
+  // Renew tokens with the refresh token (no password); returns false if the session is over
+  const refreshSession = async () => {
+    const refreshToken = localStorage.getItem('refreshToken');
+    if (!refreshToken) return false;
+
+    try {
+      const response = await fetch(`${API_URL}/refresh`, {
+        method: 'POST',
+        headers: getAuthHeaders(),
+        body: JSON.stringify({ refreshToken })
+      });
+      if (!response.ok) return false;
+
+      const data = await response.json();
+      localStorage.setItem('accessToken', data.accessToken);
+      localStorage.setItem('idToken', data.idToken);
+      localStorage.setItem('refreshToken', data.refreshToken);
+      setAccessToken(data.accessToken);
+      // userInfo is left out when the server couldn't read the profile; /api/me fills it in
+      if (data.userInfo) setUser(data.userInfo);
+      return true;
+    } catch (error) {
+      console.error('Refresh session error:', error);
+      return false;
+    }
+  };
+
   // Get current user info
-  const getUserInfo = async () => {
+  const getUserInfo = async (retried = false) => {
     try {
       const token = localStorage.getItem('accessToken');
       if (!token) {
@@ -89,8 +116,11 @@ export const AuthProvider = ({ children }) => {
       });
 
       if (!response.ok) {
-        // Token expired or invalid
+        // Token expired or invalid: renew the session once, otherwise log out
         if (response.status === 401) {
+          if (!retried && await refreshSession()) {
+            return getUserInfo(true);
+          }
           await logout();
         }
         throw new Error('Failed to get user info');
@@ -120,6 +150,7 @@ export const AuthProvider = ({ children }) => {
     login,
     logout,
     getUserInfo,
+    refreshSession,
     getAuthHeaders,
     isAuthenticated: !!user,
     isAdmin: user?.role === 'admin' || user?.isAdmin
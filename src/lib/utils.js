@@ -4,3 +4,18 @@ import { twMerge } from "tailwind-merge"
 export function cn(...inputs) {
   return twMerge(clsx(inputs));
 }
+
+// Authorization header for the signed-in user (empty for guests)
+export function authHeaders() {
+  const token = localStorage.getItem('accessToken');
+  return token ? { 'Authorization': `Bearer ${token}` } : {};
+}
+
+// URL of a generated image variant ('w320', 'w640', 'full') for uploads that have them
+export function imageVariant(url, variant) {
+  if (!url || !(url.includes('/uploads/') || url.includes('/images/'))) return url;
+  const dot = url.lastIndexOf('.');
+  if (dot <= url.lastIndexOf('/')) return url;
+  const extension = variant === 'full' ? 'webp' : 'jpg';
+  return `${url.slice(0, dot)}.${variant}.${extension}`;
+}
@@ -3,6 +3,7 @@ import { useNavigate } from 'react-router-dom';
 import { menuApi } from '../services/menuApi';
 import { motion, AnimatePresence } from 'framer-motion';
 import { ShoppingCart, Search, Plus, Minus, X, ChevronRight } from 'lucide-react';
+import { imageVariant } from '../lib/utils';
 
 export default function Menu() {
     const navigate = useNavigate();
@@ -265,8 +266,13 @@ export default function Menu() {
                                                     {/* Dish Image */}
                                                     <div className="relative w-28 h-28 rounded-xl overflow-hidden flex-shrink-0 bg-gray-100">
                                                         <img
-                                                            src={item.image || 'https://placehold.co/200/f3f4f6/0F4C4C?text=No+Image'}
+                                                            src={imageVariant(item.image, 'w320') || 'https://placehold.co/200/f3f4f6/0F4C4C?text=No+Image'}
                                                             alt={item.name}
+                                                            loading="lazy"
+                                                            onError={(e) => {
+                                                                // Fall back to the original if no thumbnail exists
+                                                                if (item.image && e.currentTarget.src !== item.image) e.currentTarget.src = item.image;
+                                                            }}
                                                             className="w-full h-full object-cover group-hover:scale-110 transition-transform duration-300"
                                                         />
 
@@ -87,7 +87,7 @@ const UserChatPage = () => {
         // Clear messages for new connection
         setMessages([]);
 
-        const socket = new WebSocket(`${WS_URL}?userId=${userEmail}&role=customer`);
+        const socket = new WebSocket(`${WS_URL}?userId=${encodeURIComponent(userEmail)}&token=${encodeURIComponent(localStorage.getItem('accessToken') || '')}`);
 
         socket.onopen = () => {
             console.log('WebSocket connected for user:', userEmail);
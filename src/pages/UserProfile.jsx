@@ -3,6 +3,7 @@ import { useNavigate } from 'react-router-dom';
 import { toast } from 'sonner';
 import { User, Mail, Shield, Camera, Save, Trash2, Loader2 } from 'lucide-react';
 import imageCompression from 'browser-image-compression';
+import { authHeaders } from '../lib/utils';
 
 export default function UserProfile() {
   const [profile, setProfile] = useState(null);
@@ -87,7 +88,8 @@ export default function UserProfile() {
           const uploadRes = await fetch(`${API_URL}/upload`, {
             method: 'POST',
             headers: {
-              'Content-Type': 'application/json'
+              'Content-Type': 'application/json',
+              ...authHeaders()
             },
             body: JSON.stringify({
               file: base64String,
@@ -111,7 +111,7 @@ const AdminChatWithUsers = () => {
     const connectWebSocket = () => {
       try {
         console.log('Connecting WebSocket as admin:', adminEmail);
-        const socket = new WebSocket(`${WS_URL}?userId=${adminEmail}&role=admin`);
+        const socket = new WebSocket(`${WS_URL}?userId=${encodeURIComponent(adminEmail)}&token=${encodeURIComponent(localStorage.getItem('accessToken') || '')}`);
 
         socket.onopen = () => {
           console.log('WebSocket connected');
@@ -142,9 +142,11 @@ const AdminChatWithUsers = () => {
             // Load conversation history (users who have chatted before)
             const historyUsers = data.conversations.map(conv => ({
               id: conv.userId,
-              name: conv.userId.split('@')[0],
+              name: conv.name || conv.userId.split('@')[0],
               email: conv.userId,
-              avatar: conv.userId.charAt(0).toUpperCase(),
+              avatar: (conv.name || conv.userId).charAt(0).toUpperCase(),
+              fullName: conv.name || null,
+              avatarUrl: conv.avatarUrl || null,
               status: 'Offline', // Will be updated by userList
               unread: conv.unread || 0,
               lastMessage: conv.lastMessage || 'No messages',
@@ -175,9 +177,11 @@ const AdminChatWithUsers = () => {
                 // If no history, just show online users
                 return data.users.map(u => ({
                   id: u.userId,
-                  name: u.userId.split('@')[0],
+                  name: u.name || u.userId.split('@')[0],
                   email: u.userId,
-                  avatar: u.userId.charAt(0).toUpperCase(),
+                  avatar: (u.name || u.userId).charAt(0).toUpperCase(),
+                  fullName: u.name || null,
+                  avatarUrl: u.avatarUrl || null,
                   status: 'Online',
                   unread: 0,
                   lastMessage: 'Online now'
@@ -293,6 +297,16 @@ const AdminChatWithUsers = () => {
         user1: adminEmail,
         user2: user.email
       }));
+
+      // Move read watermark so the unread badge stays cleared on reload
+      ws.send(JSON.stringify({
+        action: 'markRead',
+        userId: adminEmail,
+        otherUserId: user.email
+      }));
+      setUsers(prevUsers => prevUsers.map(u =>
+        u.email === user.email ? { ...u, unread: 0 } : u
+      ));
     }
   };
 
@@ -405,7 +419,9 @@ const AdminChatWithUsers = () => {
                       <div className="relative">
                         <div className={`w-10 h-10 rounded-full flex items-center justify-center text-white font-bold shadow-sm ${selectedUser?.id === user.id ? 'bg-teal-500' : 'bg-teal-200'
                           }`}>
-                          {user.avatar}
+                          {user.avatarUrl ? (
+                            <img src={user.avatarUrl} alt={user.name} className="w-10 h-10 rounded-full object-cover" />
+                          ) : user.avatar}
                         </div>
                         <div className="absolute -bottom-0.5 -right-0.5 w-3 h-3 bg-green-500 border-2 border-white rounded-full"></div>
                       </div>
@@ -413,7 +429,7 @@ const AdminChatWithUsers = () => {
                         <div className="flex justify-between items-start mb-0.5">
                           <h3 className={`font-semibold text-sm truncate ${selectedUser?.id === user.id ? "text-gray-900" : "text-gray-700"
                             }`}>
-                            {user.email}
+                            {user.fullName || user.email}
                           </h3>
                         </div>
                         <p className="text-xs text-gray-500 truncate">{user.lastMessage}</p>
@@ -1,4 +1,6 @@
 // Booking API Service
+import { authHeaders } from '../lib/utils';
+
 const API_BASE_URL = process.env.REACT_APP_API_BASE_URL || 'https://4jawv6e5e1.execute-api.us-east-1.amazonaws.com';
 
 export const bookingApi = {
@@ -8,7 +10,7 @@ export const bookingApi = {
                 ? `${API_BASE_URL}/getBooking?userId=${userId}`
                 : `${API_BASE_URL}/getBooking`;
 
-            const response = await fetch(url);
+            const response = await fetch(url, { headers: authHeaders() });
             if (!response.ok) throw new Error('Failed to fetch bookings');
             const result = await response.json();
             return { success: true, data: result.data || [] };
@@ -21,7 +23,7 @@ export const bookingApi = {
         try {
             const response = await fetch(`${API_BASE_URL}/createBooking`, {
                 method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
+                headers: { 'Content-Type': 'application/json', ...authHeaders() },
                 body: JSON.stringify(data)
             });
             if (!response.ok) throw new Error('Failed to create booking');
@@ -39,7 +41,7 @@ export const bookingApi = {
 
             const response = await fetch(`${API_BASE_URL}/updateBooking`, {
                 method: 'PUT',
-                headers: { 'Content-Type': 'application/json' },
+                headers: { 'Content-Type': 'application/json', ...authHeaders() },
                 body: JSON.stringify(payload)
             });
             if (!response.ok) throw new Error('Failed to update booking');
@@ -54,7 +56,7 @@ export const bookingApi = {
         try {
             const response = await fetch(`${API_BASE_URL}/deleteBooking`, {
                 method: 'DELETE',
-                headers: { 'Content-Type': 'application/json' },
+                headers: { 'Content-Type': 'application/json', ...authHeaders() },
                 body: JSON.stringify({ id })
             });
             if (!response.ok) throw new Error('Failed to delete booking');
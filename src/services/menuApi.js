@@ -1,4 +1,6 @@
 // Menu API Service
+import { authHeaders } from '../lib/utils';
+
 const API_BASE_URL = process.env.REACT_APP_API_BASE_URL || 'https://4jawv6e5e1.execute-api.us-east-1.amazonaws.com';
 
 export const menuApi = {
@@ -41,7 +43,7 @@ export const menuApi = {
         try {
             const response = await fetch(`${API_BASE_URL}/createMenuItem`, {
                 method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
+                headers: { 'Content-Type': 'application/json', ...authHeaders() },
                 body: JSON.stringify(data)
             });
 
@@ -75,7 +77,7 @@ export const menuApi = {
 
             const response = await fetch(`${API_BASE_URL}/updateMenuItem`, {
                 method: 'PUT',
-                headers: { 'Content-Type': 'application/json' },
+                headers: { 'Content-Type': 'application/json', ...authHeaders() },
                 body: JSON.stringify(requestData)
             });
 
@@ -106,7 +108,7 @@ export const menuApi = {
         try {
             const response = await fetch(`${API_BASE_URL}/deleteMenuItem`, {
                 method: 'DELETE',
-                headers: { 'Content-Type': 'application/json' },
+                headers: { 'Content-Type': 'application/json', ...authHeaders() },
                 body: JSON.stringify({ id })
             });
 
@@ -120,33 +122,62 @@ export const menuApi = {
         }
     },
 
-    // UPLOAD image
+    // UPLOAD image (presigned POST straight to S3, bytes never pass through Lambda)
     uploadImage: async (file) => {
         try {
-            const reader = new FileReader();
-            const base64Promise = new Promise((resolve, reject) => {
-                reader.onload = () => resolve(reader.result.split(',')[1]);
-                reader.onerror = reject;
-                reader.readAsDataURL(file);
-            });
+            // Images are stored under their SHA-256, so identical files upload once
+            const digest = await crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+            const sha256 = Array.from(new Uint8Array(digest))
+                .map((byte) => byte.toString(16).padStart(2, '0'))
+                .join('');
 
-            const base64Data = await base64Promise;
-
-            const response = await fetch(`${API_BASE_URL}/upload`, {
+            const presignResponse = await fetch(`${API_BASE_URL}/upload`, {
                 method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
+                headers: { 'Content-Type': 'application/json', ...authHeaders() },
                 body: JSON.stringify({
-                    file: base64Data,
-                    fileName: `${Date.now()}_${file.name}`
+                    action: 'presign',
+                    fileName: `${Date.now()}_${file.name}`,
+                    contentType: file.type,
+                    size: file.size,
+                    sha256
                 })
             });
 
-            if (!response.ok) {
-                const error = await response.json();
+            if (!presignResponse.ok) {
+                const error = await presignResponse.json();
                 throw new Error(error.error || 'Failed to upload image');
             }
 
-            const result = await response.json();
+            const presigned = await presignResponse.json();
+            if (presigned.exists) {
+                return {
+                    success: true,
+                    url: presigned.url
+                };
+            }
+            const { upload, key } = presigned;
+
+            const formData = new FormData();
+            Object.entries(upload.fields).forEach(([name, value]) => formData.append(name, value));
+            formData.append('file', file);
+
+            const s3Response = await fetch(upload.url, { method: 'POST', body: formData });
+            if (!s3Response.ok) {
+                throw new Error(`Failed to upload image: ${s3Response.status}`);
+            }
+
+            const completeResponse = await fetch(`${API_BASE_URL}/upload`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json', ...authHeaders() },
+                body: JSON.stringify({ action: 'complete', key })
+            });
+
+            if (!completeResponse.ok) {
+                const error = await completeResponse.json();
+                throw new Error(error.error || 'Failed to upload image');
+            }
+
+            const result = await completeResponse.json();
 
             return {
                 success: true,
@@ -1,4 +1,6 @@
 // Table API Service
+import { authHeaders } from '../lib/utils';
+
 const API_BASE_URL = process.env.REACT_APP_API_BASE_URL || 'https://4jawv6e5e1.execute-api.us-east-1.amazonaws.com';
 
 export const tableApi = {
@@ -17,7 +19,7 @@ export const tableApi = {
         try {
             const response = await fetch(`${API_BASE_URL}/createTable`, {
                 method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
+                headers: { 'Content-Type': 'application/json', ...authHeaders() },
                 body: JSON.stringify(data)
             });
             if (!response.ok) throw new Error('Failed to create table');
@@ -32,7 +34,7 @@ export const tableApi = {
         try {
             const response = await fetch(`${API_BASE_URL}/updateTable`, {
                 method: 'PUT',
-                headers: { 'Content-Type': 'application/json' },
+                headers: { 'Content-Type': 'application/json', ...authHeaders() },
                 body: JSON.stringify({ ...data, id })
             });
             if (!response.ok) throw new Error('Failed to update table');
@@ -47,7 +49,7 @@ export const tableApi = {
         try {
             const response = await fetch(`${API_BASE_URL}/deleteTable`, {
                 method: 'DELETE',
-                headers: { 'Content-Type': 'application/json' },
+                headers: { 'Content-Type': 'application/json', ...authHeaders() },
                 body: JSON.stringify({ id })
             });
             if (!response.ok) throw new Error('Failed to delete table');